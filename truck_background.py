@@ -0,0 +1,105 @@
+"""배경 이미지 배율 캐시 (이미지 피라미드 + 화면 타일 LRU).
+
+배율 슬라이더를 움직일 때마다 원본 전체를 LANCZOS 로 다시 축소/확대하고 전체 크기의 PhotoImage 를
+만들던 방식 대신, 캔버스에는 지금 화면에 보이는 타일(TILE_SIZE x TILE_SIZE 화면 픽셀)만 넘깁니다.
+
+    cache = BackgroundCache(pil_image, convert=ImageTk.PhotoImage)
+    for key, x, y, photo in cache.view_tiles(scale, left, top, canvas_width, canvas_height):
+        canvas.create_image(x, y, image=photo, anchor='nw')
+
+- 피라미드: 원본을 1/2 씩 줄인 단계(Image.reduce)를 처음 한 번 만들어 두고, 타일은 요청 배율 이상인
+  가장 작은 단계에서 잘라 LANCZOS 로 만듭니다 (축소 배율이 커도 원본 전체를 읽지 않음).
+  resize(box=...) 에 실수 좌표 원본 범위를 주므로 타일 경계가 이어지고 전체를 한 번에 줄인 것과 같습니다.
+- 타일 LRU: (배율, 타일 x, 타일 y) 마다 만든 이미지를 max_tile_bytes 까지 보관합니다. 화면 이동은 캐시된
+  타일을 옮기기만 하고, 전에 쓴 배율로 돌아가면 다시 만들지 않습니다.
+- 초안(draft=True): 슬라이더를 끄는 동안에는 캐시에 없는 타일을 NEAREST 로 빠르게 만들어 보여 주고
+  (LRU 에 넣지 않음), 슬라이더가 멈춘 뒤 draft=False 로 다시 그리면 LANCZOS 타일로 바뀝니다.
+"""
+from collections import OrderedDict
+import math
+import time
+
+TILE_SIZE = 256         # 타일 한 변 (화면 픽셀)
+MAX_TILE_BYTES = 24 * 2**20   # 타일 LRU 상한 (PhotoImage 기준 4 바이트/픽셀, 900x700 화면 약 8장 분량)
+MIN_LEVEL_SIZE = 256    # 피라미드 마지막 단계의 긴 변 (이보다 작아지면 그만 줄임)
+
+
+class BackgroundCache:
+    def __init__(self, image, convert=None, tile_size=TILE_SIZE, max_tile_bytes=MAX_TILE_BYTES):
+        from PIL import Image
+        self._resample = Image.Resampling.LANCZOS
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.mode or 'transparency' in image.info else 'RGB')
+        self.size = image.size
+        self.convert = convert or (lambda tile: tile)
+        self.tile_size = tile_size
+        self.max_tile_bytes = max_tile_bytes
+        self.tile_bytes = 0
+        t0 = time.perf_counter()
+        self.levels = [image]    # levels[k]: 원본의 1 / 2**k
+        while max(self.levels[-1].size) >= 2 * MIN_LEVEL_SIZE:
+            self.levels.append(self.levels[-1].reduce(2))
+        self.build_seconds = time.perf_counter() - t0
+        self.tiles = OrderedDict()   # (배율, tx, ty) -> (convert(타일), 바이트)
+        self._drafts = {}            # 마지막 초안 배율의 (배율, tx, ty) -> convert(타일)
+        self.stats = {'hits': 0, 'misses': 0, 'drafts': 0, 'render_seconds': 0.0}
+
+    def scaled_size(self, scale):
+        # 배율을 적용한 전체 이미지 크기 (화면 픽셀)
+        return int(self.size[0] * scale), int(self.size[1] * scale)
+
+    def level_for(self, scale):
+        # 배율 이상인 가장 작은 피라미드 단계 (확대는 원본에서)
+        if scale <= 0: return len(self.levels) - 1
+        return max(0, min(len(self.levels) - 1, int(math.floor(-math.log2(scale) + 1e-9))))
+
+    def render_tile(self, scale, tx, ty, resample=None):
+        """배율 scale 이미지의 (tx, ty) 타일 (PIL 이미지, 가장자리 타일은 잘린 크기)."""
+        width, height = self.scaled_size(scale)
+        T = self.tile_size
+        x0, y0 = tx * T, ty * T
+        x1, y1 = min(x0 + T, width), min(y0 + T, height)
+        k = self.level_for(scale)
+        level = self.levels[k]
+        # 출력 픽셀 -> 단계 이미지 좌표 (전체 크기 비율 그대로)
+        fx = level.size[0] / width; fy = level.size[1] / height
+        box = (x0 * fx, y0 * fy, x1 * fx, y1 * fy)
+        return level.resize((x1 - x0, y1 - y0), resample if resample is not None else self._resample, box=box)
+
+    def tile(self, scale, tx, ty, draft=False):
+        key = (round(scale, 4), tx, ty)
+        cached = self.tiles.get(key)
+        if cached is not None:
+            self.tiles.move_to_end(key); self.stats['hits'] += 1
+            return cached[0]
+        if draft:
+            if next(iter(self._drafts), key)[0] != key[0]: self._drafts.clear()
+            if key not in self._drafts:
+                from PIL import Image
+                self._drafts[key] = self.convert(self.render_tile(scale, tx, ty, Image.Resampling.NEAREST))
+                self.stats['drafts'] += 1
+            return self._drafts[key]
+        t0 = time.perf_counter()
+        tile = self.render_tile(scale, tx, ty)
+        cached = self.tiles[key] = (self.convert(tile), tile.size[0] * tile.size[1] * 4)
+        self.tile_bytes += cached[1]
+        self.stats['render_seconds'] += time.perf_counter() - t0; self.stats['misses'] += 1
+        # 방금 만든 타일은 남기고 오래 안 쓴 타일부터 버림
+        while self.tile_bytes > self.max_tile_bytes and len(self.tiles) > 1:
+            self.tile_bytes -= self.tiles.popitem(last=False)[1][1]
+        return cached[0]
+
+    def view_tiles(self, scale, left, top, view_width, view_height, draft=False):
+        """배율 scale 이미지의 왼쪽 위 모서리가 화면 (left, top) 에 있을 때 (view_width x view_height) 화면에
+        보이는 타일: [(타일 키, 화면 x, 화면 y, 이미지), ...] (anchor='nw')."""
+        width, height = self.scaled_size(scale)
+        if width <= 0 or height <= 0: return []
+        T = self.tile_size
+        tx0 = max(0, int(-left // T)); ty0 = max(0, int(-top // T))
+        tx1 = min((width - 1) // T, int((view_width - left) // T)); ty1 = min((height - 1) // T, int((view_height - top) // T))
+        return [((tx, ty), left + tx * T, top + ty * T, self.tile(scale, tx, ty, draft))
+                for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+
+    def memory_bytes(self):
+        # 피라미드(원본 포함)와 LRU 타일이 차지하는 대략적인 픽셀 메모리 (타일은 PhotoImage 기준 4 바이트/픽셀)
+        return sum(level.size[0] * level.size[1] * len(level.getbands()) for level in self.levels) + self.tile_bytes
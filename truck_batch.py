@@ -0,0 +1,166 @@
+"""NumPy 를 이용한 다중 궤적 일괄 계산 (batch rollout).
+
+N 대의 차량 상태를 배열로 두고 truck_kinematics.DriveRun 과 같은 규칙
+(잭나이프 중단, 목표 각도 정지, 꺾임 각도 유지, 목표 각도 예측 제어)로 한 스텝씩 동시에
+전진시킵니다. 멈춘 차량은 마스크로 고정되어 더 이상 움직이지 않습니다.
+
+    import numpy as np, truck_batch
+    steer, tlen = np.meshgrid(np.radians(np.arange(-40, 41)), np.arange(10.5, 14.01, 0.5) - 2.0)
+    result = truck_batch.batch_rollout(truck_batch.initial_state(steer.size), steer.ravel(), tlen.ravel(), 20.0)
+"""
+import math
+
+import numpy as np
+
+import truck_kinematics as kin
+
+RUNNING, COMPLETED, JACKKNIFE, TARGET_REACHED = 0, 1, 2, 3
+STATUS_NAMES = {RUNNING: None, COMPLETED: 'completed', JACKKNIFE: 'jackknife', TARGET_REACHED: 'target_reached'}
+
+WHEEL_NAMES = list(kin.wheel_positions({'x': 0.0, 'y': 0.0, 'yaw_tractor': 0.0, 'yaw_trailer': 0.0}, 9.5))
+
+
+def initial_state(n, x=0.0, y=0.0, yaw_tractor=math.pi, yaw_trailer=math.pi):
+    # reset_simulation 과 같은 초기 자세를 n 대 복제
+    return {'x': np.full(n, x, dtype=float), 'y': np.full(n, y, dtype=float),
+            'yaw_tractor': np.full(n, yaw_tractor, dtype=float), 'yaw_trailer': np.full(n, yaw_trailer, dtype=float)}
+
+
+def normalized_articulation_degrees(yaw_tractor, yaw_trailer):
+    # kin.normalized_articulation_degrees 의 배열 버전
+    raw_diff_rad = yaw_tractor - yaw_trailer
+    deg = np.degrees(np.arctan2(np.sin(raw_diff_rad), np.cos(raw_diff_rad)))
+    return np.where(deg > 90, deg - 180, np.where(deg < -90, deg + 180, deg))
+
+
+def wheel_positions(x, y, yaw_tractor, yaw_trailer, trailer_len, tractor_wb=kin.TRACTOR_WB, tractor_width=kin.TRACTOR_WIDTH):
+    # kin.wheel_positions 의 배열 버전. 반환값 shape: (len(WHEEL_NAMES), N, 2), 순서는 WHEEL_NAMES
+    tractor_axles, trailer_axles = kin.axle_definitions(tractor_wb); half_w = tractor_width/2.0
+    cos_t = np.cos(yaw_tractor); sin_t = np.sin(yaw_tractor)
+    cos_r = np.cos(yaw_trailer); sin_r = np.sin(yaw_trailer)
+    out = []
+    for dist in tractor_axles.values():
+        axle_x = x + dist * cos_t; axle_y = y + dist * sin_t
+        out.append((axle_x - half_w * sin_t, axle_y + half_w * cos_t))
+        out.append((axle_x + half_w * sin_t, axle_y - half_w * cos_t))
+    pivot_x = x - (trailer_len - 0.5) * cos_r; pivot_y = y - (trailer_len - 0.5) * sin_r
+    for dist in trailer_axles.values():
+        axle_x = pivot_x + dist * cos_r; axle_y = pivot_y + dist * sin_r
+        out.append((axle_x + half_w * sin_r, axle_y - half_w * cos_r))
+        out.append((axle_x - half_w * sin_r, axle_y + half_w * cos_r))
+    return np.stack([np.stack(np.broadcast_arrays(px, py), axis=-1) for px, py in out])
+
+
+class BatchResult:
+    """batch_rollout 결과. 배열은 모두 길이 N.
+
+    status: RUNNING/COMPLETED/JACKKNIFE/TARGET_REACHED, steps: 실제로 진행한 스텝 수,
+    steer: 마지막 스텝에서 사용한 조향각, paths: path_every 를 준 경우
+    (샘플 수, len(WHEEL_NAMES), N, 2) 크기의 바퀴 궤적, poses: state_every 를 준 경우
+    (샘플 수, 4, N) 크기의 차량 상태 (x, y, yaw_tractor, yaw_trailer).
+    """
+
+    def __init__(self, state, status, steps, steer, articulation_deg, step_dist, paths=None, poses=None):
+        self.state = state
+        self.status = status
+        self.steps = steps
+        self.steer = steer
+        self.articulation_deg = articulation_deg
+        self.distance_travelled = steps * step_dist
+        self.paths = paths
+        self.poses = poses
+
+    def status_names(self):
+        return [STATUS_NAMES[s] for s in self.status]
+
+
+def batch_rollout(state, steer_rad, trailer_len, distance, direction=1, mode="manual", target_angle=None,
+                  step_dist=kin.STEP_DIST, tractor_wb=kin.TRACTOR_WB, path_every=None, state_every=None, on_step=None):
+    """N 대의 차량을 lock-step 으로 주행시킵니다.
+
+    state 는 'x', 'y', 'yaw_tractor', 'yaw_trailer' 배열을 가진 dict, 나머지 인자는
+    스칼라 또는 길이 N 배열입니다 (distance, direction, target_angle 포함).
+    path_every=k 이면 k 스텝마다 바퀴 위치를, state_every=k 이면 k 스텝마다 차량 상태를 기록합니다.
+    on_step 을 주면 매 스텝 뒤 on_step(스텝 번호, 상태 dict, 아직 주행 중인 마스크) 를 호출합니다
+    (전체 궤적을 저장하지 않고 스텝마다 필요한 값만 계산할 때).
+    """
+    x, y, yaw_tractor, yaw_trailer, steer, tlen, steps_left, direction, target = (
+        np.array(a, dtype=float) for a in np.broadcast_arrays(
+            state['x'], state['y'], state['yaw_tractor'], state['yaw_trailer'], steer_rad, trailer_len,
+            np.floor(np.asarray(distance, dtype=float) / step_dist),
+            direction, np.nan if target_angle is None else target_angle))
+    n = x.shape
+    status = np.full(n, RUNNING, dtype=np.int8)
+    steps = np.zeros(n, dtype=np.int64)
+    forward = direction == 1
+    stop_mode = (mode == 'stop_at_target') & ~np.isnan(target)
+
+    art = normalized_articulation_degrees(yaw_tractor, yaw_trailer)
+    previous_error = np.abs(art) - target
+    if mode == 'mpc':
+        # truck_mpc.signed_target 의 배열 버전 (목표 각도가 없는 차량은 수동 조향 그대로)
+        from truck_mpc import mpc_steer, SIGN_DEADBAND
+        mpc_rows = ~np.isnan(target)
+        phi = np.arctan2(np.sin(yaw_tractor - yaw_trailer), np.cos(yaw_tractor - yaw_trailer))
+        sign = np.where(np.abs(phi) > SIGN_DEADBAND, np.sign(phi), np.where(steer * direction < 0, -1.0, 1.0))
+        mpc_target = sign * np.radians(np.where(mpc_rows, target, 0.0))
+
+    paths = None
+    if path_every:
+        paths = [wheel_positions(x, y, yaw_tractor, yaw_trailer, tlen, tractor_wb)]
+    poses = [np.stack((x, y, yaw_tractor, yaw_trailer))] if state_every else None
+
+    active = np.ones(n, dtype=bool)
+    iteration = 0
+    while active.any():
+        art = normalized_articulation_degrees(yaw_tractor, yaw_trailer)
+
+        # 잭나이프 (전진 시에만)
+        hit = active & forward & (np.abs(art) > kin.JACKKNIFE_LIMIT_DEG)
+        status[hit] = JACKKNIFE; active &= ~hit
+
+        if stop_mode.any():
+            error = np.abs(art) - target
+            hit = active & stop_mode & ((np.abs(error) < kin.TARGET_TOLERANCE_DEG) | (error * previous_error <= 0))
+            status[hit] = TARGET_REACHED; active &= ~hit
+            previous_error = np.where(active, error, previous_error)
+
+        hit = active & (steps_left <= 0)
+        status[hit] = COMPLETED; active &= ~hit
+        if not active.any():
+            break
+
+        if mode == 'maintain':
+            diff = yaw_tractor - yaw_trailer
+            steer = np.where(active, np.where(np.abs(diff) > math.radians(90), 0.0,
+                                              np.arctan((tractor_wb / tlen) * np.sin(diff))), steer)
+        elif mode == 'mpc':
+            rows = active & mpc_rows
+            if rows.any():
+                steer = steer.copy()
+                steer[rows] = mpc_steer((yaw_tractor - yaw_trailer)[rows], mpc_target[rows], direction[rows], tractor_wb, tlen[rows], step_dist)
+
+        v = np.where(active, step_dist * direction, 0.0)
+        x = x + v * np.cos(yaw_tractor); y = y + v * np.sin(yaw_tractor)
+        yaw_tractor = yaw_tractor + (v / tractor_wb) * np.tan(steer)
+        delta_yaw_trailer = np.where(active, (step_dist / tlen) * np.sin(yaw_tractor - yaw_trailer), 0.0)
+        yaw_trailer = np.where(forward, yaw_trailer + delta_yaw_trailer, yaw_trailer - delta_yaw_trailer)
+        steps_left = steps_left - active
+        steps = steps + active
+        iteration += 1
+
+        if path_every and iteration % path_every == 0:
+            paths.append(wheel_positions(x, y, yaw_tractor, yaw_trailer, tlen, tractor_wb))
+        if state_every and iteration % state_every == 0:
+            poses.append(np.stack((x, y, yaw_tractor, yaw_trailer)))
+        if on_step is not None:
+            on_step(iteration, {'x': x, 'y': y, 'yaw_tractor': yaw_tractor, 'yaw_trailer': yaw_trailer}, active)
+
+    if path_every and iteration % path_every:
+        paths.append(wheel_positions(x, y, yaw_tractor, yaw_trailer, tlen, tractor_wb))
+    if state_every and iteration % state_every:
+        poses.append(np.stack((x, y, yaw_tractor, yaw_trailer)))
+
+    final = {'x': x, 'y': y, 'yaw_tractor': yaw_tractor, 'yaw_trailer': yaw_trailer}
+    return BatchResult(final, status, steps, steer, normalized_articulation_degrees(yaw_tractor, yaw_trailer),
+                       step_dist, np.stack(paths) if paths else None, np.stack(poses) if poses else None)
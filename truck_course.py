@@ -0,0 +1,262 @@
+"""T자 코스 형상 모델과 선 접촉 검사.
+
+course_image_making.py 가 그리는 시험장 코스(상단 주행로, 3.6m 입구, 경사 진입선, 정지선)를
+같은 치수(COURSE_PARAMS)로부터 선분 목록으로 만들고, 균일 격자(SegmentGrid)로 색인해
+차량 다각형(캡, 구즈넥, 컨테이너, 바퀴)이 선에 닿았는지 매 물리 스텝마다 검사합니다.
+
+좌표는 코스 좌표(m, 입구 아래 선의 가운데가 원점, y 는 상단 주행로 쪽)로 만들어지고,
+CourseTransform 으로 시뮬레이터 월드 좌표에 놓입니다. 배경 이미지가 course_image_making.py
+로 만든 그림이면 CourseTransform.from_background() 로 배경 위치/배율에 정확히 맞출 수 있습니다.
+배경 이미지가 없으면 시뮬레이터는 course_drawing() 의 선/글자를 캔버스 벡터 도형으로 직접 그립니다
+(VECTOR_COURSE_ORIGIN 에 배율 1 로 배치).
+"""
+import math
+
+COURSE_PARAMS = {
+    'L_platform': 10.0,
+    'L_approach': 12.0,
+    'L_gate': 9.7,
+    'W_clearance': 3.6,
+    'W_left_span': 25.0,
+    'W_right_span': 17.4,
+    'H_taper_offset': 3.0,
+    'taper_base_run': 5.2,            # 기준 경사: atan(L_approach / 5.2)
+    'taper_left_delta_deg': -10.0,    # 왼쪽 경사 = 기준 - 10°
+    'taper_right_delta_deg': 5.0,     # 오른쪽 경사 = 기준 + 5°
+    'stop_line_offset': 1.0,          # 정지선은 끝에서 1m 안쪽
+}
+
+# course_image_making.py 의 그림 설정 (plt.subplots(figsize=(16, 7)), 기본 dpi, 기본 subplot 여백)
+FIGURE_SIZE = (16, 7)
+FIGURE_DPI = 100
+SUBPLOT_BOX = (0.125, 0.11, 0.775, 0.77)   # left, bottom, width, height (figure 비율)
+
+# 선 종류: boundary(실선), taper(경사 점선), opening(상단 주행로 아래 변 중 진입로와 겹치는 부분), stop(정지선)
+COLLISION_KINDS = ('boundary', 'taper')
+
+
+def course_layout(params=COURSE_PARAMS):
+    # course_image_making.py 의 "치수 및 각도 설정", "비대칭 기울기 계산" 과 같은 값
+    p = params
+    layout = dict(p)
+    layout['W_total'] = p['W_left_span'] + p['W_clearance'] + p['W_right_span']
+    layout['X_gate_half'] = p['W_clearance'] / 2
+    layout['X_taper_end_half'] = layout['X_gate_half'] + p['H_taper_offset']
+    layout['Y_start'] = 0.0
+    layout['Y_gate_top'] = layout['Y_start'] + p['L_gate']
+    layout['Y_platform_start'] = layout['Y_gate_top'] + p['L_approach']
+    layout['Y_platform_top'] = layout['Y_platform_start'] + p['L_platform']
+    delta_Y = p['L_approach']
+    theta_base_deg = math.degrees(math.atan(delta_Y / p['taper_base_run']))
+    layout['theta_left_deg'] = theta_base_deg + p['taper_left_delta_deg']
+    layout['theta_right_deg'] = theta_base_deg + p['taper_right_delta_deg']
+    layout['X_taper_start_L'] = layout['X_taper_end_half'] + delta_Y / math.tan(math.radians(layout['theta_left_deg']))
+    layout['X_taper_start_R'] = layout['X_taper_end_half'] + delta_Y / math.tan(math.radians(layout['theta_right_deg']))
+    layout['X_left_edge'] = -(p['W_left_span'] + layout['X_gate_half'])
+    layout['X_right_edge'] = p['W_right_span'] + layout['X_gate_half']
+    layout['X_stop_platform'] = layout['X_left_edge'] + p['stop_line_offset']
+    layout['Y_stop_gate'] = layout['Y_start'] + p['stop_line_offset']
+    layout['xlim'] = (layout['X_left_edge'] - 5, layout['X_right_edge'] + 10)
+    layout['ylim'] = (-10, layout['Y_platform_top'] + 5)
+    return layout
+
+
+def course_segments(params=COURSE_PARAMS):
+    """[(이름, 종류, x1, y1, x2, y2), ...] (코스 좌표)"""
+    c = course_layout(params)
+    xl, xr = c['X_left_edge'], c['X_right_edge']
+    yps, ypt = c['Y_platform_start'], c['Y_platform_top']
+    xg, xt = c['X_gate_half'], c['X_taper_end_half']
+    y0, yg = c['Y_start'], c['Y_gate_top']
+    return [
+        ('platform_top', 'boundary', xl, ypt, xr, ypt),
+        ('platform_left', 'boundary', xl, yps, xl, ypt),
+        ('platform_right', 'boundary', xr, yps, xr, ypt),
+        ('platform_bottom_left', 'boundary', xl, yps, -c['X_taper_start_L'], yps),
+        ('platform_bottom_open', 'opening', -c['X_taper_start_L'], yps, c['X_taper_start_R'], yps),
+        ('platform_bottom_right', 'boundary', c['X_taper_start_R'], yps, xr, yps),
+        ('taper_left', 'taper', -c['X_taper_start_L'], yps, -xt, yg),
+        ('taper_right', 'taper', c['X_taper_start_R'], yps, xt, yg),
+        ('gate_top_left', 'boundary', -xt, yg, -xg, yg),
+        ('gate_top_right', 'boundary', xt, yg, xg, yg),
+        ('gate_left', 'boundary', -xg, y0, -xg, yg),
+        ('gate_right', 'boundary', xg, y0, xg, yg),
+        ('gate_bottom', 'boundary', -xg, y0, xg, y0),
+        ('stop_platform', 'stop', c['X_stop_platform'], yps, c['X_stop_platform'], ypt),
+        ('stop_gate', 'stop', -xg, c['Y_stop_gate'], xg, c['Y_stop_gate']),
+    ]
+
+
+# 벡터 코스 기본 배치: 예전 기본 배경(course.png, 오프셋 -27/-11m, 105%)에 그려지던 코스 원점 위치.
+# 배율은 1 (코스 치수 그대로 m)
+VECTOR_COURSE_ORIGIN = (-23.94, -24.79)
+
+# course_image_making.py 의 색/선 종류를 캔버스 옵션으로 (선 두께는 화면 픽셀, 배율과 무관)
+COURSE_STYLES = {
+    'boundary': {'fill': '#00798C', 'width': 2},
+    'opening': {'fill': '#00798C', 'width': 2},       # 그림에서는 상단 주행로 사각형의 아래 변
+    'taper': {'fill': '#00798C', 'width': 1, 'dash': (6, 4)},
+    'stop': {'fill': 'red', 'width': 1.5, 'dash': (6, 4)},
+    'dim': {'fill': 'purple', 'width': 1.5, 'arrow': 'both'},
+    'label': {'fill': '#00798C', 'font': ('Arial', 12)},
+    'stop_label': {'fill': 'red', 'font': ('Arial', 10)},
+    'dim_label': {'fill': 'purple', 'font': ('Arial', 10)},
+}
+
+
+def course_drawing(params=COURSE_PARAMS, dimensions=True):
+    """course_image_making.py 그림을 벡터 도형으로 (코스 좌표, 스타일은 COURSE_STYLES 의 키).
+
+    반환: (선 목록 [(이름, 스타일, x1, y1, x2, y2), ...], 글자 목록 [(이름, 스타일, x, y, 글자, anchor), ...])
+    """
+    c = course_layout(params)
+    lines = list(course_segments(params))
+    labels = [
+        ('platform', 'label', 0.0, c['Y_platform_top'] - 1.5, "상단 주행로", 'n'),
+        ('stop_platform', 'stop_label', c['X_stop_platform'], c['Y_platform_top'], "1 M", 'sw'),
+        ('stop_gate', 'stop_label', c['X_gate_half'], c['Y_stop_gate'], "1 M", 'sw'),
+    ]
+    if dimensions:
+        # 치수선: 오른쪽 세로 (dim_offset = 3), 아래 가로 (화살표는 글자보다 1.5m 위)
+        x_dim = c['X_right_edge'] + 3
+        for name, y1, y2, label in (('platform', c['Y_platform_start'], c['Y_platform_top'], _dim_label(params['L_platform'])),
+                                    ('approach', c['Y_gate_top'], c['Y_platform_start'], _dim_label(params['L_approach'])),
+                                    ('gate', c['Y_start'], c['Y_gate_top'], _dim_label(params['L_gate']))):
+            lines.append((f'dim_{name}', 'dim', x_dim, y1, x_dim, y2))
+            labels.append((f'dim_{name}', 'dim_label', x_dim + 0.5, (y1 + y2) / 2, label, 'w'))
+        y_dim = -3
+        for name, x1, x2, label in (('left', c['X_left_edge'], -c['X_gate_half'], _dim_label(params['W_left_span'])),
+                                    ('clearance', -c['X_gate_half'], c['X_gate_half'], _dim_label(params['W_clearance'])),
+                                    ('right', c['X_gate_half'], c['X_right_edge'], _dim_label(params['W_right_span']))):
+            lines.append((f'dim_{name}', 'dim', x1, y_dim + 1.5, x2, y_dim + 1.5))
+            labels.append((f'dim_{name}', 'dim_label', (x1 + x2) / 2, y_dim - 0.5, label, 'n'))
+    return lines, labels
+
+
+def _dim_label(meters):
+    # 치수 글자 ("9.7 M", "10 M")
+    return f"{meters:g} M"
+
+
+class CourseTransform:
+    """코스 좌표 -> 월드 좌표 (배율 scale 과 원점 위치, 회전 없음)."""
+
+    def __init__(self, origin_x=0.0, origin_y=0.0, scale=1.0):
+        self.origin_x = origin_x; self.origin_y = origin_y; self.scale = scale
+
+    def apply(self, x, y):
+        return self.origin_x + self.scale * x, self.origin_y + self.scale * y
+
+    def inverse(self, x, y):
+        return (x - self.origin_x) / self.scale, (y - self.origin_y) / self.scale
+
+    @classmethod
+    def from_background(cls, image_size, bg_offset_x, bg_offset_y, bg_scale, pixels_per_meter, params=COURSE_PARAMS):
+        # course_image_making.py 로 만든 이미지(원본 크기 image_size)를 시뮬레이터가 bg_offset 을 중심으로
+        # bg_scale 배 해서 그릴 때, 이미지에 그려진 코스가 놓이는 월드 좌표
+        c = course_layout(params)
+        width, height = image_size
+        (x0, x1), (y0, y1) = c['xlim'], c['ylim']
+        left, bottom, box_w, box_h = SUBPLOT_BOX
+        # set_aspect("equal", adjustable="box"): 축 상자를 줄여 가운데 정렬
+        px_per_m = min(box_w * width / (x1 - x0), box_h * height / (y1 - y0))
+        center_px = (left + box_w / 2) * width
+        center_py = (1 - bottom - box_h / 2) * height      # 이미지 y 는 아래쪽이 +
+        m_per_px = bg_scale / pixels_per_meter                 # 배경 이미지 1px 의 월드 길이
+        scale = px_per_m * m_per_px
+        # 코스 좌표 (x, y) 의 이미지 위치: center + ((x - xc) * px_per_m, -(y - yc) * px_per_m)
+        xc = (x0 + x1) / 2; yc = (y0 + y1) / 2
+        origin_x = bg_offset_x + (center_px - width / 2) * m_per_px - xc * scale
+        origin_y = bg_offset_y - (center_py - height / 2) * m_per_px - yc * scale
+        return cls(origin_x, origin_y, scale)
+
+
+class SegmentGrid:
+    """선분 균일 격자 색인. 셀마다 지나가는 선분 번호를 보관합니다."""
+
+    def __init__(self, segments, cell_size=2.0):
+        self.cell_size = cell_size
+        self.cells = {}
+        for i, (x1, y1, x2, y2) in enumerate(segments):
+            # 선분의 범위 안에서 선분이 실제로 지나가는 셀에만 등록
+            for gx in range(math.floor(min(x1, x2) / cell_size), math.floor(max(x1, x2) / cell_size) + 1):
+                for gy in range(math.floor(min(y1, y2) / cell_size), math.floor(max(y1, y2) / cell_size) + 1):
+                    cell = [(gx*cell_size, gy*cell_size), ((gx+1)*cell_size, gy*cell_size),
+                            ((gx+1)*cell_size, (gy+1)*cell_size), (gx*cell_size, (gy+1)*cell_size)]
+                    if convex_polygon_hits_segment(cell, x1, y1, x2, y2):
+                        self.cells.setdefault((gx, gy), []).append(i)
+
+    def query(self, min_x, min_y, max_x, max_y):
+        cs = self.cell_size; cells = self.cells
+        found = set()
+        for gx in range(math.floor(min_x / cs), math.floor(max_x / cs) + 1):
+            for gy in range(math.floor(min_y / cs), math.floor(max_y / cs) + 1):
+                bucket = cells.get((gx, gy))
+                if bucket: found.update(bucket)
+        return found
+
+
+def _bbox(points):
+    xs = [p[0] for p in points]; ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def convex_polygon_hits_segment(poly, x1, y1, x2, y2, margin=0.0):
+    # 분리축 정리: 다각형 변의 법선과 선분의 법선 위로 투영했을 때 모두 겹치면 접촉
+    n = len(poly)
+    axes = [(poly[i][1] - poly[(i+1) % n][1], poly[(i+1) % n][0] - poly[i][0]) for i in range(n)]
+    axes.append((y1 - y2, x2 - x1))
+    for ax, ay in axes:
+        length = math.hypot(ax, ay)
+        if length == 0: continue
+        ax /= length; ay /= length
+        proj = [px * ax + py * ay for px, py in poly]
+        s1 = x1 * ax + y1 * ay; s2 = x2 * ax + y2 * ay
+        if max(proj) + margin < min(s1, s2) or max(s1, s2) < min(proj) - margin:
+            return False
+    return True
+
+
+class CourseGeometry:
+    def __init__(self, segments, cell_size=2.0, kinds=COLLISION_KINDS):
+        # segments: [(이름, 종류, x1, y1, x2, y2), ...] (월드 좌표)
+        self.segments = list(segments)
+        self.kinds = tuple(kinds)
+        self._active = [s for s in self.segments if s[1] in self.kinds]
+        self.grid = SegmentGrid([s[2:] for s in self._active], cell_size)
+        self._bounds = [_bbox((s[2:4], s[4:6])) for s in self._active]
+        self.checks = 0
+
+    @classmethod
+    def build(cls, transform=None, params=COURSE_PARAMS, **kw):
+        transform = transform or CourseTransform()
+        segments = []
+        for name, kind, x1, y1, x2, y2 in course_segments(params):
+            segments.append((name, kind) + transform.apply(x1, y1) + transform.apply(x2, y2))
+        return cls(segments, **kw)
+
+    def polygon_contacts(self, poly, margin=0.0, candidates=None):
+        # 다각형이 닿은 선분 이름 목록
+        min_x, min_y, max_x, max_y = _bbox(poly)
+        if candidates is None:
+            candidates = self.grid.query(min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+        hits = []
+        for i in candidates:
+            sx0, sy0, sx1, sy1 = self._bounds[i]
+            if sx0 > max_x + margin or sx1 < min_x - margin or sy0 > max_y + margin or sy1 < min_y - margin: continue
+            name, _, x1, y1, x2, y2 = self._active[i]
+            if convex_polygon_hits_segment(poly, x1, y1, x2, y2, margin): hits.append(name)
+        return hits
+
+    def check_vehicle(self, polygons, margin=0.0):
+        """{부위 이름: 다각형} -> [(부위 이름, 선분 이름), ...]. 차량 전체 범위에 선이 없으면 바로 반환."""
+        self.checks += 1
+        points = [p for poly in polygons.values() for p in poly]
+        min_x, min_y, max_x, max_y = _bbox(points)
+        candidates = self.grid.query(min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+        if not candidates: return []
+        contacts = []
+        for part, poly in polygons.items():
+            for name in self.polygon_contacts(poly, margin, candidates):
+                contacts.append((part, name))
+        return contacts
@@ -0,0 +1,267 @@
+"""T자 코스 시험 채점 (정지선 통과, 선 접촉, 기어 변경/전후진 전환).
+
+course_image_making.py 가 그리는 1m 정지선(X_stop_platform, Y_stop_gate)을 course_segments 의
+'stop' 선분으로 가져와, 매 물리 스텝마다 앞축 가운데와 트레일러 뒤끝이 직전 스텝에서 이번 스텝까지
+움직인 선분이 정지선 선분과 교차하는지 검사합니다. 표본 점이 선 위에 놓이지 않아도 스텝 사이에서
+넘은 순간을 놓치지 않고, 교차 비율로 넘은 지점(누적 주행 거리, 위치)을 정확히 기록합니다.
+
+    exam = ExamScorer(transform)
+    exam.reset(engine.get_state(), trailer_len)
+    exam.begin_maneuver(direction)                          # 조작(주행 버튼)마다
+    exam.step(engine.get_state(), direction, trailer_len, contacts)   # 물리 스텝마다 (정지선 2개 x 점 2개)
+    print("\\n".join(exam.report().summary_lines()))
+
+채점 규칙 (시뮬레이터 규칙, 실제 시험 규정과 다를 수 있음):
+  - 후진으로 입구 정지선(stop_gate)을 트레일러 뒤끝이 넘고, 채점 시점에 뒤끝이 정지선 안쪽에 있어야 합격
+  - 상단 주행로 왼쪽 정지선(stop_platform)은 전진 한계선: 앞축이 넘을 때마다 감점
+  - 선 접촉(새로 닿은 선 하나마다)과 허용 횟수를 넘은 전후진 전환은 감점, 잭나이프는 실격
+
+채점 상태는 snapshot() 으로 JSON 에 넣을 수 있는 dict 가 되어 조작 기록/프리셋과 함께 저장됩니다.
+score_actions() 는 조작 기록의 주행 입력을 GUI 없이 다시 주행해 같은 채점을 합니다.
+"""
+import math
+
+import truck_kinematics as kin
+from truck_course import COURSE_PARAMS, CourseGeometry, CourseTransform, course_layout, course_segments
+from truck_target import rear_point
+
+EXAM_RULES = {
+    'start_points': 100,
+    'pass_points': 80,
+    'contact_penalty': 10,      # 선 접촉 한 번 (새로 닿은 선 하나)
+    'stop_line_penalty': 10,    # 전진 한계 정지선을 앞축이 넘은 한 번
+    'free_reversals': 3,        # 감점 없는 전후진 전환 횟수 (전진 -> 후진 한 번은 코스에 필요)
+    'reversal_penalty': 5,      # 넘은 전환 한 번
+}
+
+# 통과해야 하는 정지선 (순서대로): (선 이름, 점, 주행 방향, 표시 이름)
+REQUIRED_CROSSINGS = (
+    ('stop_gate', 'rear', -1, '후진 정지선 (트레일러 뒤끝)'),
+)
+# 넘으면 감점인 한계선: (선 이름, 점, 표시 이름)
+LIMIT_CROSSINGS = (
+    ('stop_platform', 'front', '전진 정지선 (앞축)'),
+)
+POINT_NAMES = {'front': '앞축', 'rear': '트레일러 뒤끝'}
+
+
+def vehicle_points(state, trailer_len, tractor_wb=kin.TRACTOR_WB):
+    # 킹핀, 앞축 가운데, 트레일러 뒤끝 (킹핀에서 trailer_len + kin.TRAILER_REAR_OVERHANG, 화면의 컨테이너 뒤끝)
+    front = (state['x'] + tractor_wb * math.cos(state['yaw_tractor']), state['y'] + tractor_wb * math.sin(state['yaw_tractor']))
+    rear = rear_point(state, trailer_len)
+    return {'kingpin': (state['x'], state['y']), 'front': front, 'rear': (float(rear[0]), float(rear[1]))}
+
+
+def _side(line, point):
+    # 정지선을 넘은 쪽이면 True (line: (이름, a, b, 넘은 쪽 부호))
+    _, (ax, ay), (bx, by), past = line
+    return past * ((bx - ax) * (point[1] - ay) - (by - ay) * (point[0] - ax)) > 0
+
+
+def segment_crossing(line, p0, p1):
+    """p0 -> p1 이동이 정지선 선분을 넘은(또는 되돌아 나온) 비율 t (0~1), 선분 밖이거나 안 넘었으면 None."""
+    _, (ax, ay), (bx, by), _ = line
+    dx, dy = bx - ax, by - ay
+    s0 = dx * (p0[1] - ay) - dy * (p0[0] - ax)
+    s1 = dx * (p1[1] - ay) - dy * (p1[0] - ax)
+    if (s0 > 0) == (s1 > 0): return None
+    t = s0 / (s0 - s1)
+    cx = p0[0] + t * (p1[0] - p0[0]); cy = p0[1] + t * (p1[1] - p0[1])
+    u = ((cx - ax) * dx + (cy - ay) * dy) / (dx * dx + dy * dy)
+    return t if 0.0 <= u <= 1.0 else None
+
+
+class ExamReport:
+    def __init__(self, passed, score, items, events, deductions, failures):
+        self.passed = passed
+        self.score = score
+        self.items = items            # [(표시 이름, 통과 여부, 설명), ...]
+        self.events = events          # 정지선 통과/선 접촉 기록 (누적 거리 순)
+        self.deductions = deductions  # [(사유, 감점), ...]
+        self.failures = failures      # 불합격 사유
+
+    def summary_lines(self):
+        lines = [f"시험 결과: {'합격' if self.passed else '불합격'} ({self.score}점)"]
+        lines += [f"  [{'O' if ok else 'X'}] {label}: {text}" for label, ok, text in self.items]
+        lines += [f"  감점 -{points}: {reason}" for reason, points in self.deductions]
+        lines += [f"  불합격 사유: {reason}" for reason in self.failures]
+        for distance, kind, name, point, direction, x, y in self.events:
+            gear = '전진' if direction == 1 else '후진'
+            if kind == 'contact': lines.append(f"  {distance:7.2f}m: {name} 선 접촉 ({gear})")
+            else: lines.append(f"  {distance:7.2f}m: {POINT_NAMES[point]} {name} {'통과' if kind == 'past' else '되돌아 나옴'} ({gear}, {x:.2f}, {y:.2f})")
+        return lines
+
+
+class ExamScorer:
+    def __init__(self, transform=None, tractor_wb=kin.TRACTOR_WB, rules=EXAM_RULES, params=COURSE_PARAMS):
+        self.tractor_wb = tractor_wb
+        self.rules = dict(rules)
+        self.params = params
+        self.lines = []
+        self._points = None
+        self.set_transform(transform)
+        self.reset()
+
+    def set_transform(self, transform):
+        """정지선 위치를 코스 배치(CourseTransform, None 이면 채점 안 함)에 맞춤. 채점 기록은 그대로 둡니다."""
+        self.transform = transform
+        self.lines = []
+        if transform is None: return
+        c = course_layout(self.params)
+        # 넘은 쪽의 기준 점: 정지선 바깥(주행로 왼쪽 끝, 입구 아래 선)
+        past_points = {'stop_platform': (c['X_left_edge'], (c['Y_platform_start'] + c['Y_platform_top']) / 2),
+                       'stop_gate': (0.0, c['Y_start'])}
+        for name, kind, x1, y1, x2, y2 in course_segments(self.params):
+            if kind != 'stop': continue
+            line = (name, transform.apply(x1, y1), transform.apply(x2, y2), 1)
+            past = 1 if _side(line, transform.apply(*past_points[name])) else -1
+            self.lines.append(line[:3] + (past,))
+
+    def reset(self, state=None, trailer_len=None):
+        # 새 시험: 채점 기록을 지우고 (state 를 주면) 그 자세에서 시작
+        self.distance = 0.0
+        self.gear_changes = 0
+        self.reversals = 0
+        self.contact_events = 0
+        self.overruns = 0             # 한계선(LIMIT_CROSSINGS)을 넘은 횟수
+        self.passed = []              # 순서대로 통과한 REQUIRED_CROSSINGS 의 이벤트
+        self.jackknifed = False
+        self.events = []              # (누적 거리, 종류, 선 이름, 점, 주행 방향, x, y)
+        self._gear = None             # 마지막 조작의 기어
+        self._motion = None           # 마지막으로 움직인 방향
+        self._touching = []           # 직전 스텝에 닿아 있던 선 이름
+        self._points = vehicle_points(state, trailer_len, self.tractor_wb) if state is not None else None
+
+    def move_to(self, state, trailer_len):
+        # 주행 없이 자세만 바뀜 (정지선 통과로 보지 않음)
+        self._points = vehicle_points(state, trailer_len, self.tractor_wb)
+
+    def begin_maneuver(self, direction):
+        if self._gear is not None and direction != self._gear: self.gear_changes += 1
+        self._gear = direction
+
+    def step(self, state, direction, trailer_len, contacts=()):
+        """물리 스텝 한 번 뒤의 자세로 채점을 갱신합니다. contacts: check_vehicle 결과 [(부위, 선 이름), ...]."""
+        points = vehicle_points(state, trailer_len, self.tractor_wb)
+        previous = self._points
+        self._points = points
+        if previous is None: return
+        if self._motion is not None and direction != self._motion: self.reversals += 1
+        self._motion = direction
+        moved = math.hypot(points['kingpin'][0] - previous['kingpin'][0], points['kingpin'][1] - previous['kingpin'][1])
+        for line in self.lines:
+            for key in ('front', 'rear'):
+                p0, p1 = previous[key], points[key]
+                t = segment_crossing(line, p0, p1)
+                if t is None: continue
+                past = _side(line, p1)
+                event = (self.distance + t * moved, 'past' if past else 'back', line[0], key, direction,
+                         p0[0] + t * (p1[0] - p0[0]), p0[1] + t * (p1[1] - p0[1]))
+                self.events.append(event)
+                if not past: continue
+                if any(line[0] == name and key == point for name, point, _ in LIMIT_CROSSINGS): self.overruns += 1
+                if len(self.passed) < len(REQUIRED_CROSSINGS) and REQUIRED_CROSSINGS[len(self.passed)][:3] == (line[0], key, direction):
+                    self.passed.append(event)
+        self.distance += moved
+        touching = sorted({name for _, name in contacts})
+        for name in touching:
+            if name not in self._touching:
+                self.contact_events += 1
+                x, y = points['front']
+                self.events.append((self.distance, 'contact', name, None, direction, x, y))
+        self._touching = touching
+
+    def jackknife(self):
+        self.jackknifed = True
+
+    def _crossings(self):
+        # 필수 정지선마다 통과 이벤트 (아직이면 None)
+        return self.passed + [None] * (len(REQUIRED_CROSSINGS) - len(self.passed))
+
+    def score(self):
+        rules = self.rules
+        return (rules['start_points'] - self.contact_events * rules['contact_penalty']
+                - self.overruns * rules['stop_line_penalty']
+                - max(0, self.reversals - rules['free_reversals']) * rules['reversal_penalty'])
+
+    def status_text(self):
+        # 화면 표시용 한 줄 (매 프레임)
+        marks = " ".join(f"{label.split(' (')[0]} {'O' if event else '-'}"
+                         for (_, _, _, label), event in zip(REQUIRED_CROSSINGS, self._crossings()))
+        return (f"시험 {self.score()}점 | {marks} | 정지선 침범 {self.overruns} | 접촉 {self.contact_events} | "
+                f"기어 변경 {self.gear_changes} | 전후진 전환 {self.reversals}")
+
+    def report(self):
+        rules = self.rules
+        items = []; failures = []
+        crossings = self._crossings()
+        for (name, key, direction, label), event in zip(REQUIRED_CROSSINGS, crossings):
+            if event is None:
+                items.append((label, False, "통과 안 함")); failures.append(f"{label} 통과 안 함")
+            else:
+                items.append((label, True, f"누적 {event[0]:.2f}m 에서 통과 ({event[5]:.2f}, {event[6]:.2f})"))
+        if self.lines and crossings[-1] is not None:
+            gate = next(line for line in self.lines if line[0] == REQUIRED_CROSSINGS[-1][0])
+            inside = _side(gate, self._points['rear'])
+            items.append(('정지 위치', inside, "트레일러 뒤끝이 정지선 안쪽" if inside else "트레일러 뒤끝이 정지선 밖으로 나옴"))
+            if not inside: failures.append("트레일러 뒤끝이 정지선 밖에서 끝남")
+        overruns = self.overruns
+        for _, _, label in LIMIT_CROSSINGS:
+            items.append((label, overruns == 0, f"넘은 횟수 {overruns}회"))
+        items.append(('선 접촉', self.contact_events == 0, f"{self.contact_events}회"))
+        items.append(('기어 변경', True, f"{self.gear_changes}회"))
+        items.append(('전후진 전환', self.reversals <= rules['free_reversals'], f"{self.reversals}회 (허용 {rules['free_reversals']}회)"))
+        deductions = []
+        if self.contact_events:
+            deductions.append((f"선 접촉 {self.contact_events}회", self.contact_events * rules['contact_penalty']))
+        if overruns:
+            deductions.append((f"전진 정지선 침범 {overruns}회", overruns * rules['stop_line_penalty']))
+        extra = max(0, self.reversals - rules['free_reversals'])
+        if extra:
+            deductions.append((f"전후진 전환 허용 초과 {extra}회", extra * rules['reversal_penalty']))
+        if self.jackknifed: failures.append("잭나이프")
+        if not self.lines: failures.append("코스 위치를 알 수 없음 (코스 배경 없음)")
+        score = self.score()
+        if score < rules['pass_points']: failures.append(f"점수 {score}점 < 합격 {rules['pass_points']}점")
+        return ExamReport(not failures, score, items, sorted(self.events), deductions, failures)
+
+    def snapshot(self):
+        return {'distance': self.distance, 'gear_changes': self.gear_changes, 'reversals': self.reversals,
+                'contact_events': self.contact_events, 'overruns': self.overruns, 'jackknifed': self.jackknifed,
+                'passed': [list(e) for e in self.passed],
+                'events': [list(e) for e in self.events], 'gear': self._gear, 'motion': self._motion,
+                'touching': list(self._touching),
+                'points': {k: list(v) for k, v in self._points.items()} if self._points else None}
+
+    def restore(self, snapshot):
+        self.distance = snapshot['distance']; self.gear_changes = snapshot['gear_changes']
+        self.reversals = snapshot['reversals']; self.contact_events = snapshot['contact_events']
+        self.overruns = snapshot['overruns']; self.passed = [tuple(e) for e in snapshot['passed']]
+        self.jackknifed = snapshot['jackknifed']
+        self.events = [tuple(e) for e in snapshot['events']]
+        self._gear = snapshot['gear']; self._motion = snapshot['motion']
+        self._touching = list(snapshot['touching'])
+        self._points = {k: tuple(v) for k, v in snapshot['points'].items()} if snapshot['points'] else None
+
+
+def score_actions(start, actions, trailer_len, transform=None, tractor_wb=kin.TRACTOR_WB, check_contacts=True, rules=EXAM_RULES):
+    """start 자세에서 조작 기록의 주행 입력(actions)을 차례로 주행하며 채점한 ExamReport."""
+    transform = transform or CourseTransform()
+    exam = ExamScorer(transform, tractor_wb, rules)
+    geometry = CourseGeometry.build(transform) if check_contacts else None
+    engine = kin.KinematicsEngine(trailer_len=trailer_len, tractor_wb=tractor_wb)
+    engine.set_state(start)
+    exam.reset(engine.get_state(), trailer_len)
+
+    for action in actions:
+        direction = action['direction']
+        exam.begin_maneuver(direction)
+        def on_step(run):
+            state = engine.get_state()
+            contacts = geometry.check_vehicle(kin.body_polygons(state, run.steer_rad, trailer_len, tractor_wb)) if geometry else ()
+            exam.step(state, direction, trailer_len, contacts)
+        run = engine.drive(action['distance'], math.radians(action['steer_deg']), action['mode'], direction,
+                           action['target_angle'], on_step=on_step)
+        if run.status == 'jackknife':
+            exam.jackknife(); break
+    return exam.report()
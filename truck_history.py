@@ -0,0 +1,141 @@
+"""조작 기록 (History) 분기 트리.
+
+조작 기록은 deque 가 아닌 트리로 보관합니다. 과거 기록에서 새로 주행하면 기존
+기록을 지우지 않고 새 분기를 만들며, 분기 사이를 자유롭게 오갈 수 있습니다.
+
+메모리를 일정하게 유지하기 위해 전체 상태(state)는 체크포인트 노드(가장 가까운 상위
+체크포인트에서 주행 거리가 CHECKPOINT_DISTANCE 를 넘는 곳, 또는 재현할 수 없는 조작)에만
+항상 보관합니다. 나머지 노드는 주행 입력(action)만 가지고 있다가, 필요할 때 가장 가까운
+상위 체크포인트에서 주행을 다시 계산(replay)해 상태를 복원합니다. 다시 계산하는 거리가
+CHECKPOINT_DISTANCE 이하이므로 분기 전환이 한 프레임 안에 끝납니다 (시뮬레이터는 스텝마다
+선 접촉/시험 채점까지 다시 해 약 0.25 ms/스텝). 궤적 스냅샷은 세그먼트를 공유하므로 체크포인트가
+늘어도 좌표 데이터는 거의 늘지 않습니다. 최근에 복원/생성한 상태는 LRU 캐시에 남깁니다.
+"""
+import math
+from collections import OrderedDict
+
+import truck_kinematics as kin
+from truck_paths import WheelPaths, PATH_TOLERANCE
+
+CHECKPOINT_DISTANCE = 4.0    # 다시 계산하는 주행 거리 상한 (m): 약 51 스텝
+
+
+class HistoryNode:
+    __slots__ = ('parent', 'children', 'description', 'depth', 'action', 'state', 'checkpoint', 'active_child', 'replay_distance')
+
+    def __init__(self, parent, description, action, state, checkpoint):
+        self.parent = parent
+        self.children = []
+        self.description = description
+        self.depth = parent.depth + 1 if parent else 0
+        self.action = action        # 재현용 주행 입력 (체크포인트가 아니면 필수)
+        self.state = state          # 전체 상태 (체크포인트가 아니면 캐시에서 밀려날 수 있음)
+        self.checkpoint = checkpoint
+        self.active_child = None    # 목록에 표시할 자식 분기
+        # 가장 가까운 상위 체크포인트에서 이 노드까지 다시 계산할 주행 거리 (m)
+        self.replay_distance = 0.0 if checkpoint else parent.replay_distance + action["distance"]
+
+    @property
+    def branch_index(self):
+        return self.parent.children.index(self) if self.parent else 0
+
+
+class HistoryTree:
+    def __init__(self, replay, checkpoint_distance=CHECKPOINT_DISTANCE, max_cached_states=64):
+        self.replay = replay    # replay(state, [action, ...]) -> state
+        self.checkpoint_distance = checkpoint_distance
+        self.max_cached_states = max_cached_states
+        self.root = None
+        self.current = None
+        self.node_count = 0
+        self._cache = OrderedDict()
+
+    def reset(self, description, state):
+        self.root = self.current = HistoryNode(None, description, None, state, True)
+        self.node_count = 1
+        self._cache.clear()
+        return self.root
+
+    def add(self, description, state, action=None):
+        # 현재 노드의 자식으로 추가 (현재 노드에 이미 자식이 있으면 새 분기)
+        parent = self.current
+        checkpoint = action is None or parent.replay_distance + action["distance"] > self.checkpoint_distance
+        node = HistoryNode(parent, description, action, state, checkpoint)
+        parent.children.append(node)
+        parent.active_child = node
+        self.current = node
+        self.node_count += 1
+        self._remember(node)
+        return node
+
+    def _remember(self, node):
+        if node.checkpoint: return
+        self._cache[node] = None
+        self._cache.move_to_end(node)
+        while len(self._cache) > self.max_cached_states:
+            evicted, _ = self._cache.popitem(last=False)
+            evicted.state = None
+
+    def state_of(self, node):
+        if node.state is None:
+            actions = []; start = node
+            while start.state is None:
+                actions.append(start.action); start = start.parent
+            node.state = self.replay(start.state, actions[::-1])
+        self._remember(node)
+        return node.state
+
+    def select(self, node):
+        # node 를 현재 위치로 하고, 루트에서 node 까지의 분기가 목록에 보이도록 설정
+        self.current = node
+        while node.parent is not None:
+            node.parent.active_child = node; node = node.parent
+
+    def sibling(self, node, step):
+        if node.parent is None: return node
+        siblings = node.parent.children
+        return siblings[(siblings.index(node) + step) % len(siblings)]
+
+    def line_from(self, node):
+        # node 부터 활성 자식을 따라 끝까지
+        line = []
+        while node is not None:
+            line.append(node); node = node.active_child
+        return line
+
+    def line(self):
+        return self.line_from(self.root) if self.root else []
+
+
+def replay_actions(state, actions, max_path_points=2000, exam=None, contacts=None, path_tolerance=PATH_TOLERANCE):
+    # 저장된 상태에서 주행 입력을 차례로 다시 실행한 상태를 반환 (Tk 불필요).
+    # exam (ExamScorer) 을 주면 state["exam"] 채점 기록에 이어서 같은 스텝으로 채점하고,
+    # contacts(state, steer_rad, trailer_len) 는 그 스텝의 선 접촉 목록을 돌려줍니다.
+    # 궤적 단순화는 주행마다 끊으므로 (anchor) 주행 때와 같은 점이 남습니다.
+    # 주행 사이의 트레일러 길이 변경은 action 의 trailer_len_var / new_paths (궤적 초기화) 로 재현합니다.
+    state = dict(state)
+    engine = kin.KinematicsEngine(trailer_len=state["trailer_len_var"] - kin.TRAILER_SWING_LEN)
+    engine.set_state(state)
+    paths = WheelPaths.from_snapshot(state["wheel_paths"], maxlen=max_path_points, tolerance=path_tolerance)
+    if exam is not None and not state.get("exam"): exam = None
+    if exam is not None: exam.restore(state["exam"])
+    def on_step(run):
+        paths.append_positions(engine.wheel_positions())
+        if exam is not None:
+            pose = engine.get_state()
+            exam.step(pose, run.direction, engine.trailer_len, contacts(pose, run.steer_rad, engine.trailer_len) if contacts else ())
+    for action in actions:
+        if "trailer_len_var" in action:
+            engine.trailer_len = action["trailer_len_var"] - kin.TRAILER_SWING_LEN
+        if action.get("new_paths"):
+            paths = WheelPaths.start(engine.wheel_positions(), maxlen=max_path_points, tolerance=path_tolerance)
+        paths.anchor()
+        if exam is not None: exam.begin_maneuver(action["direction"])
+        run = engine.drive(action["distance"], math.radians(action["steer_deg"]), action["mode"], action["direction"],
+                           action["target_angle"], on_step=on_step)
+        if exam is not None and run.status == 'jackknife': exam.jackknife()
+        state.update(action["ui"])
+    state.update(engine.get_state())
+    state["wheel_paths"] = paths.snapshot()
+    if exam is not None: state["exam"] = exam.snapshot()
+    return state
@@ -0,0 +1,437 @@
+"""트랙터-트레일러 운동학 엔진 (Tk 의존성 없음).
+
+TractorTrailerSim.animate_step 에 있던 물리 계산을 그대로 옮겨 온 것으로,
+GUI 없이 배치 도구나 테스트에서 수천 번의 주행을 빠르게 돌릴 수 있습니다.
+"""
+import math
+
+STEP_DIST = 0.078            # 물리 계산 한 스텝당 이동 거리 (m)
+DRIVE_SPEED = STEP_DIST / 0.010   # 화면 주행 속도 (m/s): 예전 animate_step 의 10ms 당 1스텝과 같은 값
+TRACTOR_WB = 3.8             # 트랙터 축간 거리 (m)
+TRAILER_SWING_LEN = 2.0      # 하늘색 구즈넥 부분 길이 (m)
+TRAILER_REAR_OVERHANG = 0.5  # 화면의 컨테이너 뒤끝: 킹핀에서 trailer_len + 0.5m
+TRACTOR_WIDTH = 2.5
+MAX_STEER_DEG = 40.0
+JACKKNIFE_LIMIT_DEG = 90.0
+TARGET_TOLERANCE_DEG = 1.0
+ARC_MAX_STEP = 1.0           # arc 적분기의 최대 스텝 길이 (m)
+ARC_MAX_TURN_DEG = 2.0       # arc 적분기 한 스텝에서 허용하는 트랙터/트레일러 yaw 변화량
+ARC_MIN_STEP = 1e-3
+
+CONTROL_MODES = ("manual", "stop_at_target", "maintain", "mpc")
+
+
+def normalized_articulation_degrees(yaw_tractor, yaw_trailer):
+    raw_diff_rad = yaw_tractor - yaw_trailer
+    # Normalize to -pi to pi range
+    normalized_diff_deg = math.degrees(math.atan2(math.sin(raw_diff_rad), math.cos(raw_diff_rad)))
+    # 90도를 넘는 값은 [-90, 90] 범위의 등가 각도로 변환 (표시 및 잭나이프 검사용)
+    if normalized_diff_deg > 90:
+        normalized_diff_deg = -(180 - normalized_diff_deg)
+    elif normalized_diff_deg < -90:
+        normalized_diff_deg = (180 + normalized_diff_deg)
+    return normalized_diff_deg
+
+
+def steer_for_angle_maintenance(angle_diff, tractor_wb, trailer_len):
+    if abs(angle_diff) > math.radians(90): return 0
+    return math.atan((tractor_wb / trailer_len) * math.sin(angle_diff))
+
+
+def steer_for_target_angle(current_angle_diff_rad, target_angle_rad, direction, tractor_wb, trailer_len):
+    error = target_angle_rad - abs(current_angle_diff_rad); sign = 1 if current_angle_diff_rad > 0 else -1
+    steer_adjustment = 0.8 * error
+    base_steer = steer_for_angle_maintenance(current_angle_diff_rad, tractor_wb, trailer_len)
+    if direction == -1: final_steer = base_steer - (sign * steer_adjustment)
+    else: final_steer = base_steer + (sign * steer_adjustment)
+    return max(min(final_steer, math.radians(MAX_STEER_DEG)), -math.radians(MAX_STEER_DEG))
+
+
+def distance_for_steps(steps, step_dist=STEP_DIST):
+    # DriveRun 이 int(distance/step_dist) 로 같은 스텝 수를 얻는 짧은 거리 값 (소수 셋째 자리)
+    distance = round(steps * step_dist, 3)
+    while int(distance / step_dist) < steps: distance = round(distance + 0.001, 3)
+    return distance
+
+
+def arc_step(x, y, yaw_tractor, yaw_trailer, steer_rad, ds, tractor_wb=TRACTOR_WB, trailer_len=9.5):
+    """조향각을 고정한 채 부호 있는 거리 ds 만큼 주행한 정확한 해.
+
+    트랙터(킹핀)는 곡률 tan(steer)/wb 인 원호를 따라가고, 꺾임각 phi = yaw_tractor - yaw_trailer 는
+    dphi/ds = k - sin(phi)/L 을 만족합니다. t = tan(phi/2) 로 치환하면 계수가 상수인 Riccati 방정식이
+    되고, 이를 2x2 선형계 exp(M*ds) 로 풀어 적분 오차 없이 계산합니다. (x, y, yaw_tractor, yaw_trailer) 반환.
+    """
+    k = math.tan(steer_rad) / tractor_wb
+    # atan2 의 2pi 모호성을 피하기 위해 한 구간에서 phi 가 반 바퀴 이상 돌지 않도록 나눔
+    pieces = max(1, math.ceil(abs(ds) * (abs(k) + 1.0/trailer_len) / math.pi))
+    h = ds / pieces
+    w2 = 0.25 / trailer_len**2 - 0.25 * k * k
+    if w2 > 1e-18:
+        w = math.sqrt(w2); c = math.cosh(w*h); sn = math.sinh(w*h) / w
+    elif w2 < -1e-18:
+        w = math.sqrt(-w2); c = math.cos(w*h); sn = math.sin(w*h) / w
+    else:
+        c = 1.0; sn = h
+    half_turn = 0.5 * k * h
+    chord = h if abs(half_turn) < 1e-12 else h * math.sin(half_turn) / half_turn
+    phi = yaw_tractor - yaw_trailer
+    for _ in range(pieces):
+        x += chord * math.cos(yaw_tractor + half_turn); y += chord * math.sin(yaw_tractor + half_turn)
+        yaw_tractor += 2.0 * half_turn
+        u = math.sin(phi/2); v = math.cos(phi/2)
+        u, v = c*u + sn*(-u/(2*trailer_len) + 0.5*k*v), c*v + sn*(-0.5*k*u + v/(2*trailer_len))
+        dhalf = math.atan2(u, v) - phi/2
+        phi += 2.0 * math.atan2(math.sin(dhalf), math.cos(dhalf))
+    return x, y, yaw_tractor, yaw_tractor - phi
+
+
+def axle_definitions(tractor_wb=TRACTOR_WB):
+    tractor_axles = {'front': tractor_wb, 'rear1': 0.65, 'rear2': -0.65}
+    trailer_axles = {'tr_rear1': 1.1/2, 'tr_rear2': -1.1/2}
+    return tractor_axles, trailer_axles
+
+
+def wheel_positions(state, trailer_len, tractor_wb=TRACTOR_WB, tractor_width=TRACTOR_WIDTH):
+    positions = {}; tractor_axles, trailer_axles = axle_definitions(tractor_wb); half_w = tractor_width/2.0
+    cos_t = math.cos(state['yaw_tractor']); sin_t = math.sin(state['yaw_tractor'])
+    # 트랙터 축: 조향각은 바퀴의 회전에만 영향을 주고 위치에는 영향이 없음
+    for name, dist in tractor_axles.items():
+        axle_x = state['x'] + dist * cos_t
+        axle_y = state['y'] + dist * sin_t
+        positions[f't_{name}_l'] = (axle_x - half_w * sin_t, axle_y + half_w * cos_t)
+        positions[f't_{name}_r'] = (axle_x + half_w * sin_t, axle_y - half_w * cos_t)
+
+    # 트레일러 축: 킹핀에서 (trailer_len - 0.5)m 뒤가 뒷바퀴 축의 중심
+    cos_r = math.cos(state['yaw_trailer']); sin_r = math.sin(state['yaw_trailer'])
+    effective_trailer_len_for_wheels = trailer_len - 0.5
+    trailer_pivot_x = state['x'] - effective_trailer_len_for_wheels * cos_r
+    trailer_pivot_y = state['y'] - effective_trailer_len_for_wheels * sin_r
+    for name, dist in trailer_axles.items():
+        axle_x = trailer_pivot_x + dist * cos_r
+        axle_y = trailer_pivot_y + dist * sin_r
+        positions[f'{name}_l'] = (axle_x + half_w * sin_r, axle_y - half_w * cos_r)
+        positions[f'{name}_r'] = (axle_x - half_w * sin_r, axle_y + half_w * cos_r)
+    return positions
+
+
+def _rect(cx, cy, yaw, length, width):
+    c = math.cos(yaw); s = math.sin(yaw)
+    return [(cx + lx*c - ly*s, cy + lx*s + ly*c)
+            for lx, ly in ((length/2, width/2), (length/2, -width/2), (-length/2, -width/2), (-length/2, width/2))]
+
+
+def body_polygons(state, steer_rad, trailer_len, tractor_wb=TRACTOR_WB, tractor_width=TRACTOR_WIDTH, trailer_swing_len=TRAILER_SWING_LEN):
+    """화면에 그리는 차체(_draw_truck)와 같은 크기의 다각형 {부위 이름: [(x, y), ...]} (선 접촉 검사용)."""
+    yaw_t = state['yaw_tractor']; yaw_r = state['yaw_trailer']
+    ct = math.cos(yaw_t); st = math.sin(yaw_t); cr = math.cos(yaw_r); sr = math.sin(yaw_r)
+    x = state['x']; y = state['y']
+    polygons = {}
+    cab_center = (tractor_wb - 0.5) - 0.125
+    polygons['cab'] = _rect(x + cab_center*ct, y + cab_center*st, yaw_t, 2.25, tractor_width)
+    polygons['swing'] = _rect(x + 0.625*ct, y + 0.625*st, yaw_t, 3.25, tractor_width)
+    # 구즈넥: 킹핀 0.5m 앞에서 1.5m 뒤까지의 사다리꼴
+    gx = x - (trailer_swing_len/2 - 0.5)*cr; gy = y - (trailer_swing_len/2 - 0.5)*sr
+    polygons['gooseneck'] = [(gx + lx*cr - ly*sr, gy + lx*sr + ly*cr) for lx, ly in (
+        (trailer_swing_len/2, tractor_width/4), (trailer_swing_len/2, -tractor_width/4),
+        (-trailer_swing_len/2, -tractor_width/2), (-trailer_swing_len/2, tractor_width/2))]
+    container_len = trailer_len + 1.0 - trailer_swing_len
+    container_center = 1.5 + container_len/2
+    polygons['container'] = _rect(x - container_center*cr, y - container_center*sr, yaw_r, container_len, tractor_width)
+    for name, (wx, wy) in wheel_positions(state, trailer_len, tractor_wb, tractor_width).items():
+        front = 'front' in name
+        yaw = (yaw_t + steer_rad) if front else (yaw_t if name.startswith('t_') else yaw_r)
+        polygons[f'wheel.{name}'] = _rect(wx, wy, yaw, 0.8, 0.3 if front else 0.5)
+    return polygons
+
+
+class KinematicsEngine:
+    """차량 상태(킹핀 위치, 트랙터/트레일러 yaw)와 한 스텝 적분 로직."""
+
+    def __init__(self, trailer_len=11.5 - TRAILER_SWING_LEN, tractor_wb=TRACTOR_WB, tractor_width=TRACTOR_WIDTH):
+        self.tractor_wb = tractor_wb
+        self.trailer_len = trailer_len   # 핑크색 본체 길이 (총 길이 - 구즈넥)
+        self.tractor_width = tractor_width
+        self.x = 0.0; self.y = 0.0; self.yaw_tractor = math.pi; self.yaw_trailer = math.pi
+
+    def get_state(self):
+        return {'x': self.x, 'y': self.y, 'yaw_tractor': self.yaw_tractor, 'yaw_trailer': self.yaw_trailer}
+
+    def set_state(self, state):
+        self.x = state['x']; self.y = state['y']
+        self.yaw_tractor = state['yaw_tractor']; self.yaw_trailer = state['yaw_trailer']
+
+    def articulation_degrees(self):
+        return normalized_articulation_degrees(self.yaw_tractor, self.yaw_trailer)
+
+    def steer_for_maintenance(self):
+        # Use raw diff for maintenance calculation
+        return steer_for_angle_maintenance(self.yaw_tractor - self.yaw_trailer, self.tractor_wb, self.trailer_len)
+
+    def steer_for_mpc(self, target_phi, direction):
+        from truck_mpc import mpc_steer
+        return mpc_steer(self.yaw_tractor - self.yaw_trailer, target_phi, direction, self.tractor_wb, self.trailer_len)
+
+    def wheel_positions(self, state=None):
+        return wheel_positions(state or self.get_state(), self.trailer_len, self.tractor_wb, self.tractor_width)
+
+    def step(self, steer_rad, direction, step_dist=STEP_DIST):
+        v = step_dist*direction
+        self.x += v*math.cos(self.yaw_tractor); self.y += v*math.sin(self.yaw_tractor)
+        self.yaw_tractor += (v/self.tractor_wb)*math.tan(steer_rad)
+        angle_diff = self.yaw_tractor - self.yaw_trailer
+        delta_yaw_trailer = (step_dist/self.trailer_len)*math.sin(angle_diff)
+        if direction == 1: self.yaw_trailer += delta_yaw_trailer
+        else: self.yaw_trailer -= delta_yaw_trailer
+
+    def arc_step(self, steer_rad, direction, distance):
+        self.x, self.y, self.yaw_tractor, self.yaw_trailer = arc_step(
+            self.x, self.y, self.yaw_tractor, self.yaw_trailer, steer_rad, distance*direction, self.tractor_wb, self.trailer_len)
+
+    def start_drive(self, distance, direction, mode="manual", steer_rad=0.0, target_angle=None, step_dist=None, integrator="euler"):
+        # integrator: "euler" (기존 0.078m 고정 스텝, 시뮬레이터 화면과 동일) 또는 "arc" (정확해 + 적응형 스텝).
+        # arc 에서는 step_dist 가 최대 스텝 길이입니다.
+        if integrator == "arc":
+            return ArcDriveRun(self, distance, direction, mode, steer_rad, target_angle, step_dist or ARC_MAX_STEP)
+        return DriveRun(self, distance, direction, mode, steer_rad, target_angle, step_dist or STEP_DIST)
+
+    def drive(self, distance, steer_rad=0.0, mode="manual", direction=1, target_angle=None, step_dist=None, on_step=None, integrator="euler"):
+        # 한 번의 주행(조작)을 끝까지 실행하고 DriveRun 을 반환합니다.
+        run = self.start_drive(distance, direction, mode, steer_rad, target_angle, step_dist, integrator)
+        while run.tick() is None:
+            if on_step: on_step(run)
+        return run
+
+
+def _mpc_target(engine, mode, target_angle, steer_rad, direction):
+    # 'mpc' 모드의 부호 있는 목표 꺾임각 (rad). 다른 모드이거나 목표 각도가 없으면 None
+    if mode != 'mpc' or target_angle is None: return None
+    from truck_mpc import signed_target
+    phi = engine.yaw_tractor - engine.yaw_trailer
+    return signed_target(math.atan2(math.sin(phi), math.cos(phi)), math.radians(target_angle), steer_rad, direction)
+
+
+class DriveRun:
+    """한 번의 주행 조작. tick() 한 번이 기존 animate_step 한 번과 같습니다.
+
+    tick() 은 주행이 계속되면 None, 끝나면 종료 사유('completed', 'jackknife',
+    'target_reached')를 반환합니다. 'mpc' 모드는 매 스텝 truck_mpc 제어기로 조향각을 정해
+    목표 꺾임각까지 간 뒤 유지하며, 'maintain' 처럼 거리를 다 갈 때까지 주행합니다.
+    """
+
+    def __init__(self, engine, distance, direction, mode="manual", steer_rad=0.0, target_angle=None, step_dist=STEP_DIST):
+        self.engine = engine
+        self.direction = direction
+        self.mode = mode
+        self.steer_rad = steer_rad
+        self.target_angle = target_angle
+        self.step_dist = step_dist
+        self.steps_total = int(distance/step_dist)
+        self.steps_left = self.steps_total
+        self.status = None
+        self.articulation_deg = engine.articulation_degrees()
+        self.initial_angle_for_stop = None
+        self.previous_angle_error = None
+        if mode == 'stop_at_target' and target_angle is not None:
+            self.initial_angle_for_stop = abs(self.articulation_deg)
+            self.previous_angle_error = abs(self.articulation_deg) - target_angle
+        self.mpc_target = _mpc_target(engine, mode, target_angle, steer_rad, direction)
+
+    @property
+    def distance_travelled(self):
+        return (self.steps_total - self.steps_left) * self.step_dist
+
+    def tick(self, steer_rad=None):
+        # steer_rad: 수동 조향일 때 이번 스텝에 사용할 조향각 (None 이면 이전 값 유지)
+        if self.status is not None:
+            return self.status
+        engine = self.engine
+        self.articulation_deg = engine.articulation_degrees()
+
+        # --- v10: 잭나이프(Jackknife) 방지 --- 전진 시에만 적용
+        if abs(self.articulation_deg) > JACKKNIFE_LIMIT_DEG and self.direction == 1:
+            self.status = 'jackknife'; return self.status
+
+        if self.mode == 'stop_at_target' and self.target_angle is not None and self.initial_angle_for_stop is not None:
+            current_error = abs(self.articulation_deg) - self.target_angle
+            if abs(current_error) < TARGET_TOLERANCE_DEG or (self.previous_angle_error is not None and (current_error * self.previous_angle_error) <= 0):
+                self.status = 'target_reached'; return self.status
+            self.previous_angle_error = current_error
+
+        if self.steps_left <= 0:
+            self.status = 'completed'; return self.status
+
+        if steer_rad is not None:
+            self.steer_rad = steer_rad
+        if self.mode == 'maintain':
+            self.steer_rad = engine.steer_for_maintenance()
+        elif self.mpc_target is not None:
+            self.steer_rad = engine.steer_for_mpc(self.mpc_target, self.direction)
+
+        engine.step(self.steer_rad, self.direction, self.step_dist)
+        self.steps_left -= 1
+        return None
+
+
+def crossing_level(phi0, phi1, angle_rad):
+    """꺾임각이 phi0 -> phi1 로 단조 변할 때 처음으로 |wrap(phi)| == angle_rad 가 되는 phi 값.
+
+    phi0 자신은 제외하며, 구간 안에 없으면 None. (arc_step 구간 안에서 phi 는 단조입니다.)
+    """
+    two_pi = 2*math.pi
+    best = None
+    for level in (angle_rad, -angle_rad):
+        if phi1 > phi0:
+            level += two_pi * math.floor((phi0 - level) / two_pi + 1)   # phi0 보다 큰 첫 값
+            if level <= phi1 and (best is None or level < best): best = level
+        elif phi1 < phi0:
+            level += two_pi * math.ceil((phi0 - level) / two_pi - 1)    # phi0 보다 작은 첫 값
+            if level >= phi1 and (best is None or level > best): best = level
+    return best
+
+
+def arc_crossing_distance(start, steer_rad, ds, level, tractor_wb=TRACTOR_WB, trailer_len=9.5, tol=1e-10):
+    # start 에서 부호 있는 거리 ds 안에서 꺾임각(yaw_tractor - yaw_trailer)이 level 이 되는 거리 |s| (Illinois 법)
+    def f(s):
+        _, _, yaw_tractor, yaw_trailer = arc_step(*start, steer_rad, math.copysign(s, ds), tractor_wb, trailer_len)
+        return yaw_tractor - yaw_trailer - level
+    lo, hi = 0.0, abs(ds); f_lo, f_hi = f(lo), f(hi)
+    if f_hi == 0: return hi
+    side = 0
+    for _ in range(100):
+        s = (lo*f_hi - hi*f_lo) / (f_hi - f_lo)
+        f_s = f(s)
+        if f_s == 0 or hi - lo < tol: return s
+        if (f_s > 0) == (f_hi > 0):
+            hi, f_hi = s, f_s
+            if side == -1: f_lo *= 0.5
+            side = -1
+        else:
+            lo, f_lo = s, f_s
+            if side == 1: f_hi *= 0.5
+            side = 1
+    return s
+
+
+class ArcDriveRun:
+    """arc_step 으로 주행하는 DriveRun. tick() 한 번이 가변 길이 스텝 하나입니다.
+
+    스텝 길이는 트랙터/트레일러 yaw 변화가 max_turn 이하가 되도록 매 스텝 조절하므로
+    직진에 가까우면 max_step 까지 늘어나고 급회전에서는 줄어듭니다.
+
+    정지 조건은 스텝 끝점이 아니라 연속 구간에서 찾습니다. 한 스텝 안에서 꺾임각이
+    목표 각도(stop_at_target) 또는 잭나이프 한계(전진 시)를 지나면 그 지점을 근 찾기로
+    구해 정확히 거기서 멈추고, 주행 시작부터의 거리를 event_distance 에 남깁니다.
+    잭나이프는 [-90, 90] 으로 접지 않은 꺾임각(-180 ~ 180)으로 판단합니다.
+    """
+
+    def __init__(self, engine, distance, direction, mode="manual", steer_rad=0.0, target_angle=None,
+                 max_step=ARC_MAX_STEP, max_turn=math.radians(ARC_MAX_TURN_DEG)):
+        self.engine = engine
+        self.distance = distance
+        self.direction = direction
+        self.mode = mode
+        self.steer_rad = steer_rad
+        self.target_angle = target_angle
+        self.max_step = max_step
+        self.max_turn = max_turn
+        self.distance_travelled = 0.0
+        self.steps = 0
+        self.last_step = 0.0
+        self.status = None
+        self.event_distance = None
+        self._pending = None
+        self._h = max_step
+        self.articulation_deg = engine.articulation_degrees()
+        self.stop_at_target = mode == 'stop_at_target' and target_angle is not None
+        self.mpc_target = _mpc_target(engine, mode, target_angle, steer_rad, direction)
+        if self.mpc_target is not None: self.max_step = min(max_step, STEP_DIST)   # 제어기가 오일러 스텝 기준으로 예측
+
+    @property
+    def distance_left(self):
+        return self.distance - self.distance_travelled
+
+    def _finish(self, status):
+        self.status = status
+        if self.event_distance is None: self.event_distance = self.distance_travelled
+        return status
+
+    def tick(self, steer_rad=None):
+        if self.status is not None:
+            return self.status
+        engine = self.engine
+        self.articulation_deg = engine.articulation_degrees()
+        if self._pending:
+            return self._finish(self._pending)
+
+        if self.steps == 0:
+            # 출발 시점에 이미 조건을 만족하는 경우
+            raw = math.degrees(math.atan2(math.sin(engine.yaw_tractor - engine.yaw_trailer), math.cos(engine.yaw_tractor - engine.yaw_trailer)))
+            if abs(raw) > JACKKNIFE_LIMIT_DEG and self.direction == 1:
+                return self._finish('jackknife')
+            if self.stop_at_target and abs(abs(self.articulation_deg) - self.target_angle) < TARGET_TOLERANCE_DEG:
+                return self._finish('target_reached')
+
+        if self.distance_left <= 1e-9:
+            return self._finish('completed')
+
+        if steer_rad is not None:
+            self.steer_rad = steer_rad
+        if self.mode == 'maintain':
+            self.steer_rad = engine.steer_for_maintenance()
+        elif self.mpc_target is not None:
+            self.steer_rad = engine.steer_for_mpc(self.mpc_target, self.direction)
+
+        # 적응형 스텝: yaw 변화가 max_turn 을 넘으면 줄여서 다시 계산
+        start = (engine.x, engine.y, engine.yaw_tractor, engine.yaw_trailer)
+        h = min(self._h, self.distance_left)
+        while True:
+            end = arc_step(*start, self.steer_rad, h*self.direction, engine.tractor_wb, engine.trailer_len)
+            turn = max(abs(end[2] - start[2]), abs(end[3] - start[3]))
+            if turn <= self.max_turn or h <= ARC_MIN_STEP: break
+            h = max(h * max(0.2, 0.9 * self.max_turn / turn), ARC_MIN_STEP)
+        self._h = min(self.max_step, h * (2.0 if turn == 0 else min(2.0, 0.9 * self.max_turn / turn)))
+
+        # 이번 스텝 안에서 처음 만나는 정지 조건
+        phi0 = start[2] - start[3]; phi1 = end[2] - end[3]
+        events = []
+        if self.direction == 1:
+            events.append((crossing_level(phi0, phi1, math.radians(JACKKNIFE_LIMIT_DEG)), 'jackknife'))
+        if self.stop_at_target:
+            events.append((crossing_level(phi0, phi1, math.radians(self.target_angle)), 'target_reached'))
+        events = [(abs(level - phi0), level, status) for level, status in events if level is not None]
+        if events:
+            _, level, status = min(events)
+            h = arc_crossing_distance(start, self.steer_rad, h*self.direction, level, engine.tractor_wb, engine.trailer_len)
+            end = arc_step(*start, self.steer_rad, h*self.direction, engine.tractor_wb, engine.trailer_len)
+            self._pending = status; self.event_distance = self.distance_travelled + h
+
+        engine.x, engine.y, engine.yaw_tractor, engine.yaw_trailer = end
+        self.distance_travelled += h; self.last_step = h; self.steps += 1
+        return None
+
+
+class FixedStepClock:
+    """화면 갱신과 분리된 고정 스텝 시뮬레이션 시계.
+
+    실제 경과 시간 * speed 만큼의 거리를 step_dist 단위 스텝 수로 바꿔 돌려줍니다.
+    렌더링이 늦어지면 한 프레임에 여러 스텝을 진행하므로(최대 max_steps_per_frame)
+    주행 속도는 화면 프레임 수와 무관하게 유지됩니다.
+    """
+
+    def __init__(self, speed=DRIVE_SPEED, step_dist=STEP_DIST, max_steps_per_frame=64):
+        self.speed = speed
+        self.step_dist = step_dist
+        self.max_steps_per_frame = max_steps_per_frame
+        self.last_time = None
+        self.accumulator = 0.0
+
+    def start(self, now):
+        self.last_time = now
+        self.accumulator = 1.0  # 첫 프레임에서 바로 한 스텝 진행
+
+    def steps_due(self, now):
+        self.accumulator += (now - self.last_time) * self.speed / self.step_dist
+        self.last_time = now
+        steps = min(int(self.accumulator), self.max_steps_per_frame)
+        self.accumulator = min(self.accumulator - steps, float(self.max_steps_per_frame))
+        return steps
@@ -0,0 +1,174 @@
+"""화면 배율에 따른 상세도(LOD)와 화면 밖 도형 생략 (viewport culling).
+
+마우스 휠로 pixels_per_meter 를 바꿀 수 있으므로, 한 프레임에 그리는 양이 배율과 관계없이 비슷하도록
+
+- 축소: 컨테이너 리브(약 30개)와 바퀴 테두리는 화면에서 구분되지 않을 만큼 작아지면 생략합니다.
+  바퀴 궤적은 화면 해상도(tolerance_px)보다 촘촘한 점을 버립니다. 월드 좌표 격자(한 칸 = tolerance_px)의
+  칸이 바뀌는 점만 남기므로 버린 점은 남긴 점에서 한 칸 대각선 이내이고, 뷰 이동과 무관하게 같은 점이 남습니다.
+- 확대: 궤적은 화면 주변 창(window = 화면 + 사방으로 margin 배) 안을 지나는 구간만 조각으로 나눠 그립니다.
+  화면이 창을 벗어나면 창을 새로 잡고 다시 그리고, 그 전까지는 레이어 move 와 새 점 덧붙이기만 합니다.
+  쓸고 간 면적 타일과 차량은 화면과 겹칠 때만 그립니다.
+
+    lod = LevelOfDetail()
+    trail = DrawnTrail(path, lod.window(view), lod.cell(ppm))    # 전체 재투영: trail.coords 의 조각들을 그림
+    drop, trim, coords = trail.extend(path, window, cell)        # 새 점만 (None 이면 다시 만들어야 함)
+"""
+from collections import deque
+import math
+
+import numpy as np
+
+ZOOM_STEP = 1.2             # 휠 한 칸의 배율
+MIN_PIXELS_PER_METER = 2.0  # 코스 전체(약 70m)가 900px 화면에 여유 있게 들어가는 배율보다 작게
+MAX_PIXELS_PER_METER = 120.0
+PATH_TOLERANCE_PX = 1.0     # 궤적 단순화 허용 오차 (화면 픽셀)
+RIB_MIN_SPACING_PX = 4.0    # 리브 간격이 이보다 좁으면 생략
+WHEEL_OUTLINE_MIN_PX = 3.0  # 바퀴 폭이 이보다 좁으면 테두리 생략
+WINDOW_MARGIN = 0.5         # 궤적 창: 화면 크기의 0.5 배씩 사방으로
+GRID_STEPS = (5, 10, 25, 50, 100)   # 격자 간격 후보 (m)
+GRID_MIN_PX = 40            # 격자 간격이 이보다 좁아지면 다음 후보
+
+
+class LevelOfDetail:
+    """배율별 상세도 규칙. enabled=False 면 모든 점/도형을 그립니다 (벤치마크 비교용)."""
+
+    def __init__(self, enabled=True, tolerance_px=PATH_TOLERANCE_PX, margin=WINDOW_MARGIN):
+        self.enabled = enabled
+        self.tolerance_px = tolerance_px
+        self.margin = margin
+
+    def ribs(self, pixels_per_meter, spacing):
+        return not self.enabled or spacing * pixels_per_meter >= RIB_MIN_SPACING_PX
+
+    def wheel_outline(self, pixels_per_meter, width):
+        return not self.enabled or width * pixels_per_meter >= WHEEL_OUTLINE_MIN_PX
+
+    def cell(self, pixels_per_meter):
+        # 궤적 단순화 격자 한 칸 (m), 0 이면 단순화하지 않음
+        return self.tolerance_px / pixels_per_meter if self.enabled and self.tolerance_px > 0 else 0.0
+
+    def grid_step(self, pixels_per_meter):
+        if not self.enabled: return GRID_STEPS[0]
+        return next((step for step in GRID_STEPS if step * pixels_per_meter >= GRID_MIN_PX), GRID_STEPS[-1])
+
+    def window(self, view):
+        # 화면(월드 좌표 사각형 left, bottom, right, top) 주변의 궤적 창, LOD 를 끄면 None (제한 없음)
+        if not self.enabled: return None
+        left, bottom, right, top = view
+        mx = (right - left) * self.margin; my = (top - bottom) * self.margin
+        return left - mx, bottom - my, right + mx, top + my
+
+    def visible(self, view, bounds):
+        # bounds (left, bottom, right, top) 가 화면과 겹치는지 (LOD 를 끄면 항상 True)
+        return not self.enabled or rects_overlap(view, bounds)
+
+
+def window_contains(window, view):
+    """창이 화면 전체를 담는지 (창이 None 이면 항상 True)."""
+    return window is None or (window[0] <= view[0] and window[1] <= view[1] and view[2] <= window[2] and view[3] <= window[3])
+
+
+def rects_overlap(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def runs_in_rect(xy, rect):
+    """점 배열 (n, 2) 의 선분 중 바운딩 박스가 rect 와 겹치는 연속 구간: [(첫 점, 끝 점), ...] (끝 포함)."""
+    n = len(xy)
+    if n < 2: return []
+    if rect is None: return [(0, n - 1)]
+    x = xy[:, 0]; y = xy[:, 1]
+    seg = ((np.maximum(x[:-1], x[1:]) >= rect[0]) & (np.minimum(x[:-1], x[1:]) <= rect[2])
+           & (np.maximum(y[:-1], y[1:]) >= rect[1]) & (np.minimum(y[:-1], y[1:]) <= rect[3]))
+    edges = np.diff(np.concatenate(([0], seg.view(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def grid_cells(xy, cell):
+    return np.floor(xy / cell).astype(np.int64)
+
+
+def decimate(xy, cell, previous_cell=None):
+    """격자 칸이 직전 점과 달라지는 점만 남기는 마스크.
+
+    previous_cell 이 없으면 (새 조각) 첫 점과 끝 점은 항상 남기고, 있으면 (덧붙이기) 그 칸에 이어서 판정합니다.
+    cell 이 0 이면 모두 남깁니다."""
+    n = len(xy)
+    if cell <= 0 or n == 0: return np.ones(n, dtype=bool)
+    cells = grid_cells(xy, cell)
+    keep = np.empty(n, dtype=bool)
+    keep[1:] = (cells[1:] != cells[:-1]).any(axis=1)
+    if previous_cell is None:
+        keep[0] = True; keep[-1] = True
+    else:
+        keep[0] = bool((cells[0] != previous_cell).any())
+    return keep
+
+
+class DrawnTrail:
+    """화면에 그린 바퀴 궤적 하나. 창 안을 지나는 조각마다 남긴 점의 누적 인덱스를 보관해
+    오래된 점이 버퍼에서 밀려날 때 캔버스 선 앞쪽에서 지울 점의 개수를 셉니다."""
+
+    def __init__(self, path, window, cell):
+        self.path = path; self.total = path.total; self.cell = cell
+        xy = np.frombuffer(path.flat(), dtype=float).reshape(-1, 2)
+        first = path.total - len(xy)
+        self.pieces = []   # [deque(누적 인덱스), ...]
+        self.coords = []   # 조각별 [x0, y0, x1, y1, ...] (월드 좌표)
+        for start, end in runs_in_rect(xy, window):
+            kept = np.flatnonzero(decimate(xy[start:end + 1], cell)) + start
+            self.pieces.append(deque((kept + first).tolist()))
+            self.coords.append(xy[kept].ravel().tolist())
+        # 마지막 조각이 궤적 끝까지 이어지면 새 점을 그 조각에 덧붙임
+        self.open = bool(self.pieces) and self.pieces[-1][-1] == path.total - 1
+        self._last = tuple(xy[-1].tolist()) if len(xy) else None
+
+    def extend(self, path, window, cell):
+        """새로 추가된 점을 반영: (첫 조각 앞에서 지울 점 개수, 마지막 조각에서 지울 점의 위치 또는 None,
+        마지막 조각에 덧붙일 좌표). 궤적 저장소가 마지막(임시) 점을 덮어썼으면 그 점도 새 점으로 다시 판정합니다.
+        창을 드나드는 등 조각 구성이 바뀌면 None (DrawnTrail 을 다시 만들어야 함).
+        프레임마다 새 점은 몇 개뿐이라 NumPy 대신 파이썬으로 계산합니다."""
+        new = path.total - self.total
+        if path is not self.path or cell != self.cell or new < 0 or new >= len(path): return None
+        flat = path.flat(new + 2)
+        replaced = self._last is not None and (flat[-2*new - 2], flat[-2*new - 1]) != self._last
+        if replaced:
+            if len(flat) < 2*new + 4: return None
+            new += 1; prev = (flat[0], flat[1])
+        else:
+            prev = self._last
+        oldest = path.total - len(path)
+        drop = 0
+        if self.pieces:
+            first = self.pieces[0]
+            while first and first[0] < oldest:
+                first.popleft(); drop += 1
+            if drop and len(first) < 2: return None
+        trim = None
+        if replaced and self.open and self.pieces[-1][-1] == self.total - 1:
+            piece = self.pieces[-1]
+            if len(piece) < 3: return None
+            piece.pop(); trim = len(piece)
+        coords = []
+        if new:
+            flat = flat[-2*new:]; xs = flat[0::2]; ys = flat[1::2]
+            if window is not None:
+                if self.open:
+                    # 창(볼록)이 새 점을 모두 담으면 직전 점과 잇는 선분도 창 안
+                    if not (window[0] <= min(xs) and max(xs) <= window[2] and window[1] <= min(ys) and max(ys) <= window[3]): return None
+                elif rects_overlap(window, (min(min(xs), prev[0]), min(min(ys), prev[1]),
+                                            max(max(xs), prev[0]), max(max(ys), prev[1]))):
+                    return None   # 창 밖에 있던 끝이 창으로 들어올 수 있음
+            if self.open:
+                piece = self.pieces[-1]; start = path.total - new
+                if cell > 0:
+                    px, py = math.floor(prev[0] / cell), math.floor(prev[1] / cell)
+                    for i, (x, y) in enumerate(zip(xs, ys)):
+                        cx, cy = math.floor(x / cell), math.floor(y / cell)
+                        if cx != px or cy != py:
+                            piece.append(start + i); coords += (x, y)
+                        px, py = cx, cy
+                else:
+                    piece.extend(range(start, path.total)); coords = list(flat)
+            self._last = (xs[-1], ys[-1]); self.total = path.total
+        return drop, trim, coords
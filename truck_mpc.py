@@ -0,0 +1,95 @@
+"""목표 꺾임각 예측 제어 (MPC) 조향.
+
+'mpc' 제어 모드에서 DriveRun 이 매 스텝 부르는 조향 제어기입니다. 조향각 후보(-40 ~ 40°, 1° 간격)
+마다 조향을 고정하고 HORIZON_STEPS 스텝 앞까지 미리 주행해 보고, 목표 꺾임각에 넘어서지 않고
+(TARGET_TOLERANCE_DEG 안에서) 가장 짧은 거리에 닿는 조향각을 고릅니다. 목표에 닿으면 꺾임각을
+그대로 유지하는 조향각으로 바꿉니다 (maintain 모드와 같은 역할, 남은 오차는 천천히 줄임).
+
+꺾임각 phi = yaw_tractor - yaw_trailer 의 변화는 위치와 무관하게 phi 와 조향각만으로 정해지므로
+(KinematicsEngine.step 과 같은 순서로
+    phi' = phi + d * (step / wb) * tan(steer);  phi_next = phi' - d * (step / L) * sin(phi')
+) 미리 주행은 후보 수만큼의 1차원 배열 하나를 NumPy 로 HORIZON_STEPS 번 갱신하면 됩니다. 모델이
+엔진의 오일러 적분과 같으므로 예측과 실제 주행이 어긋나지 않습니다. 한 번 계산은 1 ms 안쪽입니다
+(10 ms 화면 스텝 예산).
+
+    steer = mpc_steer(phi, signed_target(phi, math.radians(45), steer_rad, direction), direction, wb, trailer_len)
+"""
+import math
+
+import numpy as np
+
+import truck_kinematics as kin
+
+HORIZON_STEPS = 64                    # 미리 주행하는 거리: 64 스텝 (약 5m)
+CANDIDATE_STEERS = np.radians(np.arange(-kin.MAX_STEER_DEG, kin.MAX_STEER_DEG + 1))
+HOLD_GAIN = 0.1                       # 유지 구간에서 한 스텝에 줄이는 오차 비율
+SIGN_DEADBAND = math.radians(0.5)     # 꺾임각이 이보다 작으면 조향 방향으로 목표 쪽을 정함
+
+_TAN_CANDIDATES = np.tan(CANDIDATE_STEERS)
+
+
+def signed_target(phi, target_rad, steer_rad, direction):
+    """목표 꺾임각(크기)에 방향을 붙임: 지금 꺾인 쪽, 거의 직선이면 지금 조향으로 꺾이는 쪽."""
+    if abs(phi) > SIGN_DEADBAND: return math.copysign(target_rad, phi)
+    if steer_rad * direction < 0: return -target_rad
+    return target_rad
+
+
+def hold_steer(phi, target_phi, direction, tractor_wb, trailer_len, step_dist=kin.STEP_DIST):
+    # 다음 스텝의 꺾임각이 phi + HOLD_GAIN * (target - phi) 가 되는 조향각 (오일러 스텝을 정확히 풀어 씀).
+    # phi_next = u - d*(step/L)*sin(u), u = phi + d*(step/wb)*tan(steer) -> u 는 고정점 반복 (step/L 가 작아 빠르게 수렴)
+    wanted = phi + HOLD_GAIN * (target_phi - phi)
+    k = direction * step_dist / trailer_len
+    u = wanted
+    for _ in range(4): u = wanted + k * np.sin(u)
+    steer = np.arctan((u - phi) * tractor_wb / (direction * step_dist))
+    limit = math.radians(kin.MAX_STEER_DEG)
+    return np.clip(steer, -limit, limit)
+
+
+def mpc_steer(phi, target_phi, direction, tractor_wb, trailer_len, step_dist=kin.STEP_DIST, horizon=HORIZON_STEPS):
+    """현재 꺾임각 phi (rad) 에서 target_phi (부호 있는 목표) 로 가는 이번 스텝의 조향각 (rad).
+
+    인자는 스칼라 또는 같은 길이의 배열 (batch_rollout 에서 N 대를 한꺼번에 계산)."""
+    scalar = np.ndim(phi) == 0
+    phi, target_phi, direction, trailer_len = (np.atleast_1d(np.asarray(a, dtype=float)) for a in
+                                               np.broadcast_arrays(phi, target_phi, direction, trailer_len))
+    phi = np.arctan2(np.sin(phi), np.cos(phi))
+    error = phi - target_phi
+    tolerance = math.radians(kin.TARGET_TOLERANCE_DEG)
+    holding = np.abs(error) < tolerance
+    steer = hold_steer(phi, target_phi, direction, tractor_wb, trailer_len, step_dist)
+
+    rows = np.flatnonzero(~holding)
+    if len(rows):
+        # 후보 조향각마다 조향 고정 주행: (행, 후보) 배열
+        d = direction[rows, None]; L = trailer_len[rows, None]
+        start_error = error[rows, None]; target = target_phi[rows, None]
+        p = np.repeat(phi[rows, None], len(CANDIDATE_STEERS), axis=1)
+        turn = d * (step_dist / tractor_wb) * _TAN_CANDIDATES
+        follow = d * (step_dist / L)
+        never = horizon + 1
+        reach = np.full(p.shape, never, dtype=np.int64)
+        reach_error = np.full(p.shape, np.inf)
+        jackknife = math.radians(kin.JACKKNIFE_LIMIT_DEG)
+        for step in range(1, horizon + 1):
+            p += turn
+            p -= follow * np.sin(p)
+            e = p - target
+            new = (reach == never) & ((e * start_error <= 0) | (np.abs(e) < tolerance))
+            reach[new] = step; reach_error[new] = np.abs(e[new])
+            # 전진 잭나이프 한계를 먼저 넘는 후보는 쓰지 않음
+            bad = (reach == never) & (d > 0) & (np.abs(p) > jackknife)
+            reach[bad] = 0; reach_error[bad] = np.inf
+            if not (reach == never).any(): break
+        final_error = np.abs(p - target)
+        # 넘어서지 않고 닿는 후보 중 가장 짧은 거리, 같으면 오차가 작은 것.
+        # 예측 구간 안에 닿는 후보가 없으면 넘어서지 않은 후보 중 끝에서 가장 가까운 것
+        reached = (reach > 0) & (reach < never) & (reach_error < tolerance)
+        cost = np.where(reached, reach + reach_error / tolerance,
+                        np.where(reach == never, never + 1 + final_error, np.inf))
+        best = np.argmin(cost, axis=1)
+        # 모든 후보가 넘어서면 (한 스텝에 목표를 지나칠 만큼 가까움) 유지 조향 그대로
+        chosen = np.isfinite(cost[np.arange(len(rows)), best])
+        steer[rows[chosen]] = CANDIDATE_STEERS[best[chosen]]
+    return float(steer[0]) if scalar else steer
@@ -0,0 +1,209 @@
+"""바퀴 궤적 저장소 (구조 공유 / append-only).
+
+모든 바퀴의 좌표는 PathSegment 의 array('d') 에 덧붙이기만 합니다. 조작 기록
+(History) 스냅샷은 (세그먼트, 길이) 한 쌍만 보관하므로 캡처 비용이 궤적 길이와
+무관하고, 메모리는 새로 주행한 만큼만 늘어납니다. 과거 스냅샷으로 복원한 뒤
+다시 주행하면 그 지점에서 부모를 가리키는 새 세그먼트를 만들어 분기합니다.
+
+화면에는 바퀴마다 최근 maxlen 개의 점만 보입니다 (WheelTrail). 한 줄기의 누적
+데이터가 COMPACT_FACTOR * maxlen 을 넘으면 최근 maxlen 개만 새 루트 세그먼트로
+옮겨(compaction) 더 이상 보이지 않는 오래된 데이터가 해제될 수 있게 합니다.
+
+점은 스텝(0.078m)마다 들어오지만 직선이나 완만한 곡선에서는 대부분 필요 없으므로, tolerance(m) 가
+0 보다 크면 허용 오차 띠(tolerance band) 방식으로 덧붙이는 순간 단순화합니다. 마지막 점은 '임시 점'으로,
+고정점 K 에서 새 위치까지의 선분이 그동안 건너뛴 모든 위치를 tolerance 이내로 지나면 임시 점을 새 위치로
+덮어쓰고, 아니면 임시 점을 고정하고 새 점을 추가합니다. 건너뛴 위치 Q 마다 K 에서 본 방향이
+asin(tolerance / |KQ|) 이내인 각도 구간을 교집합으로 유지하므로 스텝당 바퀴마다 O(1) 입니다.
+모든 바퀴를 함께 판정해 바퀴별 점 개수(누적 인덱스)는 계속 같습니다. snapshot() / anchor() 는 마지막 점을
+고정하므로 스냅샷이 참조하는 데이터는 덮어쓰지 않습니다.
+"""
+from array import array
+import math
+
+COMPACT_FACTOR = 3
+PATH_TOLERANCE = 0.01   # 궤적 단순화 허용 오차 (m), 0 이면 모든 스텝을 저장
+
+
+class PathSegment:
+    __slots__ = ('parent', 'parent_len', 'offset', 'base', 'length', 'data')
+
+    def __init__(self, names, parent=None, parent_len=0, offset=0):
+        self.parent = parent
+        self.parent_len = parent_len   # 부모 세그먼트에서 이어받은 점의 개수
+        self.offset = parent.offset + parent_len if parent else offset   # 이 세그먼트 첫 점의 누적 인덱스
+        self.base = parent.base if parent else self.offset   # 루트 세그먼트 첫 점의 누적 인덱스
+        self.length = 0
+        self.data = {name: array('d') for name in names}
+
+
+class PathSnapshot:
+    """WheelPaths 의 특정 시점. 데이터는 복사하지 않고 참조만 합니다."""
+    __slots__ = ('segment', 'length')
+
+    def __init__(self, segment, length):
+        self.segment = segment; self.length = length
+
+    @property
+    def total(self):
+        return self.segment.offset + self.length
+
+
+class WheelTrail:
+    """바퀴 하나의 궤적 (최근 maxlen 개 점). len(), total, flat(), 반복을 지원합니다."""
+
+    def __init__(self, paths, name):
+        self._paths = paths; self.name = name
+
+    @property
+    def total(self):
+        # 지금까지 추가된 점의 누적 개수 (화면 밖으로 밀려난 점 포함)
+        return self._paths.total
+
+    def __len__(self):
+        return min(self._paths.total, self._paths.maxlen)
+
+    def flat(self, last=None):
+        # [x0, y0, x1, y1, ...] 순서의 좌표 (last 를 주면 마지막 last 개만)
+        n = len(self) if last is None else min(last, len(self))
+        chunks = []; segment = self._paths.segment; end = self._paths.length
+        while n > 0:
+            take = min(n, end)
+            chunks.append(segment.data[self.name][2*(end - take):2*end]); n -= take
+            end = segment.parent_len; segment = segment.parent
+        result = array('d')
+        for chunk in reversed(chunks): result += chunk
+        return result
+
+    def __iter__(self):
+        data = self.flat()
+        return zip(data[0::2], data[1::2])
+
+    def __getitem__(self, index):
+        n = len(self)
+        if index < 0: index += n
+        if not 0 <= index < n: raise IndexError("WheelTrail index out of range")
+        data = self.flat(n - index)
+        return data[0], data[1]
+
+
+class WheelPaths:
+    """바퀴 이름 -> WheelTrail 매핑. 한 스텝의 모든 바퀴 위치를 append_positions 로 함께 추가합니다."""
+
+    def __init__(self, segment, length, maxlen=2000, tolerance=PATH_TOLERANCE):
+        self.segment = segment; self.length = length; self.maxlen = maxlen
+        self.tolerance = tolerance
+        self._band = None   # 이름 -> [Kx, Ky, 기준 각도, 구간 하한, 구간 상한, 최대 거리], None 이면 마지막 점이 고정점
+        self._trails = {name: WheelTrail(self, name) for name in segment.data}
+
+    @classmethod
+    def start(cls, positions, maxlen=2000, tolerance=PATH_TOLERANCE):
+        paths = cls(PathSegment(list(positions)), 0, maxlen, tolerance)
+        paths.append_positions(positions)
+        return paths
+
+    @classmethod
+    def from_snapshot(cls, snapshot, maxlen=2000, tolerance=PATH_TOLERANCE):
+        return cls(snapshot.segment, snapshot.length, maxlen, tolerance)
+
+    @classmethod
+    def from_points(cls, points_by_name, maxlen=2000, tolerance=PATH_TOLERANCE):
+        # 프리셋(JSON)에 저장된 {이름: [[x, y], ...]} 형식으로부터 생성 (이미 저장된 점은 다시 단순화하지 않음)
+        paths = cls(PathSegment(list(points_by_name)), 0, maxlen, 0)
+        for step in zip(*points_by_name.values()):
+            paths.append_positions(dict(zip(points_by_name, step)))
+        paths.tolerance = tolerance
+        return paths
+
+    @property
+    def total(self):
+        return self.segment.offset + self.length
+
+    def snapshot(self):
+        self.anchor()
+        return PathSnapshot(self.segment, self.length)
+
+    def anchor(self):
+        # 마지막 점을 고정점으로 (이후 덮어쓰지 않음). 주행 시작/끝마다 호출해 다시 계산(replay)과 같은 점을 남깁니다.
+        self._band = None
+
+    def to_points(self):
+        return {name: [list(p) for p in trail] for name, trail in self._trails.items()}
+
+    def append_positions(self, positions):
+        segment = self.segment
+        if self._band is not None and segment.length == self.length and self._fits(positions):
+            # 임시 점을 새 위치로 덮어씀
+            data = segment.data
+            for name, (x, y) in positions.items():
+                if name in data:
+                    a = data[name]; a[-2] = x; a[-1] = y
+            return
+        if self.tolerance > 0 and self.total:
+            # 지금 마지막 점이 고정점이 되고, 새 점은 임시 점
+            self._band = {name: [*trail.flat(1), None, 0.0, 0.0, 0.0] for name, trail in self._trails.items()}
+        if segment.length != self.length:
+            # 과거 시점에서 이어서 주행: 기존 데이터는 그대로 두고 분기 세그먼트 생성
+            segment = self.segment = PathSegment(list(segment.data), segment, self.length)
+            self.length = 0
+        data = segment.data
+        for name, (x, y) in positions.items():
+            if name in data: data[name].extend((x, y))
+        segment.length += 1; self.length += 1
+        if self.total - segment.base > COMPACT_FACTOR * self.maxlen:
+            self._compact()
+
+    def _fits(self, positions):
+        # 임시 점 P 를 건너뛴 위치로 띠에 더한 뒤, 고정점 K -> 새 위치 N 선분이 띠 안에 있는지 (모든 바퀴)
+        tol = self.tolerance; data = self.segment.data
+        for name, (x, y) in positions.items():
+            band = self._band.get(name)
+            if band is None: continue
+            kx, ky, ref, lo, hi, dmax = band
+            a = data[name]; px = a[-2] - kx; py = a[-1] - ky
+            d = math.hypot(px, py)
+            if d > tol:
+                angle = math.atan2(py, px); half = math.asin(tol / d)
+                if ref is None:
+                    ref = angle; lo = -half; hi = half
+                else:
+                    off = (angle - ref + math.pi) % (2*math.pi) - math.pi
+                    lo = max(lo, off - half); hi = min(hi, off + half)
+                    if lo > hi: return False
+            if d > dmax: dmax = d
+            band[2:] = ref, lo, hi, dmax
+            nx = x - kx; ny = y - ky
+            dn = math.hypot(nx, ny)
+            if dn < dmax: return False   # 되돌아옴 (기어 전환 등): 건너뛴 점이 선분 끝 밖에 남음
+            if ref is not None and dn > tol:
+                off = (math.atan2(ny, nx) - ref + math.pi) % (2*math.pi) - math.pi
+                if not lo <= off <= hi: return False
+        return True
+
+    def _compact(self):
+        n = min(self.total, self.maxlen)
+        flats = {name: trail.flat(n) for name, trail in self._trails.items()}
+        segment = PathSegment(list(flats), offset=self.total - n)
+        segment.data = flats; segment.length = n
+        self.segment = segment; self.length = n
+
+    def __getitem__(self, name):
+        return self._trails[name]
+
+    def __contains__(self, name):
+        return name in self._trails
+
+    def __iter__(self):
+        return iter(self._trails)
+
+    def __len__(self):
+        return len(self._trails)
+
+    def items(self):
+        return self._trails.items()
+
+    def nbytes(self):
+        # 이 궤적이 참조하는 모든 세그먼트의 좌표 데이터 크기
+        total = 0; segment = self.segment
+        while segment is not None:
+            total += sum(a.itemsize * len(a) for a in segment.data.values()); segment = segment.parent
+        return total
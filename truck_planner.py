@@ -0,0 +1,491 @@
+"""T자 코스 자동 후진 경로 계획 (hybrid A*).
+
+현재 자세에서 출발해 트레일러를 입구(3.6m 폭, 정지선 안쪽)에 넣는 전진/후진 조작 순서를
+찾습니다. 탐색의 한 단계는 수동 조향으로 EDGE_STEPS 스텝을 KinematicsEngine 그대로(0.078m
+Euler) 주행한 것이므로, 찾은 조작을 시뮬레이터에서 다시 주행하면 같은 자세가 됩니다.
+
+    plan = plan_t_course(state, trailer_len, CourseTransform.from_background(...))
+    for m in plan.maneuvers: engine.drive(m['distance'], math.radians(m['steer_deg']), 'manual', m['direction'])
+
+- 조향각은 STEER_SET (최대 40°), 꺾임각은 잭나이프 한계(90°) 안에서만 움직입니다.
+- 선 접촉은 차체와 바퀴 줄을 원 여러 개로 덮어 코스 선까지의 거리로 검사합니다. 거리 격자는
+  하한으로만 쓰고 선 가까이의 원은 선분까지의 거리를 직접 계산합니다. 찾은 경로는 마지막에
+  화면과 같은 차체 다각형(CourseGeometry)으로 다시 검사합니다.
+- 휴리스틱은 (트레일러 방향, 뒤끝 위치) 격자에서 트레일러를 회전 반경이 트레일러 길이인 차로 본
+  남은 거리와, 방향을 무시한 뒤끝의 최단 거리(Dijkstra) 중 큰 값입니다.
+- 기본(workers=1)은 설정(PORTFOLIO)을 앞에서부터 차례로 시도해 처음 찾은 결과를 씁니다.
+  workers > 1 이면 설정들을 프로세스 풀에서 동시에 돌려 가장 먼저 끝난 결과를 씁니다.
+- 시뮬레이터는 PlanProcess 로 탐색 전체를 별도 프로세스에서 돌립니다. 순수 파이썬 탐색을 스레드로
+  돌리면 수 초~수십 초 동안 GIL 을 잡고 있어 Tk 메인 루프(다시 그리기, 슬라이더)가 거의 멈춥니다.
+"""
+import heapq
+import math
+import signal
+import sys
+import time
+
+import numpy as np
+
+import truck_kinematics as kin
+from truck_course import COURSE_PARAMS, CourseGeometry, CourseTransform, course_layout
+from truck_raster import distance_field
+
+EDGE_STEPS = 25                        # 탐색 한 단계 = 25 스텝 (1.95m)
+CHECK_EVERY = 8                        # 선에서 멀어도 최소 이 스텝마다 검사
+SLACK_REFINE = 0.3                     # 격자 하한이 이보다 작으면 한 단계 안쪽(묶음 -> 원 -> 정확한 거리)까지 계산
+CLEARANCE_MARGIN = 0.03                # 격자 해상도와 검사 사이 움직임에 대한 여유 (m)
+CLUSTER_LENGTH = 2.6                   # 차체 원을 이 길이씩 묶어 묶음 단위로 먼저 검사
+MAX_POINT_SPEED = 2.2                  # 킹핀이 1m 갈 때 차체 끝점이 움직일 수 있는 최대 거리 (조향 40°, 트레일러 뒤끝)
+STEER_SET = (-40, -20, 0, 20, 40)
+FIELD_RESOLUTION = 0.1                 # 선까지 거리 격자 (m)
+NEAR_CELL = 2.0; NEAR_DISTANCE = 3.0   # 정확한 거리는 선에서 3m 안쪽만 필요 (원 반지름 + SLACK_REFINE + 격자 오차보다 큼)
+FIELD_MAX_CLEARANCE = 6.5              # 트레일러 전체를 덮는 원보다 커야 함
+HEURISTIC_RESOLUTION = 0.5
+HEADING_BINS = 72                      # 방향 격자 (5°)
+LATTICE_MAX_SWEEPS = 200
+UNREACHED_HEADING_COST = 30.0          # 방향 격자에서 목표에 닿지 않는 칸에 더하는 거리 (m)
+HEADING_WEIGHT = 4.0                   # 트레일러 방향이 최단 경로 방향과 반대일 때 더하는 거리 (m)
+XY_BIN = 0.5; YAW_BIN_DEG = 5.0; ART_BIN_DEG = 6.0
+GEAR_CHANGE_COST = 4.0                 # 기어 변경 한 번을 몇 m 주행과 같게 볼지
+STEER_CHANGE_COST = 0.05               # 조향각 10° 변경당
+MANEUVER_COST = 0.0                    # 조향각을 바꿔 조작이 하나 늘 때마다
+GOAL_YAW_TOLERANCE_DEG = 8.0
+GOAL_ARTICULATION_DEG = 10.0
+GOAL_REAR_X_TOLERANCE = 0.5
+MAX_EXPANSIONS = 20000                 # 설정 하나당 (넘으면 다음 설정)
+WHEEL_DISCS = 10                       # 트레일러 바퀴 줄 한쪽을 덮는 원 개수 (입구에서 바퀴 바깥과 선 사이 여유가 0.3m 뿐)
+
+# 탐색 설정 (휴리스틱 가중치, 단계 길이). 설정마다 잘 풀리는 출발 자세/트레일러 길이가 달라 차례로/동시에 시도
+PORTFOLIO = (
+    {'weight': 4.0, 'edge_steps': 25},
+    {'weight': 3.0, 'edge_steps': 25},
+    {'weight': 3.0, 'edge_steps': 19},
+    {'weight': 2.0, 'edge_steps': 25},
+)
+
+
+class Plan:
+    def __init__(self, maneuvers, states, cost, expansions, seconds, variant):
+        self.maneuvers = maneuvers   # [{'distance', 'direction', 'mode', 'steer_deg', 'target_angle'}, ...]
+        self.states = states         # 각 조작이 끝난 뒤의 자세
+        self.cost = cost
+        self.expansions = expansions
+        self.seconds = seconds
+        self.variant = variant
+        self.contacts = []           # 차체 다각형으로 다시 검사했을 때 닿은 (스텝, 부위, 선분)
+
+
+class PlanningError(Exception):
+    pass
+
+
+def _disc_cover(start, end, width, count):
+    # 폭 width, 길이 방향 [end, start] 구간의 직사각형을 덮는 원 count 개
+    spacing = (start - end) / count
+    radius = math.hypot(width / 2, spacing / 2)
+    return [(start - spacing * (i + 0.5), 0.0, radius) for i in range(count)]
+
+
+def _wheel_discs(start, end, tractor_width, wheel_width, count):
+    # 좌우 바퀴 줄 (길이 방향 [end, start], 차체 옆선이 바퀴 가운데)을 덮는 원 count 개씩
+    spacing = (start - end) / count
+    radius = math.hypot(wheel_width / 2, spacing / 2)
+    return [(start - spacing * (i + 0.5), side * tractor_width / 2, radius) for side in (1, -1) for i in range(count)]
+
+
+def _bounding_disc(discs):
+    lo = min(d[0] for d in discs); hi = max(d[0] for d in discs)
+    center = (lo + hi) / 2
+    return center, max(math.hypot(d[0] - center, d[1]) + d[2] for d in discs)
+
+
+def _disc_tree(discs, cluster_len=CLUSTER_LENGTH):
+    # (몸체 중심, 몸체 반지름, [(묶음 중심, 묶음 반지름, [원, ...]), ...]): 큰 원부터 검사해 멀면 안쪽 원 생략
+    discs = sorted(discs, key=lambda d: -d[0])
+    clusters = []
+    for d in discs:
+        if clusters and clusters[-1][0][0] - d[0] <= cluster_len: clusters[-1].append(d)
+        else: clusters.append([d])
+    return _bounding_disc(discs) + ([_bounding_disc(c) + (c,) for c in clusters],)
+
+
+def _point_segment_distance(x, y, x1, y1, x2, y2):
+    dx = x2 - x1; dy = y2 - y1
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+
+
+class ClearanceGrid:
+    """코스 선까지 거리의 하한 격자 (월드 좌표)와 정확한 거리. 격자 밖은 max_clearance.
+
+    격자 값은 칸 안의 어느 점에서도 실제 거리보다 크지 않도록 양자화 오차(대각선 한 칸)를 뺀 값이라,
+    격자 값이 충분히 크면 그대로 믿고, 선 가까이에서만 선분까지의 거리(exact)를 계산합니다.
+    """
+
+    def __init__(self, segments, resolution=FIELD_RESOLUTION, margin=4.0, max_clearance=3.0):
+        self.segments = [s[2:] for s in segments]
+        xs = [v for s in segments for v in (s[2], s[4])]; ys = [v for s in segments for v in (s[3], s[5])]
+        self.left = min(xs) - margin; self.bottom = min(ys) - margin
+        self.resolution = resolution
+        self.width = int((max(xs) + margin - self.left) / resolution) + 1
+        self.height = int((max(ys) + margin - self.bottom) / resolution) + 1
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        for x1, y1, x2, y2 in self.segments:
+            n = int(math.hypot(x2 - x1, y2 - y1) / (resolution / 4)) + 1
+            t = np.linspace(0.0, 1.0, n + 1)
+            cols = ((x1 + (x2 - x1) * t - self.left) / resolution).astype(int)
+            rows = ((y1 + (y2 - y1) * t - self.bottom) / resolution).astype(int)
+            mask[rows, cols] = True
+        max_px = int(max_clearance / resolution)
+        self.max_clearance = max_px * resolution - resolution * math.sqrt(2)
+        self.field = distance_field(mask, max_px) * np.float32(resolution)   # 칸에서 가장 가까운 선 칸까지 (m, 배열 조회용)
+        self.rows = np.maximum(self.field - np.float32(resolution * math.sqrt(2)), 0).tolist()
+        # exact() 용: NEAR_CELL 칸마다 가까운 선분만 (칸 중심에서 칸 반대각선 + NEAR_DISTANCE 안)
+        self._near = {}
+        reach = NEAR_CELL * math.sqrt(2) / 2 + NEAR_DISTANCE
+        for gx in range(int((max(xs) + margin - self.left) / NEAR_CELL) + 1):
+            for gy in range(int((max(ys) + margin - self.bottom) / NEAR_CELL) + 1):
+                cx = self.left + (gx + 0.5) * NEAR_CELL; cy = self.bottom + (gy + 0.5) * NEAR_CELL
+                self._near[gx, gy] = [seg for seg in self.segments if _point_segment_distance(cx, cy, *seg) <= reach]
+
+    def clearance(self, x, y):
+        col = int((x - self.left) / self.resolution); row = int((y - self.bottom) / self.resolution)
+        if 0 <= row < self.height and 0 <= col < self.width and x >= self.left and y >= self.bottom:
+            return self.rows[row][col]
+        return self.max_clearance
+
+    def exact(self, x, y):
+        # 가장 가까운 선까지의 거리. NEAR_DISTANCE 보다 멀면 NEAR_DISTANCE (그 이상은 필요 없음)
+        best = NEAR_DISTANCE
+        for x1, y1, x2, y2 in self._near.get((int((x - self.left) // NEAR_CELL), int((y - self.bottom) // NEAR_CELL)), ()):
+            dx = x2 - x1; dy = y2 - y1
+            t = ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)
+            t = 0.0 if t < 0 else 1.0 if t > 1 else t
+            d = math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+            if d < best: best = d
+        return best
+
+
+class TCoursePlanner:
+    def __init__(self, trailer_len, transform=None, params=COURSE_PARAMS, tractor_wb=kin.TRACTOR_WB, tractor_width=kin.TRACTOR_WIDTH):
+        self.trailer_len = trailer_len; self.tractor_wb = tractor_wb; self.tractor_width = tractor_width
+        self.transform = transform or CourseTransform()
+        self.params = params
+        self.geometry = CourseGeometry.build(self.transform, params)
+        active = [s for s in self.geometry.segments if s[1] in self.geometry.kinds]
+        self.field = ClearanceGrid(active, max_clearance=FIELD_MAX_CLEARANCE)
+        # 차체를 덮는 원 (길이 방향 오프셋, 옆 방향 오프셋, 반지름): 트랙터는 스윙 뒤끝(-1.0m)부터 캡 앞끝(wb+0.5m)을
+        # 바깥쪽으로 튀어나온 바퀴(0.15~0.3m)까지 포함한 폭으로, 트레일러는 구즈넥 앞(0.5m)부터 뒤끝까지의 몸체와
+        # 좌우 바퀴 줄(두 축, 0.5m 폭)을 따로 덮습니다. 입구에서 트레일러 바퀴 바깥과 선 사이 여유는 0.3m 입니다.
+        self.tractor_discs = _disc_cover(tractor_wb + 0.5, -1.0, tractor_width + 0.6, 6)
+        pivot = -(trailer_len - 0.5)
+        self.trailer_discs = (_disc_cover(0.5, -(trailer_len + kin.TRAILER_REAR_OVERHANG), tractor_width, 11)
+                              + _wheel_discs(pivot + 0.95, pivot - 0.95, tractor_width, 0.5, WHEEL_DISCS))
+        self._bodies = (_disc_tree(self.tractor_discs), _disc_tree(self.trailer_discs))
+        layout = course_layout(params)
+        self.goal_rear_y = (layout['Y_start'] + 0.25, layout['Y_stop_gate'] + 0.75)   # 코스 좌표: 입구 아래 선과 정지선 사이
+        self.goal_point = self.transform.apply(0.0, (self.goal_rear_y[0] + self.goal_rear_y[1]) / 2)
+        self._build_heuristic()
+        self.heading_weight = HEADING_WEIGHT
+
+    def _build_heuristic(self):
+        # 트레일러 뒤끝이 갈 수 있는 칸(선에서 트레일러 반폭 이상 떨어진 칸)
+        res = HEURISTIC_RESOLUTION; field = self.field
+        nx = int(field.width * field.resolution / res) + 1; ny = int(field.height * field.resolution / res) + 1
+        centers_x = field.left + (np.arange(nx) + 0.5) * res; centers_y = field.bottom + (np.arange(ny) + 0.5) * res
+        free = np.array([[field.clearance(x, y) >= self.tractor_width / 2 - 0.2 for x in centers_x] for y in centers_y])
+        self._h_shape = (nx, ny)
+        self._rear_dist, self._away = self._dijkstra(free.tolist(), self.goal_point)
+        self._cost_to_go = self._heading_lattice(free, centers_x, centers_y).tolist()
+
+    def _dijkstra(self, free, goal):
+        # 방향을 무시한 뒤끝의 최단 거리 (방향 격자에서 닿지 않는 칸의 대체값)
+        res = HEURISTIC_RESOLUTION; field = self.field; nx, ny = self._h_shape
+        dist = [[math.inf] * nx for _ in range(ny)]
+        away = [[math.pi / 2] * nx for _ in range(ny)]
+        gi = int((goal[0] - field.left) / res); gj = int((goal[1] - field.bottom) / res)
+        dist[gj][gi] = 0.0
+        heap = [(0.0, gi, gj)]
+        moves = [(di, dj, res * math.hypot(di, dj), math.atan2(dj, di)) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+        while heap:
+            d, i, j = heapq.heappop(heap)
+            if d > dist[j][i]: continue
+            for di, dj, step, direction in moves:
+                ni, nj = i + di, j + dj
+                if 0 <= ni < nx and 0 <= nj < ny and free[nj][ni] and d + step < dist[nj][ni]:
+                    dist[nj][ni] = d + step; away[nj][ni] = direction; heapq.heappush(heap, (d + step, ni, nj))
+        return dist, away
+
+    def _heading_lattice(self, free, centers_x, centers_y):
+        """(트레일러 방향, 뒤끝 칸) 마다 목표까지 남은 거리. 트레일러를 회전 반경이 트레일러 길이인 차로 보고
+        전진/후진 x (좌/직진/우) 로 움직이는 격자에서 값 반복(value iteration)으로 계산합니다."""
+        res = HEURISTIC_RESOLUTION; n_yaw = HEADING_BINS
+        step = self.trailer_len * 2 * math.pi / n_yaw          # 한 번에 방향 한 칸만큼 도는 호 길이
+        value = np.full((n_yaw, free.shape[0], free.shape[1]), np.inf, dtype=np.float32)
+        rx, ry = self.transform.inverse(centers_x[None, :], centers_y[:, None])
+        goal = free & (np.abs(rx) <= GOAL_REAR_X_TOLERANCE) & (ry >= self.goal_rear_y[0]) & (ry <= self.goal_rear_y[1])
+        yaw_tol = int(GOAL_YAW_TOLERANCE_DEG * n_yaw / 360)
+        for k in range(n_yaw // 4 - yaw_tol, n_yaw // 4 + yaw_tol + 1): value[k][goal] = 0.0
+        blocked = ~free
+        shifts = []
+        for k in range(n_yaw):
+            yaw = 2 * math.pi * k / n_yaw
+            di = int(round(step * math.cos(yaw) / res)); dj = int(round(step * math.sin(yaw) / res))
+            shifts.append(((di, dj), (-di, -dj)))   # 전진 / 후진 시 뒤끝이 옮겨 가는 칸
+        for _ in range(LATTICE_MAX_SWEEPS):
+            before = value.copy()
+            for k in range(n_yaw):
+                turned = np.minimum(np.minimum(value[k - 1], value[k]), value[(k + 1) % n_yaw])
+                for di, dj in shifts[k]:
+                    moved = np.full_like(turned, np.inf)
+                    moved[max(0, -dj):turned.shape[0] - max(0, dj), max(0, -di):turned.shape[1] - max(0, di)] = \
+                        turned[max(0, dj):turned.shape[0] + min(0, dj), max(0, di):turned.shape[1] + min(0, di)]
+                    np.minimum(value[k], moved + np.float32(step), out=value[k])
+                value[k][blocked] = np.inf
+            if np.array_equal(before, value): break
+        return value
+
+    def heuristic(self, x, y, yaw_trailer):
+        rear = self.trailer_len + kin.TRAILER_REAR_OVERHANG
+        rx = x - rear * math.cos(yaw_trailer); ry = y - rear * math.sin(yaw_trailer)
+        field = self.field; res = HEURISTIC_RESOLUTION
+        i = int((rx - field.left) / res); j = int((ry - field.bottom) / res)
+        nx, ny = self._h_shape
+        if 0 <= i < nx and 0 <= j < ny:
+            k = int(round(yaw_trailer * HEADING_BINS / (2 * math.pi))) % HEADING_BINS
+            d = self._rear_dist[j][i]
+            if d < math.inf:
+                h2 = d + self.heading_weight * (1.0 - math.cos(yaw_trailer - self._away[j][i]))
+                d3 = self._cost_to_go[k][j][i]
+                return max(h2, d3) if d3 < math.inf else h2 + UNREACHED_HEADING_COST
+        return math.hypot(rx - self.goal_point[0], ry - self.goal_point[1]) + 2 * UNREACHED_HEADING_COST
+
+    def slack(self, x, y, yaw_tractor, yaw_trailer):
+        """차체를 덮는 원과 코스 선 사이 여유의 하한 (m). 음수면 접촉."""
+        field = self.field; rows = field.rows; left = field.left; bottom = field.bottom; res = field.resolution
+        width = field.width; height = field.height; far = field.max_clearance
+        best = far
+        for yaw, (center, bound, clusters) in zip((yaw_tractor, yaw_trailer), self._bodies):
+            c = math.cos(yaw); s = math.sin(yaw)
+            # 몸체 -> 묶음 -> 원 순서로, 큰 원이 선에서 충분히 멀면 안쪽은 보지 않음
+            col = int((x + center * c - left) / res); row = int((y + center * s - bottom) / res)
+            v = (rows[row][col] if 0 <= row < height and 0 <= col < width else far) - bound
+            if v >= SLACK_REFINE:
+                if v < best: best = v
+                continue
+            for center, bound, discs in clusters:
+                col = int((x + center * c - left) / res); row = int((y + center * s - bottom) / res)
+                v = (rows[row][col] if 0 <= row < height and 0 <= col < width else far) - bound
+                if v >= SLACK_REFINE:
+                    if v < best: best = v
+                    continue
+                for lon, lat, r in discs:
+                    px = x + lon * c - lat * s; py = y + lon * s + lat * c
+                    col = int((px - left) / res); row = int((py - bottom) / res)
+                    v = (rows[row][col] if 0 <= row < height and 0 <= col < width else far) - r
+                    if v < SLACK_REFINE: v = field.exact(px, py) - r
+                    if v < best:
+                        best = v
+                        if v < 0: return v
+        return best
+
+    def collides(self, x, y, yaw_tractor, yaw_trailer):
+        return self.slack(x, y, yaw_tractor, yaw_trailer) < 0
+
+    def is_goal(self, x, y, yaw_tractor, yaw_trailer):
+        rear = self.trailer_len + kin.TRAILER_REAR_OVERHANG
+        rx, ry = self.transform.inverse(x - rear * math.cos(yaw_trailer), y - rear * math.sin(yaw_trailer))
+        if not (self.goal_rear_y[0] <= ry <= self.goal_rear_y[1] and abs(rx) <= GOAL_REAR_X_TOLERANCE): return False
+        yaw_error = math.degrees(math.atan2(math.cos(yaw_trailer), math.sin(yaw_trailer)))   # +90° (입구에서 위쪽) 기준
+        art = math.degrees(math.atan2(math.sin(yaw_tractor - yaw_trailer), math.cos(yaw_tractor - yaw_trailer)))
+        return abs(yaw_error) <= GOAL_YAW_TOLERANCE_DEG and abs(art) <= GOAL_ARTICULATION_DEG
+
+    def _edge(self, engine, state, steer_deg, direction, steps):
+        # 수동 조향 한 단계. 잭나이프/선 접촉이면 None
+        engine.set_state(state)
+        steer = math.radians(steer_deg); limit = math.radians(kin.JACKKNIFE_LIMIT_DEG)
+        # 마지막 검사에서 여유가 s 였으면 차체의 어느 점도 s / MAX_POINT_SPEED 를 가기 전에는 선에 닿을 수 없음
+        next_check = 0
+        for i in range(1, steps + 1):
+            engine.step(steer, direction)
+            art = engine.yaw_tractor - engine.yaw_trailer
+            if abs(math.atan2(math.sin(art), math.cos(art))) >= limit: return None
+            if i >= next_check or i == steps:
+                slack = self.slack(engine.x, engine.y, engine.yaw_tractor, engine.yaw_trailer) - CLEARANCE_MARGIN
+                if slack < 0: return None
+                next_check = i + min(CHECK_EVERY, max(1, int(slack / (MAX_POINT_SPEED * kin.STEP_DIST))))
+        return engine.get_state()
+
+    def _key(self, state):
+        art = state['yaw_tractor'] - state['yaw_trailer']
+        return (round(state['x'] / XY_BIN), round(state['y'] / XY_BIN),
+                round(math.degrees(math.atan2(math.sin(state['yaw_trailer']), math.cos(state['yaw_trailer']))) / YAW_BIN_DEG) % int(360 / YAW_BIN_DEG),
+                round(math.degrees(math.atan2(math.sin(art), math.cos(art))) / ART_BIN_DEG))
+
+    def search(self, start, weight=3.0, steers=STEER_SET, edge_steps=EDGE_STEPS, heading_weight=HEADING_WEIGHT, max_expansions=MAX_EXPANSIONS):
+        """조작 목록이 담긴 Plan. 찾지 못하면 PlanningError."""
+        t0 = time.perf_counter()
+        self.heading_weight = heading_weight
+        start = {k: start[k] for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')}
+        if self.collides(start['x'], start['y'], start['yaw_tractor'], start['yaw_trailer']):
+            raise PlanningError("시작 자세에서 차체가 코스 선에 닿아 있습니다.")
+        engine = kin.KinematicsEngine(trailer_len=self.trailer_len, tractor_wb=self.tractor_wb, tractor_width=self.tractor_width)
+        edge_len = edge_steps * kin.STEP_DIST
+        # 노드: (상태, 부모 번호, 조향각, 기어)
+        nodes = [(start, -1, None, None)]
+        heap = [(weight * self.heuristic(start['x'], start['y'], start['yaw_trailer']), 0.0, 0)]
+        best_cost = {self._key(start): 0.0}
+        closed = set()
+        expansions = 0
+        while heap:
+            _, cost, index = heapq.heappop(heap)
+            state, _, steer_prev, gear_prev = nodes[index]
+            key = self._key(state)
+            if key in closed: continue
+            closed.add(key)
+            if self.is_goal(state['x'], state['y'], state['yaw_tractor'], state['yaw_trailer']):
+                return self._make_plan(nodes, index, cost, expansions, time.perf_counter() - t0,
+                                       {'weight': weight, 'steers': tuple(steers), 'edge_steps': edge_steps, 'heading_weight': heading_weight}, edge_steps)
+            expansions += 1
+            if expansions > max_expansions: break
+            for direction in (1, -1):
+                for steer_deg in steers:
+                    child = self._edge(engine, state, steer_deg, direction, edge_steps)
+                    if child is None: continue
+                    child_key = self._key(child)
+                    if child_key in closed: continue
+                    g = cost + edge_len
+                    if gear_prev is not None and direction != gear_prev: g += GEAR_CHANGE_COST
+                    if steer_prev is not None and steer_deg != steer_prev:
+                        g += MANEUVER_COST + STEER_CHANGE_COST * abs(steer_deg - steer_prev) / 10
+                    if g >= best_cost.get(child_key, math.inf): continue
+                    best_cost[child_key] = g
+                    nodes.append((child, index, steer_deg, direction))
+                    heapq.heappush(heap, (g + weight * self.heuristic(child['x'], child['y'], child['yaw_trailer']), g, len(nodes) - 1))
+        raise PlanningError(f"경로를 찾지 못했습니다 (확장 {expansions}회, {time.perf_counter() - t0:.1f}s).")
+
+    def _make_plan(self, nodes, index, cost, expansions, seconds, variant, edge_steps):
+        chain = []
+        while nodes[index][1] >= 0:
+            chain.append(nodes[index]); index = nodes[index][1]
+        chain.reverse()
+        # 같은 기어/조향각이 이어지는 단계를 한 번의 조작으로 합침
+        maneuvers = []; states = []
+        for state, _, steer_deg, direction in chain:
+            if maneuvers and maneuvers[-1]['steer_deg'] == steer_deg and maneuvers[-1]['direction'] == direction:
+                maneuvers[-1]['steps'] += edge_steps; states[-1] = state
+            else:
+                maneuvers.append({'steps': edge_steps, 'direction': direction, 'mode': 'manual', 'steer_deg': steer_deg, 'target_angle': None})
+                states.append(state)
+        for m in maneuvers: m['distance'] = kin.distance_for_steps(m.pop('steps'))
+        return Plan(maneuvers, states, cost, expansions, seconds, variant)
+
+    def verify(self, start, plan):
+        # 화면과 같은 차체 다각형으로 모든 스텝을 다시 검사해 plan.contacts 에 기록
+        engine = kin.KinematicsEngine(trailer_len=self.trailer_len, tractor_wb=self.tractor_wb, tractor_width=self.tractor_width)
+        engine.set_state(start)
+        plan.contacts = []; step = 0
+        for m in plan.maneuvers:
+            run = engine.start_drive(m['distance'], m['direction'], m['mode'], math.radians(m['steer_deg']))
+            while run.tick() is None:
+                step += 1
+                polygons = kin.body_polygons(engine.get_state(), run.steer_rad, self.trailer_len, self.tractor_wb, self.tractor_width)
+                plan.contacts.extend((step, part, line) for part, line in self.geometry.check_vehicle(polygons))
+        return not plan.contacts
+
+
+def _search_variant(args):
+    # 프로세스 풀 작업 (피클 가능한 인자만 받음)
+    start, trailer_len, transform, params, variant = args
+    planner = TCoursePlanner(trailer_len, CourseTransform(*transform), params)
+    try:
+        return planner.search(start, **variant)
+    except PlanningError:
+        return None
+
+
+def plan_t_course(start, trailer_len, transform=None, params=COURSE_PARAMS, workers=1, portfolio=PORTFOLIO):
+    """현재 자세 start 에서 트레일러를 입구에 넣는 Plan (verify 까지 마친 것)."""
+    transform = transform or CourseTransform()
+    start = {k: start[k] for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')}
+    planner = TCoursePlanner(trailer_len, transform, params)
+    if planner.collides(start['x'], start['y'], start['yaw_tractor'], start['yaw_trailer']):
+        raise PlanningError("시작 자세에서 차체가 코스 선에 닿아 있습니다.")
+    t0 = time.perf_counter()
+    plan = None
+    if workers > 1:
+        # 설정마다 한 프로세스: 가장 먼저 찾은 결과를 쓰고 나머지는 중단
+        import multiprocessing
+        args = [(start, trailer_len, (transform.origin_x, transform.origin_y, transform.scale), params, v) for v in portfolio]
+        with multiprocessing.Pool(min(workers, len(portfolio))) as pool:
+            for found in pool.imap_unordered(_search_variant, args):
+                if found is not None:
+                    plan = found; break
+    else:
+        for variant in portfolio:
+            try:
+                plan = planner.search(start, **variant); break
+            except PlanningError:
+                continue
+    if plan is None:
+        raise PlanningError(f"경로를 찾지 못했습니다 ({time.perf_counter() - t0:.1f}s).")
+    plan.seconds = time.perf_counter() - t0
+    planner.verify(start, plan)
+    return plan
+
+
+def _plan_worker(conn, start, trailer_len, transform, params, workers):
+    # PlanProcess 의 자식 프로세스: 결과를 ('plan', Plan) 또는 ('error', 메시지) 로 보냄
+    # cancel() 의 SIGTERM 을 SystemExit 로 바꿔 프로세스 풀도 함께 정리되게 함 (그냥 죽으면 풀 워커가 남음)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(1))
+    try:
+        conn.send(('plan', plan_t_course(start, trailer_len, transform, params, workers)))
+    except PlanningError as e:
+        conn.send(('error', str(e)))
+    except Exception as e:
+        conn.send(('error', f"경로 계획 중 오류: {e}"))
+    finally:
+        conn.close()
+
+
+class PlanProcess:
+    """plan_t_course 를 별도 프로세스에서 실행. done() 이 True 가 되면 result() 가 Plan 을 반환하거나
+    PlanningError 를 냅니다. workers > 1 이면 그 프로세스 안에서 다시 프로세스 풀을 씁니다."""
+
+    def __init__(self, start, trailer_len, transform=None, params=COURSE_PARAMS, workers=1):
+        import multiprocessing
+        start = {k: start[k] for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')}
+        self._conn, sender = multiprocessing.Pipe(duplex=False)
+        # 프로세스 풀(데몬 프로세스)을 만들 수 있도록 데몬이 아닌 프로세스. 창을 닫으면 cancel() 로 종료
+        self.process = multiprocessing.Process(target=_plan_worker, args=(sender, start, trailer_len, transform, params, workers),
+                                               name="t-course-planner")
+        self.process.start()
+        sender.close()
+        self._result = None
+
+    def done(self):
+        if self._result is None:
+            alive = self.process.is_alive()   # 먼저 확인: 끝난 프로세스가 보낸 결과는 이미 파이프에 있음
+            if self._conn.poll():
+                self._result = self._conn.recv(); self.process.join()
+            elif not alive:
+                self._result = ('error', f"경로 계획 프로세스가 결과 없이 끝났습니다 (종료 코드 {self.process.exitcode}).")
+        return self._result is not None
+
+    def result(self):
+        kind, value = self._result
+        if kind == 'error': raise PlanningError(value)
+        return value
+
+    def cancel(self):
+        if self.process.is_alive():
+            self.process.terminate(); self.process.join()
+        self._conn.close()
+
+
+def standard_start(trailer_len, transform=None, params=COURSE_PARAMS):
+    # 시험 출발 자세: 상단 주행로 오른쪽 끝에서 왼쪽(서쪽)을 보고 곧게 선 차량
+    c = course_layout(params)
+    transform = transform or CourseTransform()
+    x, y = transform.apply(c['X_right_edge'] - (trailer_len + kin.TRAILER_REAR_OVERHANG) - 1.0, (c['Y_platform_start'] + c['Y_platform_top']) / 2)
+    return {'x': x, 'y': y, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi}
@@ -0,0 +1,139 @@
+"""주행 예상 경로 (조향 슬라이더 미리보기).
+
+현재 자세에서 지금의 조향각/기어/각도 제어 모드로 주행 버튼을 눌렀을 때의 경로를
+KinematicsEngine 으로 미리 계산합니다. 실제 주행과 같은 DriveRun 을 쓰므로 목표 각도
+정지 등도 그대로 반영됩니다. 슬라이더를 오가며 같은 값을 다시 보는 경우가 많아
+결과는 입력별로 LRU 캐시에 보관합니다.
+
+수동 조향 모드에서 현재 트레일러 길이의 운동 프리미티브 테이블(truck_primitives)이
+준비되어 있으면 주행을 계산하지 않고 테이블에서 보간한 자세로 경로를 만듭니다.
+
+'mpc' 모드는 스텝마다 제어기를 돌려 한 번에 수십~수백 ms 가 걸리므로, get(..., background=True) 는
+작업 스레드에서 계산하고 끝날 때까지 None 을 반환합니다 (pending 이 False 가 되면 다시 요청).
+조향 슬라이더 값은 목표 꺾임각의 방향만 정하므로 캐시 키에는 그 방향만 넣습니다.
+"""
+from array import array
+from collections import OrderedDict
+import math
+import threading
+
+import truck_kinematics as kin
+
+PREDICT_DISTANCE = 20.0                       # 가장 긴 주행 버튼
+MARK_DISTANCES = (0.2, 0.5, 1, 5, 10, 20)     # 주행 버튼 거리마다 표시
+TRACK_WHEELS = ('t_front_l', 't_front_r', 'tr_rear2_l', 'tr_rear2_r')   # 차량이 쓸고 지나가는 바깥쪽 바퀴
+SAMPLE_EVERY = 4                              # 몇 스텝마다 점을 남길지 (0.078m * 4)
+
+
+class Prediction:
+    """예상 경로. 좌표는 모두 [x0, y0, x1, y1, ...] 형식의 array('d')."""
+
+    def __init__(self, names):
+        self.kingpin = array('d')
+        self.trailer_rear = array('d')
+        self.wheels = {name: array('d') for name in names}
+        self.marks = []          # [(거리, 킹핀 x, 킹핀 y), ...]
+        self.status = None
+        self.distance = 0.0
+
+
+def _sample(result, state, trailer_len, tractor_wb, wheels):
+    result.kingpin.extend((state['x'], state['y']))
+    rear = trailer_len + kin.TRAILER_REAR_OVERHANG
+    result.trailer_rear.extend((state['x'] - rear * math.cos(state['yaw_trailer']), state['y'] - rear * math.sin(state['yaw_trailer'])))
+    positions = kin.wheel_positions(state, trailer_len, tractor_wb)
+    for name in wheels: result.wheels[name].extend(positions[name])
+
+
+def predict_from_primitives(primitives, state, steer_deg, direction, distance=PREDICT_DISTANCE, marks=MARK_DISTANCES, wheels=TRACK_WHEELS):
+    # 수동 조향 경로를 프리미티브 테이블로 계산 (격자 밖이면 None)
+    poses = primitives.poses(state, steer_deg, distance, direction)
+    if poses is None: return None
+    result = Prediction(wheels)
+    for pose in poses: _sample(result, pose, primitives.trailer_len, primitives.tractor_wb, wheels)
+    for d in marks:
+        pose = primitives.end_state(state, steer_deg, d, direction)
+        if pose is not None: result.marks.append((d, pose['x'], pose['y']))
+    result.status = 'completed'
+    result.distance = int(distance / kin.STEP_DIST) * kin.STEP_DIST
+    return result
+
+
+def predict(state, trailer_len, steer_deg, direction, mode="manual", target_angle=None,
+            distance=PREDICT_DISTANCE, marks=MARK_DISTANCES, wheels=TRACK_WHEELS):
+    engine = kin.KinematicsEngine(trailer_len=trailer_len)
+    engine.set_state(state)
+    result = Prediction(wheels)
+    run = engine.start_drive(distance, direction, mode, math.radians(steer_deg), target_angle)
+    mark_steps = {int(d / run.step_dist): d for d in marks}
+
+    def sample():
+        _sample(result, engine.get_state(), trailer_len, engine.tractor_wb, wheels)
+
+    sample()
+    while run.tick() is None:
+        done = run.steps_total - run.steps_left
+        if done % SAMPLE_EVERY == 0: sample()
+        if done in mark_steps: result.marks.append((mark_steps[done], engine.x, engine.y))
+    if (run.steps_total - run.steps_left) % SAMPLE_EVERY: sample()
+    result.status = run.status
+    result.distance = run.distance_travelled
+    return result
+
+
+def _mpc_steer_key(state, steer_deg, direction):
+    # mpc 모드에서 조향각은 목표 꺾임각의 방향(truck_mpc.signed_target)만 정하므로 같은 방향이 되는 대표값
+    # (0: 양수 목표, -direction: 음수 목표). 꺾임각이 SIGN_DEADBAND 보다 크면 조향각과 무관
+    from truck_mpc import signed_target
+    phi = state['yaw_tractor'] - state['yaw_trailer']
+    return 0 if signed_target(math.atan2(math.sin(phi), math.cos(phi)), 1.0, math.radians(steer_deg), direction) > 0 else -direction
+
+
+class TrajectoryPredictor:
+    def __init__(self, max_cached=128):
+        self.max_cached = max_cached
+        self.primitives = None   # 준비된 MotionPrimitives (트레일러 길이가 같을 때만 사용)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._worker = None      # 계산 중인 (key, Thread) - 한 번에 하나
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def pending(self):
+        worker = self._worker
+        return worker is not None and worker[1].is_alive()
+
+    def get(self, state, trailer_len, steer_deg, direction, mode="manual", target_angle=None, background=False):
+        if mode not in ('stop_at_target', 'mpc'): target_angle = None
+        if mode == 'maintain': steer_deg = 0   # 유지 모드는 조향각을 스스로 계산
+        if mode == 'mpc' and target_angle is not None: steer_deg = _mpc_steer_key(state, steer_deg, direction)
+        key = (state['x'], state['y'], state['yaw_tractor'], state['yaw_trailer'], trailer_len, steer_deg, direction, mode, target_angle)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return result
+        if background and mode == 'mpc':
+            # 작업 스레드에서 계산 (다른 입력을 계산 중이면 끝난 뒤 다시 요청될 때 시작)
+            if not self.pending:
+                self.misses += 1
+                thread = threading.Thread(target=self._compute, args=(key, state, trailer_len, steer_deg, direction, mode, target_angle), daemon=True)
+                self._worker = (key, thread); thread.start()
+            return None
+        self.misses += 1
+        return self._compute(key, state, trailer_len, steer_deg, direction, mode, target_angle)
+
+    def _compute(self, key, state, trailer_len, steer_deg, direction, mode, target_angle):
+        result = None
+        primitives = self.primitives
+        if mode == 'manual' and primitives is not None and primitives.trailer_len == trailer_len:
+            result = predict_from_primitives(primitives, state, steer_deg, direction)
+        if result is None:
+            result = predict(state, trailer_len, steer_deg, direction, mode, target_angle)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return result
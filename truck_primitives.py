@@ -0,0 +1,250 @@
+"""운동 프리미티브 (motion primitive) 테이블.
+
+수동 조향으로 "꺾임각 a 에서 조향각 s 로 d 미터 주행"한 결과는 출발 위치/방향과 관계없이
+(a, s, d, 트레일러 길이, 기어)만의 함수이고, 출발 자세에 대해서는 강체 변환만 하면 됩니다.
+이 값을 격자 위에서 한 번 계산해 두고 보간으로 조회합니다.
+
+    prims = MotionPrimitives.load_or_build(trailer_len=9.5)
+    state = prims.end_state(engine.get_state(), steer_deg=20, distance=10, direction=-1)
+
+격자는 꺾임각 -90 ~ 90° (a_step 간격), 조향각 0 ~ 40° (1° 간격, 음수 조향각은 좌우 대칭),
+거리 0 ~ 20m (sample_every 스텝 간격)입니다. 거리 방향은 운동 방정식의 도함수를 이용한
+3차 Hermite 보간, 꺾임각/조향각 방향은 선형 보간입니다. 결과는 시뮬레이터와 같은 0.078m
+Euler 스텝 기준이므로 조향각이 정수이고 꺾임각이 격자 위에 있으면 거리 샘플 지점에서 주행
+결과와 (float32 정밀도 안에서) 같습니다.
+
+테이블은 차량 치수(축간 거리, 트레일러 길이, 축 위치)와 격자 설정으로 만든 키를 파일 이름에
+넣어 cache_dir 에 바이너리로 저장하고, 같은 치수로 다시 요청하면 파일에서 읽습니다.
+NumPy 가 있으면 truck_batch 로 한꺼번에 계산하고, 없으면 KinematicsEngine 으로 계산합니다.
+"""
+from array import array
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+
+import truck_kinematics as kin
+
+FORMAT_VERSION = 1
+MAGIC = b"TTPRIM\x00\x01"
+CACHE_DIR = os.path.join("Truck_Sim", "primitive_cache")   # 시뮬레이터 로그와 같은 폴더
+DEFAULT_SPEC = {'a_max': 90, 'a_step': 2, 's_max': 40, 's_step': 1, 'd_max': 20.0, 'sample_every': 4}
+GEARS = (1, -1)
+
+
+def geometry_key(tractor_wb, trailer_len, spec=DEFAULT_SPEC):
+    tractor_axles, trailer_axles = kin.axle_definitions(tractor_wb)
+    key = {'version': FORMAT_VERSION, 'step_dist': kin.STEP_DIST, 'tractor_wb': tractor_wb, 'trailer_len': trailer_len,
+           'tractor_axles': tractor_axles, 'trailer_axles': trailer_axles, 'spec': spec}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _grid(spec):
+    n_a = int(round(2 * spec['a_max'] / spec['a_step'])) + 1
+    n_s = int(round(spec['s_max'] / spec['s_step'])) + 1
+    n_steps = int(spec['d_max'] / kin.STEP_DIST)
+    n_d = -(-n_steps // spec['sample_every']) + 1
+    return n_a, n_s, n_d, n_steps
+
+
+def build_table(tractor_wb, trailer_len, spec=DEFAULT_SPEC):
+    # [기어][조향각][꺾임각][거리 샘플] 순서로 (dx, dy, dyaw_tractor, 꺾임각) 을 담은 array('f')
+    n_a, n_s, n_d, n_steps = _grid(spec)
+    angles = [math.radians(-spec['a_max'] + i * spec['a_step']) for i in range(n_a)]
+    steers = [math.radians(i * spec['s_step']) for i in range(n_s)]
+    distance = n_steps * kin.STEP_DIST
+    table = array('f')
+    try:
+        import numpy as np
+        import truck_batch
+    except ImportError:
+        np = None
+    for direction in GEARS:
+        if np is not None:
+            steer, art = (a.ravel() for a in np.meshgrid(steers, angles, indexing='ij'))
+            state = truck_batch.initial_state(art.size, yaw_tractor=0.0, yaw_trailer=0.0)
+            state['yaw_trailer'] = -art
+            poses = truck_batch.batch_rollout(state, steer, trailer_len, distance, direction, tractor_wb=tractor_wb,
+                                              state_every=spec['sample_every']).poses
+            # (샘플, 4, N) -> (N, 샘플, 4), 마지막 값은 꺾임각
+            poses[:, 3] = poses[:, 2] - poses[:, 3]
+            table.frombytes(np.ascontiguousarray(poses.transpose(2, 0, 1), dtype=np.float32).tobytes())
+            continue
+        engine = kin.KinematicsEngine(trailer_len=trailer_len, tractor_wb=tractor_wb)
+        for steer in steers:
+            for art in angles:
+                engine.set_state({'x': 0.0, 'y': 0.0, 'yaw_tractor': 0.0, 'yaw_trailer': -art})
+                samples = [(0.0, 0.0, 0.0, art)]
+                def on_step(run):
+                    done = run.steps_total - run.steps_left
+                    if done % spec['sample_every'] == 0 or done == run.steps_total:
+                        samples.append((engine.x, engine.y, engine.yaw_tractor, engine.yaw_tractor - engine.yaw_trailer))
+                engine.drive(distance, steer, direction=direction, on_step=on_step)
+                for sample in samples: table.extend(sample)
+    assert len(table) == len(GEARS) * n_s * n_a * n_d * 4
+    return table
+
+
+class MotionPrimitives:
+    def __init__(self, tractor_wb, trailer_len, table, spec=DEFAULT_SPEC):
+        self.tractor_wb = tractor_wb
+        self.trailer_len = trailer_len
+        self.spec = dict(spec)
+        self.table = table
+        self.n_a, self.n_s, self.n_d, self.n_steps = _grid(spec)
+        self.d_max = self.n_steps * kin.STEP_DIST
+
+    @classmethod
+    def build(cls, trailer_len, tractor_wb=kin.TRACTOR_WB, spec=DEFAULT_SPEC):
+        return cls(tractor_wb, trailer_len, build_table(tractor_wb, trailer_len, spec), spec)
+
+    @staticmethod
+    def cache_path(trailer_len, tractor_wb=kin.TRACTOR_WB, spec=DEFAULT_SPEC, cache_dir=CACHE_DIR):
+        return os.path.join(cache_dir, f"truck_primitives_{geometry_key(tractor_wb, trailer_len, spec)}.bin")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC: raise ValueError(f"프리미티브 캐시 형식이 아닙니다: {path}")
+            header = json.loads(f.read(struct.unpack('<I', f.read(4))[0]).decode())
+            table = array('f')
+            table.frombytes(f.read())
+        if header['byteorder'] != sys.byteorder: table.byteswap()
+        prims = cls(header['tractor_wb'], header['trailer_len'], table, header['spec'])
+        if len(table) != len(GEARS) * prims.n_s * prims.n_a * prims.n_d * 4:
+            raise ValueError(f"프리미티브 캐시 크기가 맞지 않습니다: {path}")
+        return prims
+
+    def save(self, path):
+        header = json.dumps({'tractor_wb': self.tractor_wb, 'trailer_len': self.trailer_len, 'spec': self.spec,
+                             'byteorder': sys.byteorder, 'key': geometry_key(self.tractor_wb, self.trailer_len, self.spec)}).encode()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC); f.write(struct.pack('<I', len(header))); f.write(header)
+            self.table.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_or_build(cls, trailer_len, tractor_wb=kin.TRACTOR_WB, spec=DEFAULT_SPEC, cache_dir=CACHE_DIR):
+        path = cls.cache_path(trailer_len, tractor_wb, spec, cache_dir)
+        if os.path.exists(path):
+            try:
+                return cls.load(path)
+            except (OSError, ValueError, KeyError):
+                pass   # 손상된 캐시는 다시 만듦
+        prims = cls.build(trailer_len, tractor_wb, spec)
+        prims.save(path)
+        return prims
+
+    def _corners(self, articulation_rad, steer_deg, direction):
+        # 보간에 쓸 격자 꼭짓점 [(테이블 인덱스, 가중치), ...] 와 좌우 대칭 여부. 격자 밖이면 None
+        art = math.atan2(math.sin(articulation_rad), math.cos(articulation_rad))
+        mirror = steer_deg < 0
+        if mirror: art = -art; steer_deg = -steer_deg
+        spec = self.spec
+        fa = (math.degrees(art) + spec['a_max']) / spec['a_step']
+        fs = steer_deg / spec['s_step']
+        if not (0 <= fa <= self.n_a - 1 and fs <= self.n_s - 1): return None
+        ia = min(int(fa), self.n_a - 2); ta = fa - ia
+        i_s = min(int(fs), self.n_s - 2); ts = fs - i_s
+        base_g = GEARS.index(direction) * self.n_s
+        corners = []
+        for ds, ws in ((0, 1 - ts), (1, ts)):
+            for da, wa in ((0, 1 - ta), (1, ta)):
+                if ws * wa: corners.append((((base_g + i_s + ds) * self.n_a + ia + da) * self.n_d * 4, ws * wa))
+        return mirror, corners
+
+    def _blend(self, corners, i_d):
+        # 거리 샘플 i_d 에서 꼭짓점 값을 가중 평균
+        table = self.table; out = [0.0] * 4
+        for i, w in corners:
+            i += i_d * 4
+            out[0] += w * table[i]; out[1] += w * table[i + 1]; out[2] += w * table[i + 2]; out[3] += w * table[i + 3]
+        return out
+
+    @staticmethod
+    def _mirror(d):
+        return [d[0], -d[1], -d[2], -d[3]]
+
+    def delta(self, articulation_rad, steer_deg, steps, direction):
+        """출발 자세(위치 0, 트랙터 yaw 0) 기준 (dx, dy, dyaw_tractor, 꺾임각). 격자 밖이면 None."""
+        found = self._corners(articulation_rad, steer_deg, direction)
+        if found is None or not 0 <= steps <= self.n_steps: return None
+        mirror, corners = found
+        steer_deg = abs(steer_deg)
+        spec = self.spec
+        fd = steps / spec['sample_every']
+        i_d = min(int(fd), self.n_d - 2); td = fd - i_d
+        p0 = self._blend(corners, i_d)
+
+        # 샘플 사이는 도함수를 이용한 3차 Hermite 보간
+        if td:
+            p1 = self._blend(corners, i_d + 1)
+            # 마지막 구간은 샘플 간격보다 짧을 수 있음
+            h_steps = min(spec['sample_every'], self.n_steps - i_d * spec['sample_every'])
+            td = min(1.0, (steps - i_d * spec['sample_every']) / h_steps)
+            h = h_steps * kin.STEP_DIST * direction
+            k_yaw = math.tan(math.radians(steer_deg)) / self.tractor_wb
+            m0 = (math.cos(p0[2]), math.sin(p0[2]), k_yaw, k_yaw - math.sin(p0[3]) / self.trailer_len)
+            m1 = (math.cos(p1[2]), math.sin(p1[2]), k_yaw, k_yaw - math.sin(p1[3]) / self.trailer_len)
+            t2 = td * td; t3 = t2 * td
+            h00 = 2*t3 - 3*t2 + 1; h10 = t3 - 2*t2 + td; h01 = -2*t3 + 3*t2; h11 = t3 - t2
+            p0 = [h00*p0[k] + h10*h*m0[k] + h01*p1[k] + h11*h*m1[k] for k in range(4)]
+        return self._mirror(p0) if mirror else p0
+
+    def end_state(self, state, steer_deg, distance, direction):
+        # 수동 조향으로 distance 만큼 주행한 뒤의 상태 (KinematicsEngine.drive 와 같이 int(distance/0.078) 스텝)
+        return self.state_after_steps(state, steer_deg, int(distance / kin.STEP_DIST), direction)
+
+    def state_after_steps(self, state, steer_deg, steps, direction):
+        d = self.delta(state['yaw_tractor'] - state['yaw_trailer'], steer_deg, steps, direction)
+        return None if d is None else self._apply(state, d)
+
+    @staticmethod
+    def _apply(state, d):
+        # 출발 자세 기준 변화량을 실제 위치/방향으로 강체 변환
+        dx, dy, dyaw, art = d
+        c = math.cos(state['yaw_tractor']); s = math.sin(state['yaw_tractor'])
+        yaw_tractor = state['yaw_tractor'] + dyaw
+        return {'x': state['x'] + c*dx - s*dy, 'y': state['y'] + s*dx + c*dy,
+                'yaw_tractor': yaw_tractor, 'yaw_trailer': yaw_tractor - art}
+
+    def poses(self, state, steer_deg, distance, direction):
+        # 출발부터 sample_every 스텝마다의 상태 목록 (미리보기 경로용). 격자 밖이면 None
+        steps = int(distance / kin.STEP_DIST)
+        found = self._corners(state['yaw_tractor'] - state['yaw_trailer'], steer_deg, direction)
+        if found is None or steps > self.n_steps: return None
+        mirror, corners = found
+        every = self.spec['sample_every']
+        result = []
+        for i_d in range(steps // every + 1):   # 샘플 지점은 보간 없이 테이블 값 그대로
+            d = self._blend(corners, i_d)
+            result.append(self._apply(state, self._mirror(d) if mirror else d))
+        if steps % every:
+            result.append(self.state_after_steps(state, steer_deg, steps, direction))
+        return result
+
+    def nbytes(self):
+        return self.table.itemsize * len(self.table)
+
+
+def main():
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="운동 프리미티브 테이블 캐시 생성")
+    parser.add_argument('--trailer-total', type=float, nargs='+', default=[10.5, 11.0, 11.5, 12.0, 12.5, 13.0, 13.5, 14.0],
+                        help="트레일러 총 길이 (m, 시뮬레이터 슬라이더 값)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+    for total in args.trailer_total:
+        t0 = time.perf_counter()
+        prims = MotionPrimitives.load_or_build(total - kin.TRAILER_SWING_LEN, cache_dir=args.cache_dir)
+        print(f"트레일러 {total:.1f}m: {prims.nbytes()/2**20:.1f} MiB, {time.perf_counter()-t0:.2f} s "
+              f"-> {MotionPrimitives.cache_path(prims.trailer_len, cache_dir=args.cache_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""배경 이미지 픽셀로 하는 선 접촉 검사.
+
+직접 만든 코스 이미지처럼 선분 모델(truck_course)이 없는 배경에서도 선 접촉을 검사할 수
+있도록, 이미지에서 선 색에 가까운 픽셀을 골라 각 픽셀에서 가장 가까운 선 픽셀까지의 거리
+(distance transform)를 미리 계산합니다. 이후 점 하나의 여유 거리는 배열 한 칸을 읽는 것으로
+끝나므로 매 물리 스텝마다 모든 바퀴/차체 다각형의 변을 검사할 수 있습니다.
+
+    clearance = RasterClearance.load_or_build(pil_image, image_path)
+    clearance.set_transform(bg_offset_x, bg_offset_y, bg_scale, pixels_per_meter)
+    clearance.clearance(x, y)     # 월드 좌표 (m) -> 가장 가까운 선까지의 거리 (m)
+
+거리는 MAX_CLEARANCE_PX 픽셀까지만 정확히 계산하고 그보다 먼 곳은 그 값으로 잘립니다.
+계산한 거리 배열은 이미지 파일(경로, 수정 시각, 크기)과 선 색 설정으로 만든 키를 이름으로
+cache_dir 에 저장해 두고, 같은 이미지를 다시 불러오면 파일에서 읽습니다. 배경 위치/배율은
+픽셀 거리에 곱하는 값만 바뀌므로 다시 계산하지 않습니다.
+
+NumPy 가 필요하고, SciPy 가 있으면 scipy.ndimage 의 거리 변환을 사용합니다.
+"""
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+CACHE_DIR = os.path.join("Truck_Sim", "raster_cache")   # 시뮬레이터 로그와 같은 폴더
+LINE_COLORS = ((0x00, 0x79, 0x8C),)   # course_image_making.py 의 코스 선 색 (color_structure)
+LINE_TOLERANCE = 60                   # RGB 거리 (안티앨리어싱된 선 가장자리 포함)
+MAX_CLEARANCE_PX = 64
+
+
+def line_mask(image, colors=LINE_COLORS, tolerance=LINE_TOLERANCE):
+    # PIL 이미지 -> 선 픽셀 bool 배열 (높이, 너비)
+    rgba = np.asarray(image.convert('RGBA'), dtype=np.int32)
+    mask = np.zeros(rgba.shape[:2], dtype=bool)
+    for color in colors:
+        d2 = ((rgba[..., :3] - np.asarray(color, dtype=np.int32)) ** 2).sum(axis=2)
+        mask |= d2 <= tolerance * tolerance
+    return mask & (rgba[..., 3] > 0)
+
+
+def distance_field(mask, max_px=MAX_CLEARANCE_PX):
+    """선 픽셀까지의 유클리드 거리 (픽셀, float32). max_px 보다 먼 곳은 max_px."""
+    try:
+        from scipy import ndimage
+    except ImportError:
+        ndimage = None
+    if ndimage is not None:
+        if not mask.any(): return np.full(mask.shape, max_px, dtype=np.float32)
+        return np.minimum(ndimage.distance_transform_edt(~mask), max_px).astype(np.float32)
+    height, width = mask.shape
+    far = np.float32(max_px + 1)
+    # 1) 세로 방향: 같은 열에서 가장 가까운 선 픽셀까지의 거리 (위/아래 두 번 훑기)
+    g = np.empty((height, width), dtype=np.float32)
+    run = np.full(width, far, dtype=np.float32)
+    for row in range(height):
+        run = np.where(mask[row], 0, np.minimum(run + 1, far)); g[row] = run
+    run = np.full(width, far, dtype=np.float32)
+    for row in range(height - 1, -1, -1):
+        run = np.where(mask[row], 0, np.minimum(run + 1, far)); np.minimum(g[row], run, out=g[row])
+    # 2) 가로 방향: d²(x) = min_k g(x+k)² + k²  (|k| <= max_px 이면 max_px 안쪽은 정확)
+    g2 = g * g
+    best = g2.copy()
+    for k in range(1, min(max_px, width - 1) + 1):
+        k2 = np.float32(k * k)
+        np.minimum(best[:, k:], g2[:, :-k] + k2, out=best[:, k:])
+        np.minimum(best[:, :-k], g2[:, k:] + k2, out=best[:, :-k])
+    return np.minimum(np.sqrt(best), np.float32(max_px))
+
+
+def cache_key(image_path, colors=LINE_COLORS, tolerance=LINE_TOLERANCE, max_px=MAX_CLEARANCE_PX):
+    st = os.stat(image_path)
+    key = {'version': FORMAT_VERSION, 'path': os.path.abspath(image_path), 'mtime': st.st_mtime_ns, 'size': st.st_size,
+           'colors': [list(c) for c in colors], 'tolerance': tolerance, 'max_px': max_px}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class RasterClearance:
+    _memory = {}   # 캐시 키 -> 픽셀 거리 배열 (같은 실행 안에서 다시 불러올 때, 마지막 이미지 하나만)
+
+    def __init__(self, distance_px, max_px=MAX_CLEARANCE_PX):
+        self.distance_px = distance_px
+        self.height, self.width = distance_px.shape
+        self.max_px = max_px
+        self.build_seconds = 0.0
+        self.from_cache = False
+        self.checks = 0
+        self.set_transform(0.0, 0.0, 1.0, 1.0)
+
+    @classmethod
+    def build(cls, image, colors=LINE_COLORS, tolerance=LINE_TOLERANCE, max_px=MAX_CLEARANCE_PX):
+        t0 = time.perf_counter()
+        clearance = cls(distance_field(line_mask(image, colors, tolerance), max_px), max_px)
+        clearance.build_seconds = time.perf_counter() - t0
+        return clearance
+
+    @classmethod
+    def load_or_build(cls, image, image_path=None, colors=LINE_COLORS, tolerance=LINE_TOLERANCE, max_px=MAX_CLEARANCE_PX, cache_dir=CACHE_DIR):
+        # image_path 가 없으면(파일이 아닌 이미지) 캐시 없이 계산
+        if image_path is None or not os.path.exists(image_path):
+            return cls.build(image, colors, tolerance, max_px)
+        key = cache_key(image_path, colors, tolerance, max_px)
+        path = os.path.join(cache_dir, f"truck_raster_{key}.npy")
+        t0 = time.perf_counter()
+        distance_px = cls._memory.get(key)
+        if distance_px is None and os.path.exists(path):
+            try:
+                distance_px = np.load(path).astype(np.float32)
+                if distance_px.shape != (image.size[1], image.size[0]): distance_px = None
+            except (OSError, ValueError):
+                distance_px = None   # 손상된 캐시는 다시 만듦
+        if distance_px is not None:
+            cls._remember(key, distance_px)
+            clearance = cls(distance_px, max_px)
+            clearance.build_seconds = time.perf_counter() - t0; clearance.from_cache = True
+            return clearance
+        clearance = cls.build(image, colors, tolerance, max_px)
+        cls._remember(key, clearance.distance_px)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + '.tmp.npy'
+        np.save(tmp, clearance.distance_px.astype(np.float16))   # max_px 안쪽에서 0.03px 정밀도
+        os.replace(tmp, path)
+        return clearance
+
+    @classmethod
+    def _remember(cls, key, distance_px):
+        # 8k 이미지면 배열 하나가 약 256MB 이므로 지금 이미지의 배열만 남김
+        if key not in cls._memory: cls._memory.clear()
+        cls._memory[key] = distance_px
+
+    def set_transform(self, bg_offset_x, bg_offset_y, bg_scale, pixels_per_meter):
+        # 시뮬레이터는 원본 이미지를 bg_scale 배 해서 (bg_offset_x, bg_offset_y) 를 중심으로 그림
+        transform = (bg_offset_x, bg_offset_y, bg_scale, pixels_per_meter)
+        if getattr(self, 'transform', None) == transform: return
+        self.transform = transform
+        self.m_per_px = bg_scale / pixels_per_meter
+        self.max_clearance = self.max_px * self.m_per_px
+        self._left = bg_offset_x - self.width / 2 * self.m_per_px
+        self._top = bg_offset_y + self.height / 2 * self.m_per_px
+
+    def clearance(self, x, y):
+        # 월드 좌표 한 점에서 가장 가까운 선까지의 거리 (이미지 밖이면 max_clearance)
+        col = math.floor((x - self._left) / self.m_per_px)
+        row = math.floor((self._top - y) / self.m_per_px)
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return float(self.distance_px[row, col]) * self.m_per_px   # 픽셀 -> 월드 단위 (m), 배열은 하나만 유지
+        return self.max_clearance
+
+    def check_vehicle(self, polygons, margin=0.0):
+        """{부위 이름: 다각형} -> [(부위 이름, 'image'), ...]. 테두리 위의 점 중 하나라도 선 위(거리 <= margin)면 접촉.
+
+        꼭짓점 사이에서 선이 테두리를 가로지르는 경우도 잡도록 변을 따라 1픽셀 이하 간격으로 보되,
+        선에서 먼 곳은 거리 배열 값만큼 건너뜁니다 (그 안에는 선 픽셀이 없음)."""
+        self.checks += 1
+        contacts = []
+        for part, poly in polygons.items():
+            for i in range(len(poly)):
+                if self._edge_touches(poly[i - 1], poly[i], margin):
+                    contacts.append((part, 'image')); break
+        return contacts
+
+    def _edge_touches(self, start, end, margin):
+        (x0, y0), (x1, y1) = start, end
+        length = math.hypot(x1 - x0, y1 - y0)
+        pixel = self.m_per_px
+        t = 0.0
+        while True:
+            f = t / length if length > 0 else 0.0
+            d = self.clearance(x0 + (x1 - x0) * f, y0 + (y1 - y0) * f)
+            if d <= margin: return True
+            if t >= length: return False
+            # 픽셀 칸 중심 사이 거리이므로 한 칸 대각선만큼 덜 건너뜀
+            t = min(length, t + max(d - margin - 1.5 * pixel, pixel))
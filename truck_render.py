@@ -0,0 +1,188 @@
+"""Tk Canvas 용 retained-mode 렌더러.
+
+매 프레임 canvas.delete("all") 후 모든 도형을 다시 만드는 대신, 키(문자열)별로
+캔버스 아이템을 한 번만 만들고 이후에는 바뀐 좌표/속성만 coords()/itemconfig()
+로 갱신합니다. 한 프레임 동안 그려지지 않은 아이템은 숨겨집니다. 이미지 아이템은 숨기지 않고
+지워서, 화면에서 벗어난 타일의 PhotoImage 를 캔버스가 붙잡지 않고 타일 캐시(LRU)에서 빠지면 해제되게 합니다.
+
+    renderer.begin_frame()
+    renderer.polygon('vehicle', 'truck.cab', pts, fill='#8888ff')
+    renderer.end_frame()
+
+다시 그리기는 RedrawScheduler 로 예약합니다. 이벤트 핸들러는 바뀐 그룹만 표시(request)하고,
+쌓인 요청은 유휴 시점(after_idle)에 한 프레임으로 합쳐 그립니다.
+"""
+import time
+
+
+class _Item:
+    __slots__ = ('id', 'layer', 'coords', 'options', 'hidden')
+
+    def __init__(self, item_id, layer, coords, options):
+        self.id = item_id; self.layer = layer; self.coords = coords; self.options = options; self.hidden = False
+
+
+class RetainedCanvas:
+    def __init__(self, canvas, layers):
+        self.canvas = canvas
+        self.layers = list(layers)  # 아래에서 위 순서
+        self.items = {}
+        self._touched = set()
+        self._last_in_layer = {}
+        self.stats = {'create': 0, 'coords': 0, 'itemconfig': 0, 'move': 0, 'insert': 0, 'delete': 0}
+        self._create_layer_markers()
+
+    def _create_layer_markers(self):
+        # 레이어마다 숨겨진 표식 아이템을 두고, 새 아이템은 이번 프레임에 같은 레이어에서 직전에 그린
+        # 아이템(없으면 레이어 표식) 바로 위에 끼워 넣어 나중에 생성되더라도 그리는 순서가 유지되도록 합니다.
+        self._markers = [self.canvas.create_line(0, 0, 0, 0, state='hidden') for _ in self.layers]
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.items.clear()
+        self._create_layer_markers()
+
+    def begin_frame(self):
+        self._touched = set()
+        self._last_in_layer = {}
+
+    def end_frame(self):
+        released = []
+        for key, item in self.items.items():
+            if key in self._touched: continue
+            if 'image' in item.options:
+                released.append(key)   # 숨겨 두면 아이템과 options 가 지난 PhotoImage 를 계속 붙잡음
+            elif not item.hidden:
+                self.canvas.itemconfig(item.id, state='hidden'); item.hidden = True
+                self.stats['itemconfig'] += 1
+        for key in released:
+            self.canvas.delete(self.items.pop(key).id)
+            self.stats['delete'] += 1
+
+    def _draw(self, kind, layer, key, coords, options):
+        self._touched.add(key)
+        coords = tuple(coords)
+        item = self.items.get(key)
+        if item is None:
+            item_id = getattr(self.canvas, 'create_' + kind)(*coords, tags=(layer,), **options)
+            below = self._last_in_layer.get(layer, self._markers[self.layers.index(layer)])
+            self.canvas.tag_raise(item_id, below)
+            self.items[key] = _Item(item_id, layer, coords, dict(options))
+            self._last_in_layer[layer] = item_id
+            self.stats['create'] += 1
+            return item_id
+
+        changed = {k: v for k, v in options.items() if item.options.get(k) != v}
+        if item.hidden:
+            changed['state'] = 'normal'; item.hidden = False
+        if changed:
+            self.canvas.itemconfig(item.id, **changed); item.options.update(changed)
+            self.stats['itemconfig'] += 1
+        if coords != item.coords:
+            if kind in ('image', 'text'):
+                self.canvas.move(item.id, coords[0] - item.coords[0], coords[1] - item.coords[1])
+                self.stats['move'] += 1
+            else:
+                self.canvas.coords(item.id, *coords)
+                self.stats['coords'] += 1
+            item.coords = coords
+        self._last_in_layer[item.layer] = item.id
+        return item.id
+
+    def polygon(self, layer, key, coords, **options):
+        return self._draw('polygon', layer, key, coords, options)
+
+    def line(self, layer, key, coords, **options):
+        return self._draw('line', layer, key, coords, options)
+
+    def oval(self, layer, key, coords, **options):
+        return self._draw('oval', layer, key, coords, options)
+
+    def rectangle(self, layer, key, coords, **options):
+        return self._draw('rectangle', layer, key, coords, options)
+
+    def text(self, layer, key, x, y, **options):
+        return self._draw('text', layer, key, (x, y), options)
+
+    def image(self, layer, key, x, y, **options):
+        return self._draw('image', layer, key, (x, y), options)
+
+    def extend_line(self, key, coords, drop=0, trim=None):
+        # 기존 선의 앞쪽 drop 개의 점과 (trim 을 주면, drop 이후 기준) trim 번째 점을 제거하고 끝에 점을 덧붙임 (canvas.dchars / insert)
+        self._touched.add(key)
+        item = self.items[key]
+        if item.hidden:
+            self.canvas.itemconfig(item.id, state='normal'); item.hidden = False
+        if drop:
+            self.canvas.dchars(item.id, 0, 2*drop - 1)
+        if trim is not None:
+            self.canvas.dchars(item.id, 2*trim, 2*trim + 1)
+        if coords:
+            self.canvas.insert(item.id, 'end', coords)
+            self.stats['insert'] += 1
+        item.coords = None  # 좌표를 더 이상 추적하지 않음 (다음 line() 호출 시 전체 갱신)
+        self._last_in_layer[item.layer] = item.id
+
+    def has(self, key):
+        return key in self.items
+
+    def skip(self, key):
+        # 이번 프레임에 그리지 않은 것으로 되돌림 (move_layer 등으로 건드렸어도 end_frame 에서 숨김)
+        self._touched.discard(key)
+
+    def touch_layer(self, layer):
+        # 이번 프레임에 변경 없이 그대로 유지할 레이어
+        for key, item in self.items.items():
+            if item.layer == layer and not item.hidden:
+                self._touched.add(key)
+
+    def touch_prefix(self, prefixes):
+        # 키가 prefixes(문자열 또는 튜플)로 시작하는 아이템을 이번 프레임에 그대로 유지
+        for key, item in self.items.items():
+            if not item.hidden and key.startswith(prefixes):
+                self._touched.add(key)
+
+    def move_layer(self, layer, dx, dy):
+        # 레이어 전체를 평행 이동 (canvas.move 한 번)
+        if dx or dy:
+            self.canvas.move(layer, dx, dy)
+            self.stats['move'] += 1
+            for item in self.items.values():
+                if item.layer == layer and item.coords is not None:
+                    item.coords = tuple(c + (dx if i % 2 == 0 else dy) for i, c in enumerate(item.coords))
+        self.touch_layer(layer)
+
+
+class RedrawScheduler:
+    """다시 그리기 요청을 모아 한 프레임에 한 번만 그립니다.
+
+    request(*groups) 는 바뀐 그룹을 dirty 로 표시하고, 예약이 없으면 after_idle 로 draw(dirty) 를 예약합니다
+    (직전에 그린 지 interval_ms 가 지나지 않았으면 남은 시간 뒤로). 마우스 드래그처럼 이벤트가 몰려도
+    예약은 하나뿐이고, 그리기는 마지막 상태로 한 번만 합니다. groups 를 생략하면 전체(all_groups)입니다.
+    stats 의 requested / performed 로 요청 대비 실제로 그린 횟수를 셉니다.
+    """
+
+    def __init__(self, root, draw, all_groups, interval_ms=16):
+        self.root = root; self.draw = draw
+        self.all_groups = frozenset(all_groups)
+        self.interval_ms = interval_ms
+        self.dirty = set()
+        self.stats = {'requested': 0, 'performed': 0}
+        self._id = None
+        self._last = None   # 마지막으로 그린 시각 (perf_counter)
+
+    def request(self, *groups):
+        self.stats['requested'] += 1
+        self.dirty.update(groups or self.all_groups)
+        if self._id is not None: return
+        wait = 0 if self._last is None else self.interval_ms - (time.perf_counter() - self._last) * 1000
+        self._id = self.root.after(int(wait) + 1, self.flush) if wait >= 1 else self.root.after_idle(self.flush)
+
+    def flush(self):
+        # 예약된 다시 그리기를 지금 수행 (대화상자를 띄우기 직전 등). 표시된 그룹이 없으면 아무것도 하지 않음
+        if self._id is not None:
+            self.root.after_cancel(self._id); self._id = None
+        if not self.dirty: return
+        dirty = self.dirty; self.dirty = set()
+        self._last = time.perf_counter(); self.stats['performed'] += 1
+        self.draw(dirty)
@@ -0,0 +1,261 @@
+"""조작 기록 견고성 분석 (Monte Carlo).
+
+조작 기록의 주행 입력(조향각, 거리, 제어 모드 ...)을 그대로 다시 주행하되, 조향각/거리/트레일러
+길이에 잡음을 넣은 수천 대를 truck_batch 로 한꺼번에 주행해 봅니다. 한 번 성공한 기록이
+조향 1° 실수에도 잭나이프나 선 접촉으로 이어지는지(얼마나 너그러운지)를 봅니다.
+
+    report = analyze(start, actions, trailer_len, course=CourseTransform.from_background(...))
+    print("\\n".join(report.summary_lines()))
+
+- 성공: 모든 조작을 잭나이프(꺾임각 90°, 후진 포함) 없이 마치고, 코스를 주면 차체 모서리/바퀴 바깥 모서리가
+  코스 선에 닿지 않은 것 (선까지 거리는 COURSE_RESOLUTION 격자로 조회).
+- 여유 거리: 코스를 주면 주행 중 코스 선까지의 최소 거리, 없으면 잭나이프 한계까지 남은 꺾임각.
+- 가장 민감한 조작: 조작 하나에만 잡음을 넣은 주행(조작마다 sensitivity_samples 대)을 같은 배치에
+  넣어, 실패율이 가장 높은(같으면 마지막 자세가 가장 많이 벗어나는) 조작.
+
+잡음은 정규분포이고 조향각(°)과 트레일러 길이(m)는 더하고, 거리는 비율로 곱합니다. 자동 조향
+모드(maintain, mpc)의 조향각은 제어기가 정하므로 조향 잡음이 영향을 주지 않습니다.
+
+GUI 없이 실행: python truck_robustness.py [조작 파일] (시뮬레이터의 '조작 기록 견고성 분석'이
+분석한 조작 순서를 MANEUVERS_FILE 에 저장합니다)
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import truck_kinematics as kin
+from truck_batch import batch_rollout, JACKKNIFE
+
+MANEUVERS_FILE = os.path.join("Truck_Sim", "robustness_maneuvers.json")
+SAMPLES = 2000
+SENSITIVITY_SAMPLES = 200
+STEER_SIGMA_DEG = 1.0
+DISTANCE_SIGMA = 0.03            # 거리 잡음 (비율)
+TRAILER_LEN_SIGMA = 0.1          # 트레일러 길이 잡음 (m)
+COURSE_RESOLUTION = 0.05         # 코스 선까지 거리 격자 (m)
+COURSE_MAX_CLEARANCE = 3.0
+CHECK_EVERY = 2                  # 선까지 거리를 몇 스텝마다 잴지
+
+NOMINAL_TEXT = {'ok': "성공", 'jackknife': "실패 (잭나이프)", 'contact': "실패 (선 접촉)"}
+
+# 차체 검사점 (길이 방향, 옆 방향): 트랙터는 킹핀 기준, 트레일러는 (상수, trailer_len 계수, 옆 방향)
+_W = kin.TRACTOR_WIDTH / 2
+
+
+def _tractor_points(tractor_wb):
+    points = [(tractor_wb + 0.5, _W), (tractor_wb + 0.5, -_W), (-1.0, _W), (-1.0, -_W)]
+    for axle, half_width in ((tractor_wb, 0.15), (0.65, 0.25), (-0.65, 0.25)):
+        for side in (1, -1):
+            points += [(axle + 0.4, side * (_W + half_width)), (axle - 0.4, side * (_W + half_width))]
+    return np.array(points)
+
+
+# 컨테이너 앞(킹핀 1.5m 뒤)과 뒤끝(trailer_len + kin.TRAILER_REAR_OVERHANG), 트레일러 바퀴 바깥 모서리(축 중심 trailer_len - 0.5m 뒤 ±0.55m)
+_TRAILER_POINTS = np.array(
+    [(-1.5, 0.0, _W), (-1.5, 0.0, -_W), (-kin.TRAILER_REAR_OVERHANG, -1.0, _W), (-kin.TRAILER_REAR_OVERHANG, -1.0, -_W)] +
+    [(0.5 + axle + long, -1.0, side * (_W + 0.25)) for axle in (0.55, -0.55) for long in (0.4, -0.4) for side in (1, -1)])
+
+
+class CourseClearance:
+    """코스 선까지 거리 격자 (배열 조회, truck_planner.ClearanceGrid 의 거리 배열)."""
+
+    def __init__(self, transform, resolution=COURSE_RESOLUTION, max_clearance=COURSE_MAX_CLEARANCE):
+        from truck_course import CourseGeometry
+        from truck_planner import ClearanceGrid
+        geometry = CourseGeometry.build(transform)
+        grid = ClearanceGrid([s for s in geometry.segments if s[1] in geometry.kinds], resolution, max_clearance=max_clearance)
+        self.field = grid.field; self.left = grid.left; self.bottom = grid.bottom; self.resolution = resolution
+        self._flat = self.field.ravel()
+
+    def lookup(self, x, y):
+        return self.lookup_cells((x - self.left) / self.resolution, (y - self.bottom) / self.resolution)
+
+    def lookup_cells(self, col, row):
+        # 격자 칸 좌표로 조회. 격자 테두리는 선에서 4m 이상 떨어져 있어 (ClearanceGrid 의 margin) 밖의 점은 테두리 칸으로 잘라 읽음
+        height, width = self.field.shape
+        col = np.clip(col.astype(np.int32), 0, width - 1)
+        row = np.clip(row.astype(np.int32), 0, height - 1)
+        return np.take(self._flat, row * width + col)
+
+
+def vehicle_clearance(clearance, state, trailer_len, tractor_wb=kin.TRACTOR_WB):
+    """차량마다 검사점 중 코스 선까지 가장 가까운 거리 (길이 N)."""
+    # 격자 칸 단위 float32 로 계산 (검사점 수 x 차량 수 배열이 커서)
+    inv = np.float32(1.0 / clearance.resolution)
+    gx = ((state['x'] - clearance.left) * inv).astype(np.float32)[:, None]
+    gy = ((state['y'] - clearance.bottom) * inv).astype(np.float32)[:, None]
+    distances = []; tractor = _tractor_points(tractor_wb)
+    for yaw, lon, lat in ((state['yaw_tractor'], tractor[:, 0], tractor[:, 1]),
+                          (state['yaw_trailer'], _TRAILER_POINTS[:, 0] + _TRAILER_POINTS[:, 1] * np.asarray(trailer_len, dtype=float)[:, None],
+                           _TRAILER_POINTS[:, 2])):
+        c = (np.cos(yaw) * inv).astype(np.float32)[:, None]; s = (np.sin(yaw) * inv).astype(np.float32)[:, None]
+        lon = np.asarray(lon, dtype=np.float32); lat = np.asarray(lat, dtype=np.float32)
+        distances.append(clearance.lookup_cells(gx + lon * c - lat * s, gy + lon * s + lat * c).min(axis=1))
+    return np.minimum(*distances)
+
+
+class RobustnessReport:
+    def __init__(self):
+        self.samples = 0
+        self.success_rate = 0.0
+        self.jackknife_rate = 0.0
+        self.contact_rate = 0.0
+        self.worst_clearance = None      # 코스: 선까지 최소 거리 (m), 코스 없음: 잭나이프까지 남은 꺾임각 (°)
+        self.clearance_p5 = None
+        self.nominal_clearance = None
+        self.nominal_status = None       # 잡음 없이 다시 주행한 결과: 'ok', 'jackknife', 'contact'
+        self.clearance_unit = 'm'
+        self.final_offset_mean = 0.0     # 마지막 킹핀 위치가 잡음 없는 주행과 떨어진 거리 (m)
+        self.final_offset_p95 = 0.0
+        self.steps = []                  # 조작마다 {'failure_rate', 'offset_mean'} (그 조작에만 잡음)
+        self.sensitive_step = None       # 가장 민감한 조작 번호 (0부터)
+        self.rollouts = 0
+        self.seconds = 0.0
+        self.noise = {}
+
+    def summary_lines(self):
+        unit = self.clearance_unit
+        what = "코스 선까지" if unit == 'm' else "잭나이프까지 남은 꺾임각"
+        lines = [f"견고성 분석: 조작 {len(self.steps)}개, 잡음 주행 {self.samples}대 (조향 ±{self.noise['steer_sigma_deg']}°, "
+                 f"거리 ±{self.noise['distance_sigma']*100:.0f}%, 트레일러 길이 ±{self.noise['trailer_len_sigma']}m, 1σ)",
+                 f"  잡음 없는 주행: {NOMINAL_TEXT[self.nominal_status]}",
+                 f"  성공 확률 {self.success_rate*100:.1f}% (잭나이프 {self.jackknife_rate*100:.1f}%, 선 접촉 {self.contact_rate*100:.1f}%)",
+                 f"  {what}: 최악 {self.worst_clearance:.2f}{unit}, 하위 5% {self.clearance_p5:.2f}{unit}, 잡음 없음 {self.nominal_clearance:.2f}{unit}",
+                 f"  마지막 킹핀 위치 차이: 평균 {self.final_offset_mean:.2f}m, 95% {self.final_offset_p95:.2f}m"]
+        if self.sensitive_step is not None:
+            step = self.steps[self.sensitive_step]
+            lines.append(f"  가장 민감한 조작: {self.sensitive_step + 1}번째 (그 조작만 잡음: 실패 {step['failure_rate']*100:.1f}%, "
+                         f"위치 차이 평균 {step['offset_mean']:.2f}m)")
+        lines.append(f"  {self.rollouts}대 일괄 주행, {self.seconds:.2f}s")
+        return lines
+
+
+def analyze(start, actions, trailer_len, course=None, samples=SAMPLES, sensitivity_samples=SENSITIVITY_SAMPLES,
+            steer_sigma_deg=STEER_SIGMA_DEG, distance_sigma=DISTANCE_SIGMA, trailer_len_sigma=TRAILER_LEN_SIGMA,
+            tractor_wb=kin.TRACTOR_WB, seed=0):
+    """start (x, y, yaw_tractor, yaw_trailer) 에서 actions (조작 기록 형식) 를 잡음을 넣어 다시 주행한 RobustnessReport.
+
+    course: 코스 선 접촉까지 보려면 CourseTransform (코스 좌표 -> 월드)."""
+    t0 = time.perf_counter()
+    actions = list(actions)
+    m = len(actions)
+    rng = np.random.default_rng(seed)
+    # 행: [잡음 없음 1대] + [전체 잡음 samples 대] + [조작 i 에만 잡음 sensitivity_samples 대] * m
+    n = 1 + samples + m * sensitivity_samples
+    steer_noise = np.zeros((m, n)); scale = np.ones((m, n)); tlen = np.full(n, float(trailer_len))
+    full = slice(1, 1 + samples)
+    steer_noise[:, full] = rng.normal(0.0, steer_sigma_deg, (m, samples))
+    scale[:, full] = 1.0 + rng.normal(0.0, distance_sigma, (m, samples))
+    tlen[full] += rng.normal(0.0, trailer_len_sigma, samples)
+    for i in range(m):
+        rows = slice(1 + samples + i * sensitivity_samples, 1 + samples + (i + 1) * sensitivity_samples)
+        steer_noise[i, rows] = rng.normal(0.0, steer_sigma_deg, sensitivity_samples)
+        scale[i, rows] = 1.0 + rng.normal(0.0, distance_sigma, sensitivity_samples)
+    scale = np.maximum(scale, 0.0)
+
+    clearance = CourseClearance(course) if course is not None else None
+    state = {k: np.full(n, float(start[k])) for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')}
+    failed_jackknife = np.zeros(n, dtype=bool)
+    margin = np.full(n, np.inf)              # 선까지 최소 거리
+    articulation = np.zeros(n)               # 가장 크게 꺾인 각도 (후진 포함, [-90, 90] 으로 접지 않음)
+    waiting = np.zeros(n, dtype=bool)        # 아직 잡음 조작 전인 민감도 행 (잡음 없는 행과 같으므로 주행하지 않음)
+
+    def measure(iteration, state, active):
+        rows = np.flatnonzero(active) if active is not None else np.arange(n)
+        raw = state['yaw_tractor'][rows] - state['yaw_trailer'][rows]
+        articulation[rows] = np.maximum(articulation[rows], np.degrees(np.abs(np.arctan2(np.sin(raw), np.cos(raw)))))
+        if clearance is not None and iteration % CHECK_EVERY == 0:
+            part = {k: v[rows] for k, v in state.items()}
+            margin[rows] = np.minimum(margin[rows], vehicle_clearance(clearance, part, tlen[rows], tractor_wb))
+
+    measure(0, state, None)
+    for i, action in enumerate(actions):
+        # 조작 i 에만 잡음을 넣는 행은 여기서 잡음 없는 행의 결과를 복사해 출발
+        if i == 0: waiting[1 + samples:] = True
+        rows = slice(1 + samples + i * sensitivity_samples, 1 + samples + (i + 1) * sensitivity_samples)
+        waiting[rows] = False
+        for k in state: state[k][rows] = state[k][0]
+        margin[rows] = margin[0]; articulation[rows] = articulation[0]; failed_jackknife[rows] = failed_jackknife[0]
+        # 잭나이프로 멈춘 차량은 이후 조작을 주행하지 않음
+        distance = np.where(failed_jackknife | waiting, 0.0, action['distance'] * scale[i])
+        result = batch_rollout(state, np.radians(action['steer_deg'] + steer_noise[i]), tlen, distance, action['direction'],
+                               action['mode'], action['target_angle'], tractor_wb=tractor_wb, on_step=measure)
+        state = {k: v.copy() for k, v in result.state.items()}
+        failed_jackknife |= result.status == JACKKNIFE
+        if clearance is not None: measure(0, state, ~waiting)
+    # 후진 중에 90° 를 넘긴 것도 잭나이프로 봄 (시뮬레이터는 전진에서만 멈춤)
+    failed_jackknife |= articulation >= kin.JACKKNIFE_LIMIT_DEG
+    if clearance is None: margin = kin.JACKKNIFE_LIMIT_DEG - articulation
+    contact = margin <= 0 if clearance is not None else np.zeros(n, dtype=bool)
+    failed = failed_jackknife | contact
+    offset = np.hypot(state['x'] - state['x'][0], state['y'] - state['y'][0])
+
+    report = RobustnessReport()
+    report.samples = samples
+    report.noise = {'steer_sigma_deg': steer_sigma_deg, 'distance_sigma': distance_sigma, 'trailer_len_sigma': trailer_len_sigma}
+    report.success_rate = float(1.0 - failed[full].mean()) if samples else 1.0
+    report.jackknife_rate = float(failed_jackknife[full].mean()) if samples else 0.0
+    report.contact_rate = float(contact[full].mean()) if samples else 0.0
+    report.clearance_unit = 'm' if clearance is not None else '°'
+    sampled = margin[full] if samples else margin[:1]
+    report.worst_clearance = float(sampled.min()); report.clearance_p5 = float(np.percentile(sampled, 5))
+    report.nominal_clearance = float(margin[0])
+    report.nominal_status = 'jackknife' if failed_jackknife[0] else 'contact' if contact[0] else 'ok'
+    report.final_offset_mean = float(offset[full].mean()) if samples else 0.0
+    report.final_offset_p95 = float(np.percentile(offset[full], 95)) if samples else 0.0
+    for i in range(m):
+        rows = slice(1 + samples + i * sensitivity_samples, 1 + samples + (i + 1) * sensitivity_samples)
+        report.steps.append({'failure_rate': float(failed[rows].mean()) if sensitivity_samples else 0.0,
+                             'offset_mean': float(offset[rows].mean()) if sensitivity_samples else 0.0})
+    if m and sensitivity_samples:
+        report.sensitive_step = max(range(m), key=lambda i: (report.steps[i]['failure_rate'], report.steps[i]['offset_mean']))
+    report.rollouts = n
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def save_maneuvers(path, start, actions, trailer_len, course=None):
+    # GUI 없이 다시 분석할 수 있도록 조작 순서를 JSON 으로 저장 (course: CourseTransform 또는 None)
+    data = {'trailer_len': trailer_len,
+            'start': {k: start[k] for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')},
+            'actions': [{k: a[k] for k in ('distance', 'direction', 'mode', 'steer_deg', 'target_angle')} for a in actions],
+            'course': None if course is None else {'origin_x': course.origin_x, 'origin_y': course.origin_y, 'scale': course.scale}}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def load_maneuvers(path):
+    # -> (start, actions, trailer_len, course)
+    from truck_course import CourseTransform
+    with open(path) as f:
+        data = json.load(f)
+    course = data.get('course')
+    return data['start'], data['actions'], data['trailer_len'], CourseTransform(**course) if course else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조작 기록 견고성 분석 (Monte Carlo)")
+    parser.add_argument('path', nargs='?', default=MANEUVERS_FILE, help=f"조작 파일 (기본: {MANEUVERS_FILE})")
+    parser.add_argument('--samples', type=int, default=SAMPLES)
+    parser.add_argument('--sensitivity-samples', type=int, default=SENSITIVITY_SAMPLES)
+    parser.add_argument('--steer-sigma', type=float, default=STEER_SIGMA_DEG, help="조향각 잡음 (°, 1σ)")
+    parser.add_argument('--distance-sigma', type=float, default=DISTANCE_SIGMA, help="거리 잡음 (비율, 1σ)")
+    parser.add_argument('--trailer-sigma', type=float, default=TRAILER_LEN_SIGMA, help="트레일러 길이 잡음 (m, 1σ)")
+    parser.add_argument('--no-course', action='store_true', help="코스 선 접촉을 보지 않음")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    start, actions, trailer_len, course = load_maneuvers(args.path)
+    report = analyze(start, actions, trailer_len, None if args.no_course else course, args.samples, args.sensitivity_samples,
+                     args.steer_sigma, args.distance_sigma, args.trailer_sigma, seed=args.seed)
+    print("\n".join(report.summary_lines()))
+    for i, (action, step) in enumerate(zip(actions, report.steps), 1):
+        print(f"  {i:2d}. {'전진' if action['direction'] == 1 else '후진'} {action['distance']}m 조향 {action['steer_deg']:+.0f}° "
+              f"({action['mode']}): 실패 {step['failure_rate']*100:5.1f}%, 위치 차이 {step['offset_mean']:.2f}m")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,41 @@ from tkinter import filedialog, ttk, messagebox
 import math
 import logging
 import os
-from collections import deque
 import json # Import json module
+import time
+import threading
+import truck_kinematics as kin
+from truck_render import RetainedCanvas, RedrawScheduler
+from truck_paths import WheelPaths, PathSnapshot, PATH_TOLERANCE
+from truck_history import HistoryTree, replay_actions
+from truck_predict import TrajectoryPredictor, TRACK_WHEELS
+from truck_primitives import MotionPrimitives
+from truck_course import CourseGeometry, CourseTransform, VECTOR_COURSE_ORIGIN, COURSE_STYLES, course_drawing
+from truck_planner import PlanProcess, PlanningError, PORTFOLIO
+from truck_target import solve_target
+from truck_robustness import analyze as analyze_robustness, save_maneuvers, MANEUVERS_FILE
+from truck_swept import SweptArea
+from truck_exam import ExamScorer
+from truck_lod import LevelOfDetail, DrawnTrail, window_contains, ZOOM_STEP, MIN_PIXELS_PER_METER, MAX_PIXELS_PER_METER
+
+
+def _engine_attr(name):
+    # 차량 상태와 치수는 KinematicsEngine 이 보관하고, GUI 는 이를 그대로 노출합니다.
+    return property(lambda self: getattr(self.engine, name), lambda self, value: setattr(self.engine, name, value))
+
 
 class TractorTrailerSim:
     CONFIG_FILE = "truck_sim_config.json" # Define config file constant
+    LEGACY_DEFAULT_BACKGROUND = "course.png" # 예전 기본 배경 (이제는 벡터 코스로 대신 그림)
+    BASE_PIXELS_PER_METER = 12 # 확대/축소 전 기본 배율 (배경 이미지 배율/위치의 기준)
+    # 다시 그리기 그룹 -> 캔버스 아이템 키 접두사 (request_redraw 로 바뀐 그룹만 표시, 화면 이동/배율 변경은 전체)
+    REDRAW_GROUPS = {'background': ('bg', 'course.'), 'grid': ('grid.',), 'paths': ('path.', 'swept.'),
+                     'vehicle': ('truck.', 'predict.'), 'ghost': ('ghost.', 'target.'),
+                     'hud': ('info_display', 'contact_warning', 'exam_status', 'zoom')}
+    x = _engine_attr('x'); y = _engine_attr('y')
+    yaw_tractor = _engine_attr('yaw_tractor'); yaw_trailer = _engine_attr('yaw_trailer')
+    tractor_wb = _engine_attr('tractor_wb'); trailer_len = _engine_attr('trailer_len')
+
     def __init__(self, root):
         self.root = root
         self.root.title("트랙터-트레일러 주행 시뮬레이터 (v1.9.1 - 기본 배경 자동 로드 기능 추가)")
@@ -16,33 +46,70 @@ class TractorTrailerSim:
         self.setup_logging()
         
         # --- 상수 및 변수 ---
-        self.tractor_wb = 3.8
-        self.trailer_swing_len = 2.0 # Fixed length of the light blue gooseneck part
+        self.trailer_swing_len = kin.TRAILER_SWING_LEN # Fixed length of the light blue gooseneck part
         # Trailer length var now controls the TOTAL length (gooseneck + container)
         self.trailer_len_var = tk.DoubleVar(value=11.5) # 기본 총 길이 (하늘색 2.0 + 핑크색 9.5)
         # self.trailer_len is the length of the pink part, calculated from the total length
-        self.trailer_len = self.trailer_len_var.get() - self.trailer_swing_len
-        self.tractor_width = 2.5
-        self.pixels_per_meter = 12 
+        self.engine = kin.KinematicsEngine(trailer_len=self.trailer_len_var.get() - self.trailer_swing_len)
+        self.tractor_width = self.engine.tractor_width
+        self.pixels_per_meter = self.BASE_PIXELS_PER_METER # 현재 화면 배율 (마우스 휠로 확대/축소)
+        self.lod = LevelOfDetail() # 배율별 상세도와 화면 밖 도형 생략 (truck_lod)
+        self._frame_view = None # 이번 프레임 화면의 월드 좌표 사각형 (left, bottom, right, top)
         self.x = 0.0; self.y = 0.0; self.yaw_tractor = 0.0; self.yaw_trailer = 0.0
-        self.wheel_paths = {}; self.max_path_points = 2000
+        self.max_path_points = 2000
+        self.path_tolerance = PATH_TOLERANCE # 궤적 단순화 허용 오차 (m), 0 이면 스텝마다 저장
+        self.wheel_paths = WheelPaths.start(self.engine.wheel_positions(), maxlen=self.max_path_points, tolerance=self.path_tolerance)
         
-        self.bg_photo = None
+        self.bg_photo = None # Pillow 가 없을 때만 사용 (tk.PhotoImage, 배율 조절 불가)
         self.pil_bg_image = None
+        self.bg_cache = None # 배경 이미지 피라미드 + 화면 타일 LRU (BackgroundCache)
+        self._bg_draft_id = None # 배율 슬라이더를 끄는 동안 초안 타일, 멈추면 이 예약으로 LANCZOS 타일로 다시 그림
         self.bg_offset_x = 0.0
         self.bg_offset_y = 0.0
         self.bg_scale = 1.0
         self.bg_image_path = None # Initialize background image path
+        self.course_drawing = None # 배경 이미지가 없을 때 그리는 벡터 코스 (월드 좌표 선/글자)
+        self._course_view = None # 벡터 코스가 마지막으로 투영된 뷰 (offset_x, offset_y, pixels_per_meter)
         
         # --- 제어 변수 ---
         self.var_gear = tk.StringVar(value="F") 
         self.auto_follow = tk.BooleanVar(value=True) 
         self.angle_control_mode = tk.StringVar(value="manual") 
-        self.initial_angle_for_stop = None
-        self.previous_angle_error = None
+        self.drive_run = None # 진행 중인 주행 (kin.DriveRun)
+        self.drive_clock = kin.FixedStepClock() # 물리 스텝은 화면 갱신과 독립적으로 진행
+        self.frame_interval_ms = 16 # 주행 중 화면 갱신 간격 상한 (~60fps)
+        self.instant_drive = tk.BooleanVar(value=False) # 중간 프레임 없이 즉시 주행 완료
+        self.show_prediction = tk.BooleanVar(value=True) # 현재 조작으로 주행했을 때의 예상 경로 표시
+        self.predictor = TrajectoryPredictor()
+        self._prediction_poll_id = None # MPC 미리보기 계산이 끝났는지 확인하는 after id
+        # 이벤트마다 그리지 않고 바뀐 그룹을 모아 한 프레임에 한 번만 다시 그리기 (request_redraw)
+        self.redraw = RedrawScheduler(self.root, self._redraw_dirty, self.REDRAW_GROUPS, self.frame_interval_ms)
+        self._redraw_steer = None # 예약된 다시 그리기의 조향각 (None 이면 조향 슬라이더 값)
+        self._scene_view = None # 마지막으로 그린 화면 (뷰 위치, 배율, 캔버스 크기)
+        self._drive_redraw_stats = dict(self.redraw.stats) # 주행 시작 시점의 다시 그리기 횟수
+        self._drive_action = None
+        self._drive_paths = None
+        self.check_course_contact = tk.BooleanVar(value=True) # 주행 중 차체가 코스 선에 닿는지 검사
+        self.show_swept_area = tk.BooleanVar(value=True) # 마지막 조작이 쓸고 간 면적 표시
+        self.swept_area = SweptArea() # 조작 하나 동안 캡/구즈넥/컨테이너가 덮은 격자 (start_drive 마다 새로)
+        self._swept_photos = {} # 타일 -> (version, 픽셀 크기, PhotoImage)
+        self.course_geometry = None # 배경 코스 이미지에 맞춘 선분 모델 (CourseGeometry)
+        self.course_transform = None # 코스 좌표 -> 월드 좌표 (자동 경로 계획에 사용)
+        self.exam = ExamScorer() # 정지선 통과/선 접촉/전후진 전환 채점 (코스 배치는 _build_course_geometry 에서)
+        self._planning = None # 진행 중인 자동 경로 계획 {'start', 'process'}
+        self.plan_in_pool = tk.BooleanVar(value=False) # 자동 경로 설정(PORTFOLIO)들을 여러 코어에서 동시에 탐색
+        self._robustness = None # 진행 중인 견고성 분석 {'report', 'error', 'thread'}
+        self.target_solution = None # 목표 지점 풀이 (truck_target.TargetSolution), 고스트로 미리보기
+        self._target_pick = False # 다음 캔버스 클릭을 목표 지점으로 받음
+        self.target_control_frame = None
+        self.contact_from_image = tk.BooleanVar(value=False) # 선분 모델 대신 배경 이미지의 선 픽셀로 검사
+        self.raster_clearance = None # 배경 이미지의 선까지 거리 (truck_raster.RasterClearance)
+        self.course_contacts = [] # 현재 닿아 있는 [(부위, 선분), ...]
+        self._contact_logged = False # 주행마다 첫 접촉만 기록
         
         # --- History & Presets ---
-        self.history = deque(maxlen=50)
+        self.history = HistoryTree(replay=self._replay_history)
+        self.history_rows = [] # 목록에 표시 중인 노드 (루트부터 활성 분기를 따라)
         self._ignore_history_selection = False
         self.presets = {}
         self.PRESETS_FILE = "truck_sim_presets.json"
@@ -76,6 +143,12 @@ class TractorTrailerSim:
         self.canvas_width = 900; self.canvas_height = 700
         self.canvas = tk.Canvas(root, width=self.canvas_width, height=self.canvas_height, bg="#f0f0f0", cursor="fleur")
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.renderer = RetainedCanvas(self.canvas, ('background', 'grid', 'course', 'swept', 'paths', 'prediction', 'vehicle', 'hud'))
+        self._grid_start = None # 그리드가 마지막으로 그려진 위치 (move 기준)
+        self._grid_gap = None # 그리드 간격 (픽셀), 배율이 바뀌면 다시 만듦
+        self._paths_view = None # 궤적이 마지막으로 투영된 뷰 (offset_x, offset_y, pixels_per_meter)
+        self._paths_window = None # 궤적을 그린 창 (월드 좌표, LOD), 화면이 벗어나면 다시 그림
+        self._paths_drawn = {}  # 바퀴 이름 -> DrawnTrail (그린 조각과 점의 누적 인덱스)
 
         self.right_frame = tk.Frame(root, padx=10, pady=10, width=250)
         self.right_frame.pack(side=tk.RIGHT, fill=tk.Y)
@@ -84,12 +157,15 @@ class TractorTrailerSim:
         # 마우스 이벤트 바인딩
         self.canvas.bind("<ButtonPress-1>", self._pan_start)
         self.canvas.bind("<B1-Motion>", self._pan_move)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(sequence, self._on_zoom_wheel)
 
         self.setup_controls()
         self.setup_preset_panel()   # New method for preset panel
         self.setup_history_panel()  # Existing method for history panel
         self._load_config()         # Load general config
         self._setup_default_background() # Load default background if needed
+        self._build_course_geometry()
         self._load_presets()        # New method to load presets from file
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -98,6 +174,7 @@ class TractorTrailerSim:
         
         # 초기 상태 저장
         self.reset_simulation()
+        self._load_primitives()
 
     def setup_logging(self):
         log_dir="Truck_Sim"; 
@@ -125,7 +202,7 @@ class TractorTrailerSim:
                         self.scale_bg_y.set(self.bg_offset_y)
                         self.scale_bg_scale.set(int(self.bg_scale * 100))
                     
-                    if self.bg_image_path and os.path.exists(self.bg_image_path):
+                    if self.bg_image_path and self.bg_image_path != self.LEGACY_DEFAULT_BACKGROUND and os.path.exists(self.bg_image_path):
                         self._load_background_from_path(self.bg_image_path)
                     
                     self.logger.info(f"설정 로드 완료: {self.CONFIG_FILE}")
@@ -136,24 +213,13 @@ class TractorTrailerSim:
             self._save_config() # Create a default config file
 
     def _setup_default_background(self):
-        # If no background is configured, try to load the default 'course.png'
-        if self.bg_image_path is None or not os.path.exists(self.bg_image_path):
-            default_image_path = "course.png"
-            if os.path.exists(default_image_path):
-                self.logger.info(f"기본 배경 이미지 '{default_image_path}'를 로드합니다.")
-                if self._load_background_from_path(default_image_path):
-                    self.bg_image_path = default_image_path
-                    self.bg_offset_x = -27.0
-                    self.bg_offset_y = -11.0
-                    self.bg_scale = 1.05 # 105%
-
-                    # Update UI controls if they exist
-                    if hasattr(self, 'scale_bg_x'):
-                        self.scale_bg_x.set(self.bg_offset_x)
-                        self.scale_bg_y.set(self.bg_offset_y)
-                        self.scale_bg_scale.set(int(self.bg_scale * 100))
-                    
-                    self._save_config() # Save these new defaults
+        # 배경 이미지가 없으면 코스를 벡터로 그립니다 (_build_course_geometry).
+        # 예전 기본 배경(course.png 를 손으로 맞춘 배치)이 설정에 남아 있으면 벡터 코스로 바꿉니다.
+        if self.bg_image_path == self.LEGACY_DEFAULT_BACKGROUND:
+            self.logger.info(f"기본 배경 이미지 '{self.bg_image_path}' 대신 코스를 벡터로 그립니다.")
+            self.clear_background(redraw=False)
+        elif self.bg_image_path is None or not os.path.exists(self.bg_image_path):
+            self.logger.info("배경 이미지가 없어 기본 코스를 벡터로 그립니다.")
 
     def _save_config(self):
         config = {
@@ -172,12 +238,16 @@ class TractorTrailerSim:
     def _load_background_from_path(self, file_path):
         try:
             from PIL import Image, ImageTk
+            from truck_background import BackgroundCache
             self.pil_bg_image = Image.open(file_path)
-            self.bg_photo = ImageTk.PhotoImage(self.pil_bg_image)
-            self.logger.info(f"배경 이미지 로드 성공: {file_path}")
+            # 전체 크기 PhotoImage 는 만들지 않고 화면에 보이는 타일만 (draw_scene)
+            self.bg_cache = BackgroundCache(self.pil_bg_image, convert=ImageTk.PhotoImage)
+            self.bg_photo = None
+            self.logger.info(f"배경 이미지 로드 성공: {file_path} ({self.pil_bg_image.size[0]}x{self.pil_bg_image.size[1]}, "
+                             f"피라미드 {len(self.bg_cache.levels)}단계 {self.bg_cache.build_seconds*1000:.0f} ms)")
             return True
         except ImportError:
-            self.pil_bg_image = None
+            self.pil_bg_image = None; self.bg_cache = None
             try:
                 self.bg_photo = tk.PhotoImage(file=file_path) # Fallback to tkinter if Pillow not installed
                 self.logger.warning("Pillow 라이브러리가 없어 스케일링이 불가능합니다. 'pip install Pillow'로 설치해주세요.")
@@ -196,6 +266,7 @@ class TractorTrailerSim:
         self.logger.info("시뮬레이터 애플리케이션 종료."); self.logger.info("="*50 + "\n")
         self._save_config() # Save configuration before closing
         if self.animation_id: self.root.after_cancel(self.animation_id)
+        if self._planning is not None: self._planning['process'].cancel(); self._planning = None
         self.root.destroy()
 
     def setup_controls(self):
@@ -215,6 +286,7 @@ class TractorTrailerSim:
         
         tk.Label(self.control_frame, text="--- 트레일러 각도 제어 ---", font=("Arial", 10, "bold")).pack(anchor="w", pady=(15, 5))
         self.angle_control_mode.trace_add("write", lambda *args: self.logger.info(f"각도 제어 모드 변경: {self.angle_control_mode.get()}"))
+        self.angle_control_mode.trace_add("write", lambda *args: self.request_redraw('vehicle'))
         ttk.Radiobutton(self.control_frame, text="수동 조향", variable=self.angle_control_mode, value="manual").pack(anchor="w")
         ttk.Radiobutton(self.control_frame, text="목표 각도 도달 시 정지 (수동 조향)", variable=self.angle_control_mode, value="stop_at_target").pack(anchor="w")
         
@@ -228,6 +300,7 @@ class TractorTrailerSim:
         self.target_angle_display_label.pack(anchor="w")
 
         ttk.Radiobutton(self.control_frame, text="꺾임 각도 유지 주행 (Auto Steer)", variable=self.angle_control_mode, value="maintain").pack(anchor="w")
+        ttk.Radiobutton(self.control_frame, text="목표 각도까지 예측 제어 후 유지 (MPC)", variable=self.angle_control_mode, value="mpc").pack(anchor="w")
 
         tk.Label(self.control_frame, text="--- 조작 및 뷰 ---", font=("Arial", 10, "bold")).pack(anchor="w", pady=(20, 5))
         
@@ -238,6 +311,16 @@ class TractorTrailerSim:
             btn = tk.Button(dist_button_frame, text=f"{dist}m", command=lambda d=dist: self._start_drive_with_dist(d))
             btn.grid(row=i//3, column=i%3, sticky="ew", padx=1, pady=1)
         dist_button_frame.grid_columnconfigure((0,1,2), weight=1)
+        ttk.Checkbutton(self.control_frame, text="즉시 완료 (애니메이션 생략)", variable=self.instant_drive).pack(anchor="w", pady=(2, 0))
+        ttk.Checkbutton(self.control_frame, text="예상 경로 표시 (20m)", variable=self.show_prediction, command=lambda: self.request_redraw('vehicle')).pack(anchor="w")
+        ttk.Checkbutton(self.control_frame, text="쓸고 간 면적 표시 (마지막 조작)", variable=self.show_swept_area, command=lambda: self.request_redraw('paths')).pack(anchor="w")
+        ttk.Checkbutton(self.control_frame, text="코스 선 접촉 검사", variable=self.check_course_contact, command=self._on_course_contact_toggle).pack(anchor="w")
+        ttk.Checkbutton(self.control_frame, text="배경 이미지의 선으로 검사 (직접 만든 코스)", variable=self.contact_from_image, command=self._on_course_contact_toggle).pack(anchor="w", padx=(15, 0))
+        self.plan_button = tk.Button(self.control_frame, text="T자 코스 자동 후진 경로 찾기", command=self._plan_t_course)
+        self.plan_button.pack(fill=tk.X, pady=(5, 0))
+        ttk.Checkbutton(self.control_frame, text="여러 코어로 동시 탐색 (프로세스 풀)", variable=self.plan_in_pool).pack(anchor="w", padx=(15, 0))
+        tk.Button(self.control_frame, text="목표 지점 클릭 (트레일러 뒤끝)", command=self._start_target_pick).pack(fill=tk.X)
+        tk.Button(self.control_frame, text="시험 채점 결과", command=self._show_exam_report).pack(fill=tk.X)
 
         ttk.Separator(self.control_frame, orient='horizontal').pack(fill='x', pady=10)
         
@@ -245,6 +328,7 @@ class TractorTrailerSim:
         ttk.Checkbutton(self.control_frame, text="화면 자동 추적", variable=self.auto_follow, command=self._on_auto_follow_toggle).pack(anchor="w")
         tk.Button(self.control_frame, text="초기화 (Reset)", command=self.reset_simulation, fg="red").pack(fill=tk.X, pady=5)
         tk.Button(self.control_frame, text="배경 이미지 로드", command=self.load_background).pack(fill=tk.X)
+        tk.Button(self.control_frame, text="기본 코스 (벡터, 배경 이미지 해제)", command=self.clear_background).pack(fill=tk.X)
 
         # --- v12: 배경 이미지 제어 ---
         bg_control_frame = tk.LabelFrame(self.control_frame, text="배경 이미지 조정", padx=5, pady=5)
@@ -313,7 +397,7 @@ class TractorTrailerSim:
 
     def _save_preset(self, slot_number):
         slot_key = f"slot_{slot_number}"
-        self.presets[slot_key] = self._capture_state()
+        self.presets[slot_key] = self._serialize_state(self._capture_state())
         self._save_presets()
         self.preset_load_buttons[slot_number - 1].config(state=tk.NORMAL)
         messagebox.showinfo("프리셋 저장", f"현재 상태를 프리셋 {slot_number}에 저장했습니다.")
@@ -325,9 +409,8 @@ class TractorTrailerSim:
             self._restore_state(state_to_restore)
             
             # Clear and reset history
-            self.history.clear()
             description = f"프리셋 {slot_number} 로드"
-            self.history.append((description, self._capture_state()))
+            self.history.reset(description, self._capture_state())
             self._update_history_listbox()
 
             messagebox.showinfo("프리셋 로드", f"프리셋 {slot_number}을(를) 로드했습니다.")
@@ -374,7 +457,7 @@ class TractorTrailerSim:
         tk.Button(self.free_set_control_frame, text="Cancel Free Set", command=self._cancel_free_set_state, fg="red").pack(fill=tk.X, pady=2)
 
         # Initially draw ghost car
-        self.draw_scene()
+        self.request_redraw()
 
     def _deactivate_free_set_mode(self):
         self.logger.info("Free Set 모드 비활성화.")
@@ -403,6 +486,7 @@ class TractorTrailerSim:
              self.canvas.bind("<ButtonPress-1>", self._pan_start)
         if self.previous_canvas_bindings.get('<B1-Motion>') == self._pan_move:
              self.canvas.bind("<B1-Motion>", self._pan_move)
+        self.canvas.bind("<MouseWheel>", self._on_zoom_wheel)
 
 
         # Destroy Free Set control frame
@@ -411,7 +495,7 @@ class TractorTrailerSim:
             self.free_set_control_frame = None
         
         # Redraw scene to remove ghost car
-        self.draw_scene()
+        self.request_redraw()
 
     def _save_free_set_state(self):
         if self.free_set_mode:
@@ -420,8 +504,9 @@ class TractorTrailerSim:
             self.yaw_tractor = self.ghost_state['yaw_tractor']
             self.yaw_trailer = self.ghost_state['yaw_trailer']
             self._initialize_paths() # Re-initialize paths at the new location
-            self.history.clear() # Clear history on manual state change
-            self._add_to_history("Free Set 상태 저장")
+            self._reset_exam()
+            self.history.reset("Free Set 상태 저장", self._capture_state()) # Clear history on manual state change
+            self._update_history_listbox()
             messagebox.showinfo("Free Set", "Free Set 상태가 저장되었습니다.")
             self._deactivate_free_set_mode()
 
@@ -481,9 +566,9 @@ class TractorTrailerSim:
     def _get_trailer_rear_center(self, state):
         # Calculate the center of the rear axle of the trailer
         # The kingpin is at state['x'], state['y']
-        # The trailer's visual rear is at -(self.trailer_len + 1.0) meters along yaw_trailer from kingpin
+        # The trailer's visual rear is at -(self.trailer_len + kin.TRAILER_REAR_OVERHANG) meters along yaw_trailer from kingpin
         # For simplicity, let's say the rear most point of the trailer
-        total_visual_len = self.trailer_len + 1.0
+        total_visual_len = self.trailer_len + kin.TRAILER_REAR_OVERHANG
         rear_x = state['x'] - total_visual_len * math.cos(state['yaw_trailer'])
         rear_y = state['y'] - total_visual_len * math.sin(state['yaw_trailer'])
         return rear_x, rear_y
@@ -616,7 +701,7 @@ class TractorTrailerSim:
                 
             self.last_mouse_x = event.x
             self.last_mouse_y = event.y
-            self.draw_scene()
+            self.request_redraw('ghost')
     def _free_set_end_manipulation(self, event):
         self.dragging_part = None
         self.logger.info("Free Set: 드래그 종료.")
@@ -647,7 +732,7 @@ class TractorTrailerSim:
             articulation_angle = old_yaw_tractor - old_yaw_trailer
             self.ghost_state['yaw_trailer'] = self.ghost_state['yaw_tractor'] - articulation_angle
 
-            self.draw_scene()
+            self.request_redraw('ghost')
             
     def setup_history_panel(self):
         # --- History ---
@@ -655,6 +740,13 @@ class TractorTrailerSim:
         history_frame.pack(fill=tk.BOTH, expand=True, pady=0)
         
         tk.Button(history_frame, text="기록 초기화", command=self._clear_history).pack(fill=tk.X, pady=(0,5))
+        self.robustness_button = tk.Button(history_frame, text="견고성 분석 (Monte Carlo)", command=self._analyze_robustness)
+        self.robustness_button.pack(fill=tk.X, pady=(0,5))
+
+        branch_frame = tk.Frame(history_frame)
+        branch_frame.pack(fill=tk.X, pady=(0,5))
+        tk.Button(branch_frame, text="◀ 이전 분기", command=lambda: self._switch_history_branch(-1)).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(branch_frame, text="다음 분기 ▶", command=lambda: self._switch_history_branch(1)).pack(side=tk.LEFT, fill=tk.X, expand=True)
 
         listbox_frame = tk.Frame(history_frame)
         listbox_frame.pack(fill=tk.BOTH, expand=True)
@@ -668,6 +760,8 @@ class TractorTrailerSim:
         self.history_listbox.bind("<<ListboxSelect>>", self._on_history_select)
 
     def _pan_start(self, event):
+        if self._target_pick:
+            self._pick_target(event); return
         self.auto_follow.set(False)
         self.pan_start_x = event.x
         self.pan_start_y = event.y
@@ -681,14 +775,32 @@ class TractorTrailerSim:
             self.manual_offset_y += dy
             self.pan_start_x = event.x
             self.pan_start_y = event.y
-            self.draw_scene(current_steer=math.radians(self.scale_angle.get()))
+            self.request_redraw()
 
     def _on_auto_follow_toggle(self):
         if self.auto_follow.get():
             self.manual_offset_x = 0
             self.manual_offset_y = 0
             self.logger.info("자동 추적 활성화. 수동 뷰 이동 초기화.")
-        self.draw_scene(current_steer=math.radians(self.scale_angle.get()))
+        self.request_redraw()
+
+    def _on_zoom_wheel(self, event):
+        # 마우스 휠 확대/축소 (Free Set 모드에서는 휠이 트랙터 회전). 자동 추적이면 트랙터, 아니면 커서 아래 지점이 고정됩니다.
+        if self.free_set_mode: return
+        zoom_in = getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0
+        ppm = self.pixels_per_meter * (ZOOM_STEP if zoom_in else 1 / ZOOM_STEP)
+        ppm = min(MAX_PIXELS_PER_METER, max(MIN_PIXELS_PER_METER, ppm))
+        if ppm == self.pixels_per_meter: return
+        if not self.auto_follow.get():
+            wx, wy = self.to_world(event.x, event.y)
+            self.manual_offset_x = event.x - self.canvas_width/2 - wx*ppm
+            self.manual_offset_y = self.canvas_height/2 - wy*ppm - event.y
+        self.pixels_per_meter = ppm
+        if self.bg_cache:
+            # 배경은 휠을 굴리는 동안 초안 타일, 멈추면 LANCZOS 타일 (배율 슬라이더와 같음)
+            if self._bg_draft_id: self.root.after_cancel(self._bg_draft_id)
+            self._bg_draft_id = self.root.after(150, self._refine_background)
+        self.request_redraw()
 
     def _draw_gear_shifter(self):
         self.gear_canvas.delete("all"); w=self.gear_canvas.winfo_width(); h=self.gear_canvas.winfo_height()
@@ -705,13 +817,20 @@ class TractorTrailerSim:
         if self.var_gear.get()=="F": self.var_gear.set("R")
         else: self.var_gear.set("F")
         self._draw_gear_shifter(); self.logger.info(f"기어 변경: {'R' if self.var_gear.get()=='R' else 'F'}")
+        self.request_redraw('vehicle')
 
+    def update_steer_visualization(self, angle_str="0"):
+        self.request_redraw('vehicle', 'ghost', 'hud')
 
+    def request_redraw(self, *groups, steer=None):
+        # 다시 그리기 예약: 바뀐 그룹(REDRAW_GROUPS, 생략하면 전체)만 표시하고 유휴 시점에 한 프레임으로 합쳐 그림.
+        # steer 를 주면 그 조향각(주행 중), 아니면 조향 슬라이더 값으로 그립니다. 주행 중 슬라이더 이벤트는 주행 조향각을 유지.
+        if steer is not None or not self.animation_id: self._redraw_steer = steer
+        self.redraw.request(*groups)
 
-
-
-    def update_steer_visualization(self, angle_str="0"):
-        self.draw_scene(current_steer=math.radians(float(angle_str)))
+    def _redraw_dirty(self, dirty):
+        steer = self._redraw_steer if self._redraw_steer is not None else math.radians(self.scale_angle.get())
+        self.draw_scene(steer, dirty)
 
     def _update_trailer_len(self, *args):
         # The var now holds total length, self.trailer_len holds the pink part's length
@@ -719,28 +838,224 @@ class TractorTrailerSim:
         self.trailer_len_label.config(text=f"{self.trailer_len_var.get():.1f}m")
         self.logger.info(f"트레일러 총 길이 변경: {self.trailer_len_var.get():.1f}m (핑크색 {self.trailer_len:.1f}m + 하늘색 {self.trailer_swing_len:.1f}m)")
         self._initialize_paths() # Re-initialize paths to reflect new trailer length based on current vehicle state
-        self.draw_scene(current_steer=math.radians(self.scale_angle.get())) # Redraw scene with new length
+        self.request_redraw('paths', 'vehicle', 'ghost', 'hud') # Redraw scene with new length
+        self._load_primitives()
+
+    def _load_primitives(self):
+        # 현재 트레일러 길이의 운동 프리미티브 테이블을 백그라운드에서 읽거나 만들어 미리보기에 사용
+        trailer_len = self.trailer_len
+        def work():
+            try:
+                primitives = MotionPrimitives.load_or_build(trailer_len)
+            except Exception as e:
+                self.logger.warning(f"운동 프리미티브 테이블 준비 실패: {e}"); return
+            if self.trailer_len == trailer_len:
+                self.predictor.primitives = primitives
+        threading.Thread(target=work, daemon=True).start()
+
+    def _build_course_geometry(self):
+        # 배경 이미지(course_image_making.py 로 만든 코스)의 위치/배율에 맞춰 코스 선분 모델을 만듭니다.
+        # 배경 이미지가 없으면 같은 치수의 벡터 코스를 기본 배치(배율 1)에 두고 그 선/글자를 월드 좌표로 준비합니다.
+        self.course_geometry = None; self.course_transform = None; self.course_contacts = []
+        self.course_drawing = None; self._course_view = None
+        self.exam.set_transform(None)
+        if self.pil_bg_image is not None:
+            transform = CourseTransform.from_background(self.pil_bg_image.size, self.bg_offset_x, self.bg_offset_y, self.bg_scale, self.BASE_PIXELS_PER_METER)
+        elif self.bg_photo:
+            transform = CourseTransform.from_background((self.bg_photo.width(), self.bg_photo.height()), self.bg_offset_x, self.bg_offset_y, self.bg_scale, self.BASE_PIXELS_PER_METER)
+        else:
+            transform = CourseTransform(*VECTOR_COURSE_ORIGIN)
+            lines, labels = course_drawing()
+            self.course_drawing = (
+                [(f'course.{name}', style, *transform.apply(x1, y1), *transform.apply(x2, y2)) for name, style, x1, y1, x2, y2 in lines],
+                [(f'course.label.{name}', style, *transform.apply(x, y), text, anchor) for name, style, x, y, text, anchor in labels])
+        self.course_geometry = CourseGeometry.build(transform)
+        self.course_transform = transform
+        self.exam.set_transform(transform)
+        if self.raster_clearance is not None:
+            self.raster_clearance.set_transform(self.bg_offset_x, self.bg_offset_y, self.bg_scale, self.BASE_PIXELS_PER_METER)
+
+    def _build_raster_clearance(self):
+        # 배경 이미지에서 선 픽셀까지의 거리를 계산 (같은 이미지는 캐시에서 읽음)
+        self.raster_clearance = None
+        if self.pil_bg_image is None:
+            self.logger.warning("배경 이미지 선 검사: Pillow 로 읽은 배경 이미지가 없습니다."); return
+        try:
+            from truck_raster import RasterClearance
+            clearance = RasterClearance.load_or_build(self.pil_bg_image, self.bg_image_path)
+        except ImportError as e:
+            self.logger.warning(f"배경 이미지 선 검사에는 NumPy 가 필요합니다: {e}"); return
+        except Exception as e:
+            self.logger.error(f"배경 이미지 선 거리 계산 실패: {e}"); return
+        source = "캐시에서 읽음" if clearance.from_cache else "계산"
+        self.logger.info(f"배경 이미지 선 거리 {source}: {clearance.width}x{clearance.height}px, {clearance.build_seconds*1000:.0f} ms")
+        clearance.set_transform(self.bg_offset_x, self.bg_offset_y, self.bg_scale, self.BASE_PIXELS_PER_METER)
+        self.raster_clearance = clearance
+
+    def _on_course_contact_toggle(self):
+        self.logger.info(f"코스 선 접촉 검사: {self.check_course_contact.get()} (배경 이미지 선: {self.contact_from_image.get()})")
+        if self.contact_from_image.get() and self.raster_clearance is None: self._build_raster_clearance()
+        self._check_course_contact(math.radians(self.scale_angle.get()))
+        self.request_redraw('hud')
+
+    def _body_polygons(self, steer_rad, state=None, trailer_len=None):
+        return kin.body_polygons(state or self.engine.get_state(), steer_rad, trailer_len or self.trailer_len,
+                                 self.tractor_wb, self.tractor_width, self.trailer_swing_len)
+
+    def _contact_detector(self):
+        # 선 접촉 검사에 쓰는 모델 (검사를 끄거나 코스가 없으면 None)
+        if not self.check_course_contact.get(): return None
+        return self.raster_clearance if self.contact_from_image.get() else self.course_geometry
+
+    def _contacts_at(self, state, steer_rad, trailer_len):
+        # 조작 기록 재계산용: 주어진 자세의 선 접촉 목록
+        detector = self._contact_detector()
+        return detector.check_vehicle(self._body_polygons(steer_rad, state, trailer_len)) if detector else []
+
+    def _replay_history(self, state, actions):
+        # 조작 기록 재계산: 시험 채점도 주행 때와 같은 스텝으로 다시 진행
+        return replay_actions(state, actions, self.max_path_points, ExamScorer(self.course_transform, self.tractor_wb), self._contacts_at,
+                              self.path_tolerance)
+
+    def _check_course_contact(self, steer_rad, polygons=None):
+        # 현재 자세의 차체가 코스 선에 닿았는지 검사 (주행은 멈추지 않음)
+        detector = self._contact_detector()
+        if detector is None:
+            self.course_contacts = []; return
+        if polygons is None: polygons = self._body_polygons(steer_rad)
+        self.course_contacts = detector.check_vehicle(polygons)
+        if self.course_contacts and not self._contact_logged:
+            self._contact_logged = True
+            parts = ", ".join(f"{part}-{line}" for part, line in self.course_contacts)
+            self.logger.warning(f"코스 선 접촉: {parts} (킹핀 위치 {self.x:.2f}, {self.y:.2f})")
+
+    def _reset_exam(self):
+        # 현재 자세에서 새 시험 시작 (초기화, Free Set 저장, 차량 구성 변경)
+        self.exam.reset(self.engine.get_state(), self.trailer_len)
+
+    def _show_exam_report(self):
+        lines = self.exam.report().summary_lines()
+        for line in lines: self.logger.info(line)
+        messagebox.showinfo("시험 채점", "\n".join(lines))
+
+    def _plan_t_course(self):
+        # 현재 자세에서 T자 코스 입구까지의 전진/후진 조작을 백그라운드에서 찾고, 찾으면 조작 기록으로 주행
+        if self._planning is not None: return
+        if self.course_transform is None:
+            messagebox.showwarning("자동 경로", "코스 배경 이미지가 없어 코스 위치를 알 수 없습니다."); return
+        if self.animation_id: self.root.after_cancel(self.animation_id); self.animation_id=None
+        # 순수 파이썬 탐색이 GIL 을 잡아 화면을 멈추지 않도록 별도 프로세스에서 실행
+        workers = min(os.cpu_count() or 1, len(PORTFOLIO)) if self.plan_in_pool.get() else 1
+        try:
+            process = PlanProcess(self.engine.get_state(), self.trailer_len, self.course_transform, workers=workers)
+        except OSError as e:
+            self.logger.error(f"자동 경로 계획 프로세스 시작 실패: {e}")
+            messagebox.showwarning("자동 경로", f"경로 계획 프로세스를 시작하지 못했습니다:\n{e}"); return
+        self._planning = {'start': self.engine.get_state(), 'process': process}
+        self.plan_button.config(state=tk.DISABLED, text="경로 찾는 중...")
+        self.logger.info(f"T자 코스 자동 경로 계획 시작 (킹핀 위치 {self.x:.2f}, {self.y:.2f}, 프로세스 {workers}개)")
+        self.root.after(100, self._poll_plan)
+
+    def _poll_plan(self):
+        planning = self._planning
+        if planning is None: return
+        if not planning['process'].done():
+            self.root.after(100, self._poll_plan); return
+        self._planning = None
+        self.plan_button.config(state=tk.NORMAL, text="T자 코스 자동 후진 경로 찾기")
+        try:
+            plan = planning['process'].result()
+        except PlanningError as e:
+            self.logger.warning(f"자동 경로 계획 실패: {e}")
+            messagebox.showwarning("자동 경로", str(e)); return
+        if self.engine.get_state() != planning['start']:
+            self.logger.warning("자동 경로 계획 중 차량이 움직여 결과를 버립니다."); return
+        self.logger.info(f"자동 경로 계획 완료: 조작 {len(plan.maneuvers)}개, 비용 {plan.cost:.1f}, 확장 {plan.expansions}회, {plan.seconds:.1f}s")
+        if plan.contacts:
+            self.logger.warning(f"자동 경로 검증에서 선 접촉 {len(plan.contacts)}건 (첫 접촉: 스텝 {plan.contacts[0][0]} {plan.contacts[0][1]}-{plan.contacts[0][2]})")
+        self._apply_plan(plan)
+
+    def _apply_plan(self, plan):
+        self._drive_maneuvers(plan.maneuvers, "자동")
+
+    def _drive_maneuvers(self, maneuvers, label):
+        # 조작마다 기어/조향을 맞추고 즉시 완료로 주행 -> 조작 기록에 하나씩 남음 (다시 재현 가능)
+        # 끝나면 기어/조향은 마지막 조작 그대로 두고 제어 모드와 즉시 완료 설정만 되돌림
+        saved = (self.angle_control_mode.get(), self.instant_drive.get())
+        self.instant_drive.set(True); self.angle_control_mode.set("manual")
+        total = len(maneuvers)
+        for i, m in enumerate(maneuvers, 1):
+            self.var_gear.set("F" if m["direction"] == 1 else "R")
+            self.scale_angle.set(m["steer_deg"])
+            direction_text = "전진" if m["direction"] == 1 else "후진"
+            self.start_drive(m["distance"], f"{label} {i}/{total}: {direction_text} {m['distance']:.2f}m (조향 {m['steer_deg']:+.0f}°)")
+        self.angle_control_mode.set(saved[0]); self.instant_drive.set(saved[1])
+        self._draw_gear_shifter()
+        self.request_redraw('paths', 'vehicle', 'ghost', 'hud')
+
+    def _start_target_pick(self):
+        if self.free_set_mode or self.animation_id: return
+        self._target_pick = True
+        self.canvas.config(cursor="crosshair")
+        self.logger.info("목표 지점 선택: 트레일러 뒤끝을 보낼 곳을 클릭하세요.")
+
+    def _pick_target(self, event):
+        # 클릭한 곳에 트레일러 뒤끝이 가장 가까이 가는 조작(한 번, 또는 기어를 바꿔 두 번)을 풀어 고스트로 표시
+        self._target_pick = False
+        self.canvas.config(cursor="fleur")
+        target = self.to_world(event.x, event.y)
+        solution = solve_target(self.engine.get_state(), target, self.trailer_len, self.tractor_wb)
+        steps_text = " -> ".join(f"{'전진' if m['direction'] == 1 else '후진'} {m['distance']:.2f}m (조향 {m['steer_deg']:+d}°)"
+                                 for m in solution.maneuvers) or "현재 위치가 가장 가까움"
+        self.logger.info(f"목표 지점 ({target[0]:.2f}, {target[1]:.2f}) 풀이: {steps_text}, 오차 {solution.error:.2f}m, "
+                         f"{solution.seconds*1000:.0f} ms ({solution.rollouts}개 궤적)")
+        self._clear_target_solution()
+        self.target_solution = solution
+        self.target_control_frame = tk.Frame(self.right_frame, padx=5, pady=5, bg="lightyellow")
+        self.target_control_frame.pack(fill=tk.X, pady=(10, 0))
+        tk.Label(self.target_control_frame, text="--- 목표 지점 ---", font=("Arial", 10, "bold"), bg="lightyellow").pack(pady=(0, 5))
+        tk.Label(self.target_control_frame, text=f"{steps_text.replace(' -> ', chr(10))}\n오차 {solution.error:.2f}m",
+                 bg="lightyellow", justify=tk.LEFT).pack(anchor="w")
+        tk.Button(self.target_control_frame, text="조작 실행", command=self._apply_target_solution, fg="green",
+                  state=tk.NORMAL if solution.maneuvers else tk.DISABLED).pack(fill=tk.X, pady=2)
+        tk.Button(self.target_control_frame, text="취소", command=self._clear_target_solution, fg="red").pack(fill=tk.X, pady=2)
+        self.request_redraw('ghost')
+
+    def _apply_target_solution(self):
+        maneuvers = self.target_solution.maneuvers
+        self._clear_target_solution()
+        self._drive_maneuvers(maneuvers, "목표 지점")
+
+    def _clear_target_solution(self):
+        if self.target_control_frame:
+            self.target_control_frame.destroy(); self.target_control_frame = None
+        if self.target_solution is not None:
+            self.target_solution = None
+            self.request_redraw('ghost')
 
     def _update_target_angle_display(self, val):
         self.target_angle_display_label.config(text=f"{float(val):.0f}°")
 
     def _on_target_angle_change(self, val):
-        # Automatically select the 'stop_at_target' mode when the user adjusts the slider.
-        self.angle_control_mode.set("stop_at_target")
+        # Automatically select the 'stop_at_target' mode when the user adjusts the slider (MPC 모드는 그대로).
+        if self.angle_control_mode.get() != "mpc":
+            self.angle_control_mode.set("stop_at_target")
         # Update the display label.
         self._update_target_angle_display(val)
+        self.request_redraw('vehicle')
 
     def _initialize_paths(self):
-        self.wheel_paths.clear()
-        current_state = self._capture_state()
-        for name, pos in self._get_world_wheel_positions(state=current_state).items(): self.wheel_paths[name]=deque([pos], maxlen=self.max_path_points)
+        self.wheel_paths = WheelPaths.start(self._get_world_wheel_positions(), maxlen=self.max_path_points, tolerance=self.path_tolerance)
         self.logger.info("바퀴 궤적 초기화 완료.")
 
     def reset_simulation(self, keep_paths=False):
         self.manual_offset_x = 0; self.manual_offset_y = 0
+        self._clear_target_solution()
         if self.animation_id: self.root.after_cancel(self.animation_id); self.animation_id=None
         self.x=0.0; self.y=0.0; self.yaw_tractor=math.pi; self.yaw_trailer=math.pi
-        self.initial_angle_for_stop = None; self.previous_angle_error = None
+        self.drive_run = None
+        self.swept_area.clear()
+        self._reset_exam()
 
         # '초기화' 버튼을 눌렀을 때만(keep_paths=False) 전체 컨트롤을 초기화
         if not keep_paths:
@@ -757,68 +1072,23 @@ class TractorTrailerSim:
             
             self.auto_follow.set(True)
 
-            # History clear and initialize
-            self.history.clear()
-            self.history.append(("초기 상태", self._capture_state()))
-            self._update_history_listbox()
-
+        # 초기 상태 기록이 새 궤적을 가리키도록 기록 초기화보다 먼저
         log_msg="시뮬레이션 전체 초기화." if not keep_paths else "차량 구성 변경으로 초기화."
         self._initialize_paths(); self.logger.info(log_msg)
-        self.draw_scene(current_steer=math.radians(self.scale_angle.get()))
+
+        if not keep_paths:
+            # History clear and initialize
+            self.history.reset("초기 상태", self._capture_state())
+            self._update_history_listbox()
+        self._check_course_contact(math.radians(self.scale_angle.get()))
+        self.request_redraw()
 
     def _get_axle_definitions(self):
-        tractor_axles={'front':self.tractor_wb, 'rear1':0.65, 'rear2':-0.65}
-        trailer_axles={'tr_rear1':1.1/2, 'tr_rear2':-1.1/2}
-        return tractor_axles, trailer_axles
+        return kin.axle_definitions(self.tractor_wb)
         
     def _get_world_wheel_positions(self, steer_rad=0.0, state=None):
-        if state is None:
-            state = {'x': self.x, 'y': self.y, 'yaw_tractor': self.yaw_tractor, 'yaw_trailer': self.yaw_trailer}
-
-        positions={}; tractor_axles, trailer_axles=self._get_axle_definitions(); half_w=self.tractor_width/2.0
-        # 트랙터 축 계산
-        for name, dist in tractor_axles.items():
-            is_front = (name == 'front')
-            # Calculate the center of the axle, which is fixed relative to the tractor body
-            axle_x = state['x'] + dist * math.cos(state['yaw_tractor'])
-            axle_y = state['y'] + dist * math.sin(state['yaw_tractor'])
-
-            # The wheel hub's position is fixed relative to the axle.
-            # The steering angle only affects the visual rotation of the wheel, not its position.
-            hub_offset_angle = state['yaw_tractor'] + math.pi/2
-            
-            wl_x = axle_x + half_w * math.cos(hub_offset_angle)
-            wl_y = axle_y + half_w * math.sin(hub_offset_angle)
-            wr_x = axle_x - half_w * math.cos(hub_offset_angle)
-            wr_y = axle_y - half_w * math.sin(hub_offset_angle)
-
-            positions[f't_{name}_l']=(wl_x, wl_y)
-            positions[f't_{name}_r']=(wr_x, wr_y)
-
-        # 트레일러 기준점 (킹핀)
-        kingpin_x = state['x'] 
-        kingpin_y = state['y']
-
-        # 트레일러 축 계산
-        for name, dist in trailer_axles.items():
-            # 트레일러의 실제 기준점은 킹핀에서 트레일러 길이만큼 뒤에 있습니다.
-            # 하지만 각 축의 위치는 트레일러의 기하학적 중심을 기준으로 계산하는 것이 더 직관적일 수 있습니다.
-            # 여기서는 트레일러의 회전 중심(뒷바퀴 축의 중심)을 기준으로 계산합니다.
-            # The visual trailer body was shifted forward by 0.5m, so the wheels must move forward by the same amount.
-            effective_trailer_len_for_wheels = self.trailer_len - 0.5
-            trailer_pivot_x = kingpin_x - effective_trailer_len_for_wheels * math.cos(state['yaw_trailer'])
-            trailer_pivot_y = kingpin_y - effective_trailer_len_for_wheels * math.sin(state['yaw_trailer'])
-
-            axle_x = trailer_pivot_x + dist * math.cos(state['yaw_trailer'])
-            axle_y = trailer_pivot_y + dist * math.sin(state['yaw_trailer'])
-            
-            # 바퀴 위치 계산
-            wl_x = axle_x + half_w * math.sin(state['yaw_trailer'])
-            wl_y = axle_y - half_w * math.cos(state['yaw_trailer'])
-            wr_x = axle_x - half_w * math.sin(state['yaw_trailer'])
-            wr_y = axle_y + half_w * math.cos(state['yaw_trailer'])
-            positions[f'{name}_l']=(wl_x, wl_y); positions[f'{name}_r']=(wr_x, wr_y)
-        return positions
+        # The steering angle only affects the visual rotation of the wheel, not its position.
+        return self.engine.wheel_positions(state)
 
     def to_screen(self, x, y, view_offset_x, view_offset_y):
         abs_cx, abs_cy = self.canvas_width/2, self.canvas_height/2
@@ -827,42 +1097,21 @@ class TractorTrailerSim:
         return screen_x, screen_y
 
     def calculate_steer_for_angle_maintenance(self, angle_diff):
-        if abs(angle_diff) > math.radians(90): return 0 
-        return math.atan((self.tractor_wb / self.trailer_len) * math.sin(angle_diff))
+        return kin.steer_for_angle_maintenance(angle_diff, self.tractor_wb, self.trailer_len)
 
     def calculate_steer_for_target_angle(self, current_angle_diff_rad, target_angle_rad, direction):
-        error=target_angle_rad-abs(current_angle_diff_rad); sign=1 if current_angle_diff_rad>0 else -1 
-        steer_adjustment=0.8*error; base_steer=self.calculate_steer_for_angle_maintenance(current_angle_diff_rad)
-        if direction==-1: final_steer=base_steer-(sign*steer_adjustment)
-        else: final_steer=base_steer+(sign*steer_adjustment)
-        return max(min(final_steer, math.radians(40)), -math.radians(40))
+        return kin.steer_for_target_angle(current_angle_diff_rad, target_angle_rad, direction, self.tractor_wb, self.trailer_len)
 
     def _get_normalized_articulation_degrees(self, yaw_tractor, yaw_trailer):
-        raw_diff_rad = yaw_tractor - yaw_trailer
-        # Normalize to -pi to pi range
-        normalized_diff_rad = math.atan2(math.sin(raw_diff_rad), math.cos(raw_diff_rad))
-        
-        normalized_diff_deg = math.degrees(normalized_diff_rad)
-        
-        # If the angle is > 90 or < -90, convert it to its equivalent within [-90, 90]
-        # For example, 100 degrees (raw) should be seen as -80 degrees of articulation
-        # and 270 degrees (raw) should be seen as -90 degrees.
-        # This is for intuitive display and jackknife check.
-        if normalized_diff_deg > 90:
-            normalized_diff_deg = -(180 - normalized_diff_deg)
-        elif normalized_diff_deg < -90:
-            normalized_diff_deg = (180 + normalized_diff_deg)
-
-        return normalized_diff_deg
+        return kin.normalized_articulation_degrees(yaw_tractor, yaw_trailer)
 
 
     def _capture_state(self):
-        # wheel_paths의 deque를 list로 변환하여 저장
-        paths_copy = {name: list(path) for name, path in self.wheel_paths.items()}
+        # wheel_paths는 복사하지 않고 공유 저장소의 현재 위치(스냅샷)만 기록 - O(1)
         state = {
             "x": self.x, "y": self.y,
             "yaw_tractor": self.yaw_tractor, "yaw_trailer": self.yaw_trailer,
-            "wheel_paths": paths_copy,
+            "wheel_paths": self.wheel_paths.snapshot(),
             "angle_control_mode": self.angle_control_mode.get(),
             "var_gear": self.var_gear.get(),
             "scale_angle": self.scale_angle.get(),
@@ -871,17 +1120,27 @@ class TractorTrailerSim:
             "auto_follow": self.auto_follow.get(),
             "manual_offset_x": self.manual_offset_x,
             "manual_offset_y": self.manual_offset_y,
+            "exam": self.exam.snapshot(),
         }
         return state
 
+    def _serialize_state(self, state):
+        # 프리셋 파일(JSON)용: 궤적 스냅샷을 좌표 목록으로 변환
+        state = dict(state)
+        state["wheel_paths"] = WheelPaths.from_snapshot(state["wheel_paths"], maxlen=self.max_path_points).to_points()
+        return state
+
     def _restore_state(self, state):
+        self._clear_target_solution()
+        self.swept_area.clear()
         self.x = state["x"]; self.y = state["y"]
         self.yaw_tractor = state["yaw_tractor"]; self.yaw_trailer = state["yaw_trailer"]
         
-        # list를 다시 deque로 변환하여 복원
-        self.wheel_paths.clear()
-        for name, path_list in state["wheel_paths"].items():
-            self.wheel_paths[name] = deque(path_list, maxlen=self.max_path_points)
+        # 스냅샷이면 공유 저장소를 그대로 참조, 프리셋(JSON)의 list면 새로 생성
+        if isinstance(state["wheel_paths"], PathSnapshot):
+            self.wheel_paths = WheelPaths.from_snapshot(state["wheel_paths"], maxlen=self.max_path_points, tolerance=self.path_tolerance)
+        else:
+            self.wheel_paths = WheelPaths.from_points(state["wheel_paths"], maxlen=self.max_path_points, tolerance=self.path_tolerance)
 
         self.angle_control_mode.set(state["angle_control_mode"])
         self.var_gear.set(state["var_gear"])
@@ -904,41 +1163,57 @@ class TractorTrailerSim:
         self.manual_offset_x = state["manual_offset_x"]
         self.manual_offset_y = state["manual_offset_y"]
 
+        # 채점 기록이 없는 예전 프리셋은 복원한 자세에서 새 시험 시작
+        if state.get("exam"): self.exam.restore(state["exam"])
+        else: self._reset_exam()
+
         self._draw_gear_shifter()
-        self.draw_scene(current_steer=math.radians(self.scale_angle.get()))
+        self._check_course_contact(math.radians(self.scale_angle.get()))
+        self.request_redraw()
         self.logger.info("상태 복원 완료.")
 
-    def _add_to_history(self, description):
+    def _add_to_history(self, description, action=None):
         # This is called *after* an action is complete.
-        current_selection = self.history_listbox.curselection()
-        history_len_before_add = len(self.history)
-        
-        # If a specific point in history is selected, and it's not the last one, truncate.
-        if current_selection and current_selection[0] < (history_len_before_add - 1):
-            branch_index = current_selection[0]
-            self.logger.info(f"새로운 조작 기록 분기 생성 (기존 {branch_index}번 기록에서 이어짐).")
-            # Deque doesn't support slicing. Convert, truncate, rebuild.
-            history_list = list(self.history)
-            self.history.clear()
-            # Add back only the states up to and including the branch point.
-            for i in range(branch_index + 1):
-                self.history.append(history_list[i])
+        # 과거 기록을 선택한 상태에서 주행했다면 기존 기록을 지우지 않고 그 지점에서 새 분기를 만듭니다.
+        parent = self.history.current
+        if parent.active_child is not None:
+            self.logger.info(f"새로운 조작 기록 분기 생성 (기존 {parent.depth}번 기록에서 이어짐).")
 
         state = self._capture_state()
-        self.history.append((description, state))
-        self._update_history_listbox()
-
-    def _update_history_listbox(self):
+        if action is not None:
+            # 재현(replay) 후 복원할 UI 값들 (채점 기록 exam 은 재현 때 다시 채점)
+            action["ui"] = {k: v for k, v in state.items() if k not in ("x", "y", "yaw_tractor", "yaw_trailer", "wheel_paths", "exam")}
+        node = self.history.add(description, state, action)
+        self._replace_history_rows(node.depth, [node])
+
+    def _history_label(self, node):
+        label = f"{node.depth}: {node.description}"
+        if node.parent is not None and len(node.parent.children) > 1:
+            label += f" [분기 {node.branch_index + 1}/{len(node.parent.children)}]"
+        return label
+
+    def _replace_history_rows(self, index, nodes, select_index=None):
+        # 목록의 index 행부터 끝까지를 nodes 로 교체 (나머지 행은 건드리지 않음)
         self._ignore_history_selection = True
-        self.history_listbox.delete(0, tk.END)
-        for i, (desc, _) in enumerate(self.history):
-            self.history_listbox.insert(tk.END, f"{i}: {desc}")
-        # Select the last item
-        self.history_listbox.see(tk.END)
+        if index < len(self.history_rows):
+            self.history_listbox.delete(index, tk.END)
+        del self.history_rows[index:]
+        self.history_rows.extend(nodes)
+        self.history_listbox.insert(tk.END, *[self._history_label(node) for node in nodes])
+        select_index = len(self.history_rows) - 1 if select_index is None else select_index
+        self.history_listbox.see(select_index)
         self.history_listbox.selection_clear(0, tk.END)
-        self.history_listbox.selection_set(tk.END)
+        self.history_listbox.selection_set(select_index)
         self._ignore_history_selection = False
 
+    def _update_history_listbox(self):
+        # 전체 목록 다시 만들기 (기록 초기화/프리셋 로드 시)
+        self._replace_history_rows(0, self.history.line(), select_index=self.history.current.depth)
+
+    def _restore_history_node(self, node):
+        self.history.select(node)
+        self._restore_state(self.history.state_of(node))
+        self.logger.info(f"{node.depth}번 조작 기록으로 복원합니다.")
 
     def _on_history_select(self, event):
         if self._ignore_history_selection:
@@ -949,12 +1224,63 @@ class TractorTrailerSim:
         selected_index = event.widget.curselection()[0]
         
         try:
-            _, state_to_restore = self.history[selected_index]
-            self._restore_state(state_to_restore)
-            self.logger.info(f"{selected_index}번 조작 기록으로 복원합니다.")
+            self._restore_history_node(self.history_rows[selected_index])
         except IndexError:
             self.logger.error("선택한 기록을 복원하는 데 실패했습니다. 인덱스가 범위를 벗어났습니다.")
 
+    def _analyze_robustness(self):
+        # 처음(또는 마지막으로 재현할 수 없는 기록, 트레일러 길이를 바꾼 곳)부터 현재 기록까지의 조작을 잡음을 넣어 일괄 주행
+        if self._robustness is not None or self.history.current is None: return
+        nodes = []; node = self.history.current
+        length = node.action.get("trailer_len_var") if node.action is not None else None
+        while node.parent is not None and node.action is not None and node.action.get("trailer_len_var") == length:
+            nodes.append(node); node = node.parent
+        if not nodes:
+            messagebox.showinfo("견고성 분석", "분석할 수 있는 조작 기록이 없습니다."); return
+        start = self.history.state_of(node)
+        actions = [n.action for n in reversed(nodes)]
+        trailer_len = (start["trailer_len_var"] if length is None else length) - kin.TRAILER_SWING_LEN
+        course = self.course_transform
+        try:
+            save_maneuvers(MANEUVERS_FILE, start, actions, trailer_len, course)
+        except OSError as e:
+            self.logger.warning(f"조작 순서 저장 실패: {e}")
+        robustness = {'report': None, 'error': None}
+        def work():
+            try:
+                robustness['report'] = analyze_robustness(start, actions, trailer_len, course, tractor_wb=self.tractor_wb)
+            except Exception as e:
+                robustness['error'] = f"견고성 분석 중 오류: {e}"
+        self._robustness = robustness
+        self.robustness_button.config(state=tk.DISABLED, text="분석 중...")
+        self.logger.info(f"견고성 분석 시작: '{node.description}' 이후 조작 {len(actions)}개 (조작 순서: {MANEUVERS_FILE})")
+        robustness['thread'] = threading.Thread(target=work, daemon=True); robustness['thread'].start()
+        self.root.after(100, self._poll_robustness)
+
+    def _poll_robustness(self):
+        robustness = self._robustness
+        if robustness['thread'].is_alive():
+            self.root.after(100, self._poll_robustness); return
+        self._robustness = None
+        self.robustness_button.config(state=tk.NORMAL, text="견고성 분석 (Monte Carlo)")
+        if robustness['error']:
+            self.logger.error(robustness['error']); messagebox.showwarning("견고성 분석", robustness['error']); return
+        lines = robustness['report'].summary_lines()
+        for line in lines: self.logger.info(line)
+        messagebox.showinfo("견고성 분석", "\n".join(line.strip() for line in lines))
+
+    def _switch_history_branch(self, step):
+        # 선택한 기록을 같은 부모의 다른 분기로 전환
+        selection = self.history_listbox.curselection()
+        index = selection[0] if selection else len(self.history_rows) - 1
+        node = self.history_rows[index]
+        sibling = self.history.sibling(node, step)
+        if sibling is node:
+            return
+        node.parent.active_child = sibling
+        self._replace_history_rows(index, self.history.line_from(sibling), select_index=index)
+        self._restore_history_node(sibling)
+
     def _clear_history(self):
         self.reset_simulation() # Resetting simulation clears history
 
@@ -970,6 +1296,8 @@ class TractorTrailerSim:
             mode_text = f"(목표/{target:.0f}°)"
         elif mode == 'maintain':
             mode_text = "(자동조향)"
+        elif mode == 'mpc':
+            mode_text = f"(MPC/{self.target_articulation_angle.get():.0f}°)"
         else:
             mode_text = ""
             
@@ -978,104 +1306,126 @@ class TractorTrailerSim:
 
     def start_drive(self, dist_goal, description):
         if self.animation_id: self.root.after_cancel(self.animation_id); self.animation_id=None
+        self._clear_target_solution()
         try:
             direction=1 if self.var_gear.get()=="F" else -1
             target_angle=self.target_articulation_angle.get() if self.target_articulation_angle.get() is not None else None
         except ValueError: 
             self.logger.error("주행 시작 실패: 잘못된 입력 값."); return
         
-        self.initial_angle_for_stop = None
-        self.previous_angle_error = None
-
-        if self.angle_control_mode.get() == 'stop_at_target' and target_angle is not None:
-            current_angle_deg = self._get_normalized_articulation_degrees(self.yaw_tractor, self.yaw_trailer)
-            self.initial_angle_for_stop = abs(current_angle_deg)
-            self.previous_angle_error = abs(current_angle_deg) - target_angle
-            self.logger.info(f"목표 각도 정지 모드 시작: 현재 {current_angle_deg:.1f}°, 목표 {target_angle:.1f}°")
-
-        self.logger.info(f"주행 시작: 거리={dist_goal}m, 방향={'전진' if direction==1 else '후진'}, 제어={self.angle_control_mode.get()}, 목표각도={target_angle}°")
-        self.animate_step(int(dist_goal/0.078), 0.078, direction, target_angle, description)
-
-    def animate_step(self, steps_left, step_dist, direction, target_angle, description):
-        current_angle_normalized_deg = self._get_normalized_articulation_degrees(self.yaw_tractor, self.yaw_trailer)
+        mode = self.angle_control_mode.get()
+        self.drive_run = self.engine.start_drive(dist_goal, direction, mode, math.radians(self.scale_angle.get()), target_angle)
+        # 조작 기록에서 다시 계산(replay)할 수 있도록 주행 입력을 기록. 트레일러 길이 변경은 기록 노드를 만들지 않으므로
+        # 주행마다 그때의 길이와, 궤적이 이 자세에서 새로 시작됐는지(길이 변경 등으로 초기화, 점 1개)를 함께 남깁니다.
+        self._drive_action = {"distance": dist_goal, "direction": direction, "mode": mode,
+                              "steer_deg": self.scale_angle.get(), "target_angle": target_angle,
+                              "trailer_len_var": self.trailer_len_var.get(), "new_paths": self.wheel_paths.total == 1}
+        self._drive_paths = self.wheel_paths
+        self.wheel_paths.anchor() # 주행 경계에서 단순화를 끊어 재계산과 같은 점을 남김
+        if self.drive_run.initial_angle_for_stop is not None:
+            self.logger.info(f"목표 각도 정지 모드 시작: 현재 {self.drive_run.articulation_deg:.1f}°, 목표 {target_angle:.1f}°")
+
+        self.logger.info(f"주행 시작: 거리={dist_goal}m, 방향={'전진' if direction==1 else '후진'}, 제어={mode}, 목표각도={target_angle}°")
+        self._contact_logged = False
+        self.exam.begin_maneuver(direction)
+        self.swept_area.clear()
+        self.swept_area.add_polygons(self._body_polygons(math.radians(self.scale_angle.get())))
+        self._drive_redraw_stats = dict(self.redraw.stats)
+        self.drive_clock.start(time.perf_counter())
+        self.animate_step(description)
+
+    def animate_step(self, description):
+        # 한 프레임: 시계가 정한 만큼 고정 크기 물리 스텝을 진행한 뒤 한 번만 그립니다.
+        # '즉시 완료' 모드에서는 주행이 끝날 때까지 중간 프레임 없이 진행합니다.
+        frame_start = time.perf_counter()
+        run = self.drive_run
+        instant = self.instant_drive.get()
+        steps = run.steps_left + 1 if instant else self.drive_clock.steps_due(frame_start)
+
+        status = None
+        for _ in range(steps):
+            if run.mode not in ('maintain', 'mpc') and self._drive_action and self.scale_angle.get() != self._drive_action["steer_deg"]:
+                self._drive_action = None # 주행 중 조향을 바꾸면 입력만으로 재현할 수 없음
+            status = run.tick(math.radians(self.scale_angle.get())) # 기본값: 수동 조향
+            if status is not None:
+                break
+            self.wheel_paths.append_positions(self._get_world_wheel_positions(run.steer_rad))
+            polygons = self._body_polygons(run.steer_rad)
+            self._check_course_contact(run.steer_rad, polygons)
+            self.swept_area.add_polygons(polygons)
+            self.exam.step(self.engine.get_state(), run.direction, self.trailer_len, self.course_contacts)
+            if (run.steps_left+1)%20==0: self.logger.info(f"주행 중... 현재 꺾임 각도: {run.articulation_deg:.1f}° | 헤드 조향각: {math.degrees(run.steer_rad):.1f}°")
+
+        steer_rad = run.steer_rad
+        if status is not None:
+            self._log_swept_area()
+            if status == 'jackknife': self.exam.jackknife()
+            if self.exam.lines: self.logger.info(f"시험 채점: {self.exam.status_text()}")
+        if run.mode in ('maintain', 'mpc'):
+            self.scale_angle.set(math.degrees(steer_rad))
+        current_angle_normalized_deg = run.articulation_deg
+        if status is not None and self.wheel_paths is not self._drive_paths:
+            self._drive_action = None # 주행 중 궤적 초기화(트레일러 길이 변경 등)
 
-        # --- v10: 잭나이프(Jackknife) 방지 ---
-        if abs(current_angle_normalized_deg) > 90.0 and direction == 1: # 전진 시에만 적용
+        if status == 'jackknife':
             self.logger.warning(f"잭나이프 현상 발생! 현재 꺾임 각도: {current_angle_normalized_deg:.1f}°. 주행을 중지합니다.")
+            self.request_redraw('paths', 'vehicle', 'hud', steer=steer_rad); self.redraw.flush() # 대화상자 전에 마지막 자세를 그림
             messagebox.showwarning("잭나이프 위험!", f"트랙터와 트레일러의 각도가 90도를 초과했습니다({current_angle_normalized_deg:.1f}°).\n\n잭나이프 현상으로 인해 주행을 중지합니다.")
-            if self.animation_id: self.root.after_cancel(self.animation_id); self.animation_id=None
-            self._add_to_history(description + " (잭나이프 중단)")
-            self.draw_scene(current_steer=math.radians(self.scale_angle.get())); return
-        
-        control_mode = self.angle_control_mode.get()
-        target_mode_active = target_angle is not None
-
-        if control_mode == 'stop_at_target' and target_mode_active and self.initial_angle_for_stop is not None:
-            current_error = abs(current_angle_normalized_deg) - target_angle
-            if abs(current_error) < 1.0 or (self.previous_angle_error is not None and (current_error * self.previous_angle_error) <= 0):
-                self.logger.info(f"목표 각도 {target_angle}° 도달. 주행 중지."); 
-                messagebox.showinfo("목표 각도 도달", f"현재 꺾임 각도 {current_angle_normalized_deg:.1f}°가 목표 {target_angle}°에 도달하여 주행을 중지합니다.")
-                if self.animation_id: self.root.after_cancel(self.animation_id); self.animation_id=None
-                self._add_to_history(description)
-                self.draw_scene(current_steer=math.radians(self.scale_angle.get())); return
-            self.previous_angle_error = current_error
-
-        if steps_left<=0: 
+            self.animation_id=None
+            self._add_to_history(description + " (잭나이프 중단)", self._drive_action)
+            self._log_redraw_stats(); self.request_redraw('vehicle', 'hud'); return
+
+        if status == 'target_reached':
+            self.logger.info(f"목표 각도 {run.target_angle}° 도달. 주행 중지."); 
+            self.request_redraw('paths', 'vehicle', 'hud', steer=steer_rad); self.redraw.flush()
+            messagebox.showinfo("목표 각도 도달", f"현재 꺾임 각도 {current_angle_normalized_deg:.1f}°가 목표 {run.target_angle}°에 도달하여 주행을 중지합니다.")
+            self.animation_id=None
+            self._add_to_history(description, self._drive_action)
+            self._log_redraw_stats(); self.request_redraw('vehicle', 'hud'); return
+
+        if status == 'completed':
             self.logger.info("주행 완료.")
             self.animation_id=None
-            self._add_to_history(description)
-            return
+            self.request_redraw('paths', 'vehicle', 'hud', steer=steer_rad)
+            self._add_to_history(description, self._drive_action)
+            self._log_redraw_stats(); return
+
+        if steps:
+            self.request_redraw('paths', 'vehicle', 'hud', steer=steer_rad)
+        # 그리는 데 걸린 시간을 빼고 다음 프레임 예약 (늦어지면 다음 프레임에서 여러 스텝 진행)
+        elapsed_ms = (time.perf_counter() - frame_start) * 1000
+        self.animation_id=self.root.after(max(1, int(self.frame_interval_ms - elapsed_ms)), self.animate_step, description)
 
-        steer_rad=math.radians(self.scale_angle.get()) # 기본값: 수동 조향
-        if control_mode == 'maintain':
-            steer_rad = self.calculate_steer_for_angle_maintenance(self.yaw_tractor-self.yaw_trailer) # Use raw diff for maintenance calculation
-            self.scale_angle.set(math.degrees(steer_rad))
-        
-        v=step_dist*direction; self.x+=v*math.cos(self.yaw_tractor); self.y+=v*math.sin(self.yaw_tractor); self.yaw_tractor+=(v/self.tractor_wb)*math.tan(steer_rad)
-        angle_diff=self.yaw_tractor-self.yaw_trailer; delta_yaw_trailer=(step_dist/self.trailer_len)*math.sin(angle_diff)
-        if direction==1: self.yaw_trailer+=delta_yaw_trailer
-        else: self.yaw_trailer-=delta_yaw_trailer
-        for name, pos in self._get_world_wheel_positions(steer_rad, state={'x': self.x, 'y': self.y, 'yaw_tractor': self.yaw_tractor, 'yaw_trailer': self.yaw_trailer}).items():
-            if name in self.wheel_paths: self.wheel_paths[name].append(pos)
-        self.draw_scene(steer_rad)
-        
-        if steps_left%20==0: self.logger.info(f"주행 중... 현재 꺾임 각도: {current_angle_normalized_deg:.1f}° | 헤드 조향각: {math.degrees(steer_rad):.1f}°")
-        self.animation_id=self.root.after(10, self.animate_step, steps_left-1, step_dist, direction, target_angle, description)
 
+    def _log_redraw_stats(self):
+        # 이번 주행 동안 다시 그리기 요청 대비 실제로 그린 횟수
+        start = self._drive_redraw_stats
+        requested = self.redraw.stats['requested'] - start['requested']
+        performed = self.redraw.stats['performed'] - start['performed']
+        self.logger.info(f"화면 갱신: 요청 {requested}회 -> 그리기 {performed}회")
 
     def _update_background_transform(self, _=None):
-        if not self.bg_photo:
+        if not self.bg_cache and not self.bg_photo:
             return
 
         self.bg_offset_x = self.scale_bg_x.get()
         self.bg_offset_y = self.scale_bg_y.get()
-        new_scale_percent = self.scale_bg_scale.get()
-        
-        if self.pil_bg_image:
-            try:
-                from PIL import Image, ImageTk
-                
-                # 스케일이 변경되었을 때만 이미지 재생성
-                if int(self.bg_scale * 100) != new_scale_percent:
-                    self.bg_scale = new_scale_percent / 100.0
-                    
-                    original_width, original_height = self.pil_bg_image.size
-                    new_width = int(original_width * self.bg_scale)
-                    new_height = int(original_height * self.bg_scale)
-
-                    if new_width > 0 and new_height > 0:
-                        resized_pil_image = self.pil_bg_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                        self.bg_photo = ImageTk.PhotoImage(resized_pil_image)
-                    else: # 이미지가 너무 작아지면 기존 이미지 유지
-                        self.bg_scale = int(self.bg_scale * 100) / 100.0
-                        self.scale_bg_scale.set(int(self.bg_scale*100))
-
-            except ImportError:
-                 pass # load_background에서 이미 처리됨
-
-        self.draw_scene(current_steer=math.radians(self.scale_angle.get()))
+        # 배율은 값만 바꾸고, 화면에 보이는 타일을 draw_scene 에서 캐시(피라미드 + LRU)로부터 만듭니다.
+        # Pillow 가 없으면 (tk.PhotoImage) 배율은 바꿀 수 없습니다.
+        if self.bg_cache and self.scale_bg_scale.get() != round(self.bg_scale * 100):
+            self.bg_scale = self.scale_bg_scale.get() / 100.0
+            if self._bg_draft_id: self.root.after_cancel(self._bg_draft_id)
+            self._bg_draft_id = self.root.after(150, self._refine_background)
+
+        self._build_course_geometry()
+        self._check_course_contact(math.radians(self.scale_angle.get()))
+        self.request_redraw('background', 'hud')
         self._save_config() # Save the updated background transform
 
+    def _refine_background(self):
+        self._bg_draft_id = None
+        self.request_redraw('background')
+
     def load_background(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.png *.jpg *.jpeg *.gif *.bmp")])
         if not file_path:
@@ -1093,10 +1443,32 @@ class TractorTrailerSim:
                 self.scale_bg_scale.set(100)
             
             self._save_config() # Save the new background config
-            self.draw_scene(current_steer=math.radians(self.scale_angle.get()))
-
-    def draw_scene(self, current_steer=0.0):
-        self.canvas.delete("all")
+            self.raster_clearance = None
+            if self.contact_from_image.get(): self._build_raster_clearance()
+            self._build_course_geometry()
+            self.request_redraw('background', 'hud')
+
+    def clear_background(self, redraw=True):
+        # 배경 이미지를 내리고 기본 코스를 벡터로 그림
+        if self._bg_draft_id: self.root.after_cancel(self._bg_draft_id); self._bg_draft_id = None
+        self.bg_image_path = None; self.pil_bg_image = None; self.bg_cache = None; self.bg_photo = None
+        self.raster_clearance = None
+        self.bg_offset_x = 0.0; self.bg_offset_y = 0.0; self.bg_scale = 1.0
+        if hasattr(self, 'scale_bg_x'):
+            self.scale_bg_x.set(0); self.scale_bg_y.set(0); self.scale_bg_scale.set(100)
+        self._save_config()
+        if redraw:
+            self.logger.info("배경 이미지 해제: 기본 코스를 벡터로 그립니다.")
+            self._build_course_geometry()
+            self._check_course_contact(math.radians(self.scale_angle.get()))
+            self.request_redraw('background', 'hud')
+
+    def draw_scene(self, current_steer=0.0, dirty=None):
+        # Retained-mode: 캔버스 아이템은 한 번만 만들고 이후에는 coords()/itemconfig()/move()로 갱신
+        # dirty (REDRAW_GROUPS 의 그룹 집합) 를 주면 나머지 그룹은 그대로 둡니다. 화면이 움직였거나 None 이면 전체.
+        r = self.renderer
+        r.begin_frame()
+        self.redraw.dirty.clear() # 이 프레임이 예약된 다시 그리기를 대신함
         
         if self.auto_follow.get():
             view_offset_x = self.x * self.pixels_per_meter
@@ -1105,40 +1477,80 @@ class TractorTrailerSim:
             view_offset_x = -self.manual_offset_x
             view_offset_y = -self.manual_offset_y
 
-        abs_cx, abs_cy = self.canvas_width/2, self.canvas_height/2
+        self._frame_view = self._view_rect(view_offset_x, view_offset_y)
+        scene_view = (view_offset_x, view_offset_y, self.pixels_per_meter, self.canvas_width, self.canvas_height)
+        if dirty is None or scene_view != self._scene_view: dirty = self.REDRAW_GROUPS
+        self._scene_view = scene_view
+        for group, prefixes in self.REDRAW_GROUPS.items():
+            if group not in dirty: r.touch_prefix(prefixes)
         
-        # 1. Background image
-        if self.bg_photo:
-            bg_screen_x, bg_screen_y = self.to_screen(self.bg_offset_x, self.bg_offset_y, view_offset_x, view_offset_y)
-            self.canvas.create_image(bg_screen_x, bg_screen_y, image=self.bg_photo)
+        if 'background' in dirty: self._draw_background(view_offset_x, view_offset_y)
+        if 'grid' in dirty: self._draw_grid(view_offset_x, view_offset_y)
+
+        if 'paths' in dirty:
+            # 쓸고 간 면적 (반투명 타일 이미지)
+            if self.show_swept_area.get():
+                self._draw_swept_area(view_offset_x, view_offset_y)
+            # 3. Wheel paths (always for the actual truck)
+            self._draw_wheel_paths(view_offset_x, view_offset_y)
+
+        if 'vehicle' in dirty:
+            # 예상 경로 (주행 중에는 생략)
+            if self.show_prediction.get() and not self.animation_id and not self.free_set_mode:
+                self._draw_prediction(view_offset_x, view_offset_y)
+            # Draw actual truck
+            current_actual_state = {'x': self.x, 'y': self.y, 'yaw_tractor': self.yaw_tractor, 'yaw_trailer': self.yaw_trailer}
+            self._draw_truck(current_actual_state, current_steer, view_offset_x, view_offset_y)
 
-        # 2. Grid
-        gap = 5*self.pixels_per_meter; w, h = self.canvas_width, self.canvas_height
+        # Draw ghost car if Free Set mode is active
+        if 'ghost' in dirty:
+            if self.free_set_mode:
+                # When drawing ghost car, ensure we use its yaw_tractor value for steer calculation for visualization
+                ghost_steer = math.radians(self.scale_angle.get()) # Use current steer from controls for ghost tractor wheels
+                self._draw_truck(self.ghost_state, ghost_steer, view_offset_x, view_offset_y, is_ghost=True)
+            elif self.target_solution is not None:
+                self._draw_target_solution(view_offset_x, view_offset_y)
+
+        if 'hud' in dirty: self._draw_hud()
+        r.end_frame()
+
+    def _draw_background(self, view_offset_x, view_offset_y):
+        # 1. Background image (배경 중심이 bg_offset 위치, 보이는 타일만, 화면 배율에 맞춰)
+        r = self.renderer
+        if self.bg_cache:
+            bg_screen_x, bg_screen_y = self.to_screen(self.bg_offset_x, self.bg_offset_y, view_offset_x, view_offset_y)
+            scale = self.bg_scale * self.pixels_per_meter / self.BASE_PIXELS_PER_METER
+            width, height = self.bg_cache.scaled_size(scale)
+            left = round(bg_screen_x) - width // 2; top = round(bg_screen_y) - height // 2
+            tiles = self.bg_cache.view_tiles(scale, left, top, self.canvas_width, self.canvas_height, draft=self._bg_draft_id is not None)
+            for (tx, ty), x, y, photo in tiles:
+                r.image('background', f'bg.{tx},{ty}', x, y, image=photo, anchor='nw')
+        elif self.bg_photo:
+            bg_screen_x, bg_screen_y = self.to_screen(self.bg_offset_x, self.bg_offset_y, view_offset_x, view_offset_y)
+            r.image('background', 'bg', bg_screen_x, bg_screen_y, image=self.bg_photo)
+        # 벡터 코스 (배경 이미지가 없을 때)
+        if self.course_drawing:
+            self._draw_course(view_offset_x, view_offset_y)
+
+    def _draw_grid(self, view_offset_x, view_offset_y):
+        # 2. Grid (처음 한 번과 간격이 바뀔 때 생성, 이후에는 레이어 전체를 move)
+        r = self.renderer
+        abs_cx, abs_cy = self.canvas_width/2, self.canvas_height/2
+        gap = self.lod.grid_step(self.pixels_per_meter)*self.pixels_per_meter; w, h = self.canvas_width, self.canvas_height
         grid_origin_x = abs_cx - view_offset_x
         grid_origin_y = abs_cy + view_offset_y
         start_x = grid_origin_x % gap
         start_y = grid_origin_y % gap
-        for i in range(int(-w/gap)-2, int(w/gap)+2): self.canvas.create_line(start_x + i*gap, 0, start_x + i*gap, h, fill="#e0e0e0")
-        for i in range(int(-h/gap)-2, int(h/gap)+2): self.canvas.create_line(0, start_y + i*gap, w, start_y + i*gap, fill="#e0e0e0")
-
-        # 3. Wheel paths (always for the actual truck)
-        for name, path in self.wheel_paths.items():
-            if len(path)>1:
-                color="#00a0a0" if 't_' in name else "#ff8080"; 
-                if 'front' in name: color="#00ffff"
-                pts=[c for p in list(path) for c in self.to_screen(*p, view_offset_x, view_offset_y)]
-                self.canvas.create_line(pts, fill=color, width=1)
-        
-        # Draw actual truck
-        current_actual_state = {'x': self.x, 'y': self.y, 'yaw_tractor': self.yaw_tractor, 'yaw_trailer': self.yaw_trailer}
-        self._draw_truck(current_actual_state, current_steer, view_offset_x, view_offset_y)
+        if self._grid_start is None or self._grid_gap != gap:
+            self._grid_gap = gap
+            for i in range(int(-w/gap)-2, int(w/gap)+2): r.line('grid', f'grid.v{i}', (start_x + i*gap, 0, start_x + i*gap, h), fill="#e0e0e0")
+            for i in range(int(-h/gap)-2, int(h/gap)+2): r.line('grid', f'grid.h{i}', (0, start_y + i*gap, w, start_y + i*gap), fill="#e0e0e0")
+        else:
+            r.move_layer('grid', start_x - self._grid_start[0], start_y - self._grid_start[1])
+        self._grid_start = (start_x, start_y)
 
-        # Draw ghost car if Free Set mode is active
-        if self.free_set_mode:
-            # When drawing ghost car, ensure we use its yaw_tractor value for steer calculation for visualization
-            ghost_steer = math.radians(self.scale_angle.get()) # Use current steer from controls for ghost tractor wheels
-            self._draw_truck(self.ghost_state, ghost_steer, view_offset_x, view_offset_y, is_ghost=True)
-        
+    def _draw_hud(self):
+        r = self.renderer
         # Calculate current angle difference
         current_angle_diff_deg = self._get_normalized_articulation_degrees(self.yaw_tractor, self.yaw_trailer)
 
@@ -1177,26 +1589,173 @@ class TractorTrailerSim:
         rect_x2 = text_center_x + text_width_estimate / 2 + 20 # Increased padding
         rect_y2 = text_top_y + text_height_estimate + 5
         
-        self.canvas.create_rectangle(rect_x1, rect_y1, rect_x2, rect_y2, fill="lightgray", outline="lightgray", tags="info_display_bg")
+        r.rectangle('hud', 'info_display_bg', (rect_x1, rect_y1, rect_x2, rect_y2), fill="lightgray", outline="lightgray")
         
-        self.canvas.create_text(text_center_x, text_top_y, text=info_text_str, 
-                                font=("Arial", 32, "bold"), fill="blue", tags="info_display", anchor='n')
+        r.text('hud', 'info_display', text_center_x, text_top_y, text=info_text_str, 
+               font=("Arial", 32, "bold"), fill="blue", anchor='n')
+        if self.course_contacts:
+            parts = ", ".join(sorted({part.split('.')[0] for part, _ in self.course_contacts}))
+            r.text('hud', 'contact_warning', text_center_x, rect_y2 + 10, text=f"선 접촉! ({parts})",
+                   font=("Arial", 20, "bold"), fill="red", anchor='n')
+        if self.exam.lines:
+            r.text('hud', 'exam_status', 10, self.canvas_height - 10, text=self.exam.status_text(),
+                   font=("Arial", 12, "bold"), fill="#204080", anchor='sw')
+        if self.pixels_per_meter != self.BASE_PIXELS_PER_METER:
+            r.text('hud', 'zoom', self.canvas_width - 10, self.canvas_height - 10,
+                   text=f"배율 x{self.pixels_per_meter / self.BASE_PIXELS_PER_METER:.2f} (격자 {self.lod.grid_step(self.pixels_per_meter)}m)",
+                   font=("Arial", 10), fill="#606060", anchor='se')
+
+    def _view_rect(self, view_offset_x, view_offset_y):
+        # 화면이 보여 주는 월드 좌표 사각형 (left, bottom, right, top)
+        ppm = self.pixels_per_meter
+        left = (view_offset_x - self.canvas_width/2) / ppm; bottom = (view_offset_y - self.canvas_height/2) / ppm
+        return left, bottom, left + self.canvas_width / ppm, bottom + self.canvas_height / ppm
+
+    def _project_flat(self, flat, view_offset_x, view_offset_y):
+        # to_screen 을 [x0, y0, x1, y1, ...] 좌표 전체에 적용
+        ppm = self.pixels_per_meter
+        ox = self.canvas_width/2 - view_offset_x; oy = self.canvas_height/2 + view_offset_y
+        pts = [0.0] * len(flat)
+        pts[0::2] = [ox + v*ppm for v in flat[0::2]]
+        pts[1::2] = [oy - v*ppm for v in flat[1::2]]
+        return pts
+
+    def _draw_course(self, view_offset_x, view_offset_y):
+        # 코스 선/글자는 월드 좌표(m)를 투영만 하므로 배율과 관계없이 선명하고 비용이 일정합니다 (아이템 30개).
+        # 뷰 이동은 레이어 전체 move, 전체 재투영은 축척이 바뀌었거나 코스를 새로 만든 경우에만 수행합니다.
+        r = self.renderer
+        last_view = self._course_view
+        if last_view is not None and last_view[2] == self.pixels_per_meter:
+            r.move_layer('course', last_view[0] - view_offset_x, view_offset_y - last_view[1])
+        else:
+            lines, labels = self.course_drawing
+            for key, style, *flat in lines:
+                r.line('course', key, self._project_flat(flat, view_offset_x, view_offset_y), **COURSE_STYLES[style])
+            for key, style, x, y, text, anchor in labels:
+                r.text('course', key, *self.to_screen(x, y, view_offset_x, view_offset_y), text=text, anchor=anchor, **COURSE_STYLES[style])
+        self._course_view = (view_offset_x, view_offset_y, self.pixels_per_meter)
+
+    def _draw_wheel_paths(self, view_offset_x, view_offset_y):
+        # 궤적은 새로 추가된 점만 캔버스 선 끝에 덧붙이고, 뷰 이동은 레이어 전체 move 로 처리.
+        # 전체 재투영은 버퍼가 바뀌었거나(초기화/복원), 축척이 바뀌었거나, 화면이 궤적 창을 벗어난 경우에만 수행하며
+        # 창 안을 지나는 구간만 화면 해상도로 줄여 조각(path.{이름}.{k})으로 그립니다 (truck_lod).
+        r = self.renderer; ppm = self.pixels_per_meter
+        last_view = self._paths_view
+        if last_view is not None and last_view[2] == ppm and window_contains(self._paths_window, self._frame_view):
+            r.move_layer('paths', last_view[0] - view_offset_x, view_offset_y - last_view[1])
+        else:
+            self._paths_drawn.clear(); self._paths_window = self.lod.window(self._frame_view)
+        self._paths_view = (view_offset_x, view_offset_y, ppm)
+        window = self._paths_window; cell = self.lod.cell(ppm)
 
-    def draw_wheel(self, cx, cy, yaw, steer, is_dual, view_offset_x, view_offset_y, fill_color="black", outline_color="#333", dash=None):
+        for name, path in self.wheel_paths.items():
+            if len(path)<=1:
+                continue
+            drawn = self._paths_drawn.get(name)
+            update = drawn.extend(path, window, cell) if drawn and (not drawn.pieces or r.has(f'path.{name}.0')) else None
+            if update is None:
+                color="#00a0a0" if 't_' in name else "#ff8080"; 
+                if 'front' in name: color="#00ffff"
+                old_pieces = len(drawn.pieces) if drawn else 0
+                drawn = self._paths_drawn[name] = DrawnTrail(path, window, cell)
+                for k, coords in enumerate(drawn.coords):
+                    r.line('paths', f'path.{name}.{k}', self._project_flat(coords, view_offset_x, view_offset_y), fill=color, width=1)
+                for k in range(len(drawn.coords), old_pieces): r.skip(f'path.{name}.{k}')
+                drawn.coords = None
+            else:
+                drop, trim, coords = update
+                last = len(drawn.pieces) - 1
+                if drop and last > 0: r.extend_line(f'path.{name}.0', (), drop); drop = 0
+                if coords or drop or trim is not None:
+                    r.extend_line(f'path.{name}.{last}', self._project_flat(coords, view_offset_x, view_offset_y) if coords else (), drop, trim)
+
+    def _draw_swept_area(self, view_offset_x, view_offset_y):
+        # 타일마다 반투명 이미지 하나. 칠한 타일(version 변경)이나 축척이 바뀐 타일만 이미지를 다시 만듭니다.
+        swept = self.swept_area; r = self.renderer
+        for key in [k for k in self._swept_photos if k not in swept.tiles]:
+            del self._swept_photos[key]
+        try:
+            from PIL import ImageTk
+        except ImportError:
+            return
+        for key in swept.tiles:
+            x0, y0, size = swept.tile_origin(key)
+            if not self.lod.visible(self._frame_view, (x0, y0, x0 + size, y0 + size)): continue
+            left, top = self.to_screen(x0, y0 + size, view_offset_x, view_offset_y)
+            right, bottom = self.to_screen(x0 + size, y0, view_offset_x, view_offset_y)
+            left, top = round(left), round(top)
+            pixels = (round(right) - left, round(bottom) - top)
+            cached = self._swept_photos.get(key)
+            if cached is None or cached[0] != swept.version[key] or cached[1] != pixels:
+                cached = self._swept_photos[key] = (swept.version[key], pixels, ImageTk.PhotoImage(swept.tile_image(key, *pixels)))
+            r.image('swept', f'swept.{key[0]},{key[1]}', left, top, image=cached[2], anchor='nw')
+
+    def _log_swept_area(self):
+        extent = self.swept_area.extent()
+        if extent is None: return
+        parts = ", ".join(f"{name} {self.swept_area.area(name):.1f}" for name in self.swept_area.parts)
+        self.logger.info(f"쓸고 간 면적: {self.swept_area.area():.1f}m² ({parts}), "
+                         f"범위 x {extent[0]:.1f} ~ {extent[2]:.1f}m, y {extent[1]:.1f} ~ {extent[3]:.1f}m")
+
+    def _draw_prediction(self, view_offset_x, view_offset_y):
+        mode = self.angle_control_mode.get()
+        prediction = self.predictor.get(self.engine.get_state(), self.trailer_len, self.scale_angle.get(),
+                                        1 if self.var_gear.get() == "F" else -1, mode, self.target_articulation_angle.get(), background=True)
+        if prediction is None:
+            # MPC 미리보기는 작업 스레드에서 계산: 끝나면 다시 그림
+            if not self._prediction_poll_id: self._prediction_poll_id = self.root.after(30, self._poll_prediction)
+            return
+        if len(prediction.kingpin) < 4: return
+        r = self.renderer; project = self._project_flat
+        for name in TRACK_WHEELS:
+            color = "#00c8c8" if name.startswith('t_') else "#ff9090"
+            r.line('prediction', f'predict.{name}', project(prediction.wheels[name], view_offset_x, view_offset_y), fill=color, width=1, dash=(4, 3))
+        r.line('prediction', 'predict.trailer_rear', project(prediction.trailer_rear, view_offset_x, view_offset_y), fill="#d04070", width=2, dash=(6, 3))
+        r.line('prediction', 'predict.kingpin', project(prediction.kingpin, view_offset_x, view_offset_y), fill="#4060d0", width=2, dash=(6, 3))
+        for i, (dist, mx, my) in enumerate(prediction.marks):
+            sx, sy = self.to_screen(mx, my, view_offset_x, view_offset_y)
+            r.oval('prediction', f'predict.mark{i}', (sx-3, sy-3, sx+3, sy+3), fill="#4060d0", outline="")
+        if prediction.status in ('target_reached', 'jackknife'):
+            # 중간에 멈추는 경우 멈춘 지점 표시
+            sx, sy = self.to_screen(prediction.kingpin[-2], prediction.kingpin[-1], view_offset_x, view_offset_y)
+            r.oval('prediction', 'predict.stop', (sx-6, sy-6, sx+6, sy+6), outline="red" if prediction.status == 'jackknife' else "#208020", width=2)
+
+    def _poll_prediction(self):
+        if self.predictor.pending:
+            self._prediction_poll_id = self.root.after(30, self._poll_prediction); return
+        self._prediction_poll_id = None
+        self.request_redraw('vehicle')
+
+    def _draw_target_solution(self, view_offset_x, view_offset_y):
+        # 목표 지점 풀이 미리보기: 마지막 자세를 고스트로, 목표점(빨간 X)과 도달하는 뒤끝(점)
+        solution = self.target_solution; r = self.renderer
+        if solution.states:
+            self._draw_truck(solution.states[-1], math.radians(solution.maneuvers[-1]['steer_deg']), view_offset_x, view_offset_y, is_ghost=True)
+        tx, ty = self.to_screen(solution.target[0], solution.target[1], view_offset_x, view_offset_y)
+        r.line('prediction', 'target.x1', (tx-8, ty-8, tx+8, ty+8), fill="red", width=2)
+        r.line('prediction', 'target.x2', (tx-8, ty+8, tx+8, ty-8), fill="red", width=2)
+        sx, sy = self.to_screen(solution.rear[0], solution.rear[1], view_offset_x, view_offset_y)
+        r.oval('prediction', 'target.rear', (sx-4, sy-4, sx+4, sy+4), fill="#d04070", outline="")
+
+    def draw_wheel(self, key, cx, cy, yaw, steer, is_dual, view_offset_x, view_offset_y, fill_color="black", outline_color="#333", dash=None):
         wheel_len, wheel_width=0.8, 0.3 if not is_dual else 0.5; final_angle=yaw+steer
         # --------------------------------------------------------------------------------------------------
         # draw_wheel 내부의 'width' 변수명 오류 수정: wheel_width로 변경
         # --------------------------------------------------------------------------------------------------
         corners=[(wheel_len/2,wheel_width/2), (wheel_len/2,-wheel_width/2), (-wheel_len/2,-wheel_width/2), (-wheel_len/2,wheel_width/2)]
         scr_pts=[c for dx,dy in corners for c in self.to_screen(cx+dx*math.cos(final_angle)-dy*math.sin(final_angle), cy+dx*math.sin(final_angle)+dy*math.cos(final_angle), view_offset_x, view_offset_y)]
-        self.canvas.create_polygon(scr_pts, fill=fill_color, outline=outline_color, dash=dash)
+        self.renderer.polygon('vehicle', key, scr_pts, fill=fill_color, outline=outline_color, dash=dash)
 
-    def draw_rect_body(self, cx, cy, yaw, length, width, color, view_offset_x, view_offset_y, outline_color="black", dash=None):
+    def draw_rect_body(self, key, cx, cy, yaw, length, width, color, view_offset_x, view_offset_y, outline_color="black", dash=None):
         corners=[(length/2,width/2), (length/2,-width/2), (-length/2,-width/2), (-length/2,width/2)]
         scr_pts=[c for dx,dy in corners for c in self.to_screen(cx+dx*math.cos(yaw)-dy*math.sin(yaw), cy+dx*math.sin(yaw)+dy*math.cos(yaw), view_offset_x, view_offset_y)]
-        self.canvas.create_polygon(scr_pts, fill=color, outline=outline_color, dash=dash)
+        self.renderer.polygon('vehicle', key, scr_pts, fill=color, outline=outline_color, dash=dash)
 
     def _draw_truck(self, state, steer_rad, view_offset_x, view_offset_y, is_ghost=False):
+        # 화면 밖이면 그리지 않음 (킹핀에서 트랙터 앞/트레일러 뒤끝까지 넉넉한 반경)
+        reach = self.trailer_len + self.tractor_wb
+        if self._frame_view and not self.lod.visible(self._frame_view, (state['x'] - reach, state['y'] - reach, state['x'] + reach, state['y'] + reach)):
+            return
         # 4. Truck bodies (cab, swing areas, container)
         # Adjusted visual proportions for cab and swing area (cabin 10% shorter, swing area longer by that amount)
         cab_len = 2.25 # Original 2.5 - 10%
@@ -1204,6 +1763,7 @@ class TractorTrailerSim:
         cab_center_dist = (self.tractor_wb - 0.5) - 0.125
         cab_cx = state['x'] + cab_center_dist * math.cos(state['yaw_tractor']); cab_cy = state['y'] + cab_center_dist * math.sin(state['yaw_tractor'])
         
+        prefix = 'ghost' if is_ghost else 'truck'
         color_cab = "#8888ff" if not is_ghost else "lightgray"
         color_swing = "#99bbaa" if not is_ghost else "lightgray"
         color_trailer_swing = "#aaddff" if not is_ghost else "lightgray"
@@ -1211,7 +1771,7 @@ class TractorTrailerSim:
         outline_color = "black" if not is_ghost else "darkgray"
         dash_pattern = None if not is_ghost else (3, 2)
 
-        self.draw_rect_body(cab_cx, cab_cy, state['yaw_tractor'], cab_len, self.tractor_width, color_cab, view_offset_x, view_offset_y, outline_color=outline_color, dash=dash_pattern)
+        self.draw_rect_body(f'{prefix}.cab', cab_cx, cab_cy, state['yaw_tractor'], cab_len, self.tractor_width, color_cab, view_offset_x, view_offset_y, outline_color=outline_color, dash=dash_pattern)
         
         swing_area_len = 3.25 # Original 3.0 + 0.25
         swing_area_width = self.tractor_width
@@ -1219,7 +1779,7 @@ class TractorTrailerSim:
         swing_center_offset = 0.5 + 0.125
         swing_cx = state['x'] + swing_center_offset * math.cos(state['yaw_tractor'])
         swing_cy = state['y'] + swing_center_offset * math.sin(state['yaw_tractor'])
-        self.draw_rect_body(swing_cx, swing_cy, state['yaw_tractor'], swing_area_len, swing_area_width, color_swing, view_offset_x, view_offset_y, outline_color=outline_color, dash=dash_pattern)
+        self.draw_rect_body(f'{prefix}.swing', swing_cx, swing_cy, state['yaw_tractor'], swing_area_len, swing_area_width, color_swing, view_offset_x, view_offset_y, outline_color=outline_color, dash=dash_pattern)
         
         trailer_swing_len = 2.0
         # The light blue part now extends 0.5m in front of the kingpin.
@@ -1245,7 +1805,7 @@ class TractorTrailerSim:
             screen_coords = self.to_screen(wx, wy, view_offset_x, view_offset_y)
             gooseneck_scr_pts.extend(screen_coords)
             
-        self.canvas.create_polygon(gooseneck_scr_pts, fill=color_trailer_swing, outline=outline_color, dash=dash_pattern)
+        self.renderer.polygon('vehicle', f'{prefix}.gooseneck', gooseneck_scr_pts, fill=color_trailer_swing, outline=outline_color, dash=dash_pattern)
 
         total_visual_len = self.trailer_len + 1.0
         container_len = total_visual_len - self.trailer_swing_len
@@ -1254,10 +1814,10 @@ class TractorTrailerSim:
         container_center_offset = 1.5 + (container_len / 2.0) 
         container_cx = state['x'] - container_center_offset * math.cos(state['yaw_trailer'])
         container_cy = state['y'] - container_center_offset * math.sin(state['yaw_trailer'])
-        self.draw_rect_body(container_cx, container_cy, state['yaw_trailer'], container_len, self.tractor_width, color_container, view_offset_x, view_offset_y, outline_color=outline_color, dash=dash_pattern)
+        self.draw_rect_body(f'{prefix}.container', container_cx, container_cy, state['yaw_trailer'], container_len, self.tractor_width, color_container, view_offset_x, view_offset_y, outline_color=outline_color, dash=dash_pattern)
         
-        # Add container details (lines and text)
-        if not is_ghost:
+        # Add container details (lines and text), 리브 간격이 화면에서 구분되지 않으면 생략 (LOD)
+        if not is_ghost and self.lod.ribs(self.pixels_per_meter, 0.375):
                         # Draw vertical ribs (emphasized)
                         line_color = "#e08080" # Darker pink
                         num_lines = int(container_len / 0.375) # A line every 0.375 meters (4x denser)
@@ -1278,24 +1838,30 @@ class TractorTrailerSim:
                             
                             screen_start = self.to_screen(start_x, start_y, view_offset_x, view_offset_y)
                             screen_end = self.to_screen(end_x, end_y, view_offset_x, view_offset_y)
-                            self.canvas.create_line(screen_start[0], screen_start[1], screen_end[0], screen_end[1], fill=line_color, width=2)
+                            self.renderer.line('vehicle', f'{prefix}.rib{i}', (screen_start[0], screen_start[1], screen_end[0], screen_end[1]), fill=line_color, width=2)
             # Text removed due to rendering jitter
 
         
         
         # 5. Wheels
         wheel_positions = self._get_world_wheel_positions(steer_rad, state) # Pass state to get wheel positions
+        wheel_outline = outline_color if self.lod.wheel_outline(self.pixels_per_meter, 0.3) else "" # 작으면 테두리 생략 (LOD)
         for name, pos in wheel_positions.items():
             is_front='front' in name; yaw=state['yaw_tractor'] if 't_' in name else state['yaw_trailer']; steer=steer_rad if is_front else 0.0
             wheel_color = "black" if not is_ghost else "darkgray"
-            self.draw_wheel(pos[0], pos[1], yaw, steer, not is_front, view_offset_x, view_offset_y, fill_color=wheel_color, outline_color=outline_color, dash=dash_pattern)
+            self.draw_wheel(f'{prefix}.wheel.{name}', pos[0], pos[1], yaw, steer, not is_front, view_offset_x, view_offset_y, fill_color=wheel_color, outline_color=wheel_outline, dash=dash_pattern)
         
         # 6. Kingpin
         kpx, kpy = self.to_screen(state['x'], state['y'], view_offset_x, view_offset_y)
         kingpin_color = "yellow" if not is_ghost else "darkgray"
-        self.canvas.create_oval(kpx-4, kpy-4, kpx+4, kpy+4, fill=kingpin_color, outline=outline_color, dash=dash_pattern)
+        self.renderer.oval('vehicle', f'{prefix}.kingpin', (kpx-4, kpy-4, kpx+4, kpy+4), fill=kingpin_color, outline=outline_color, dash=dash_pattern)
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "sweep":
+        # python truck_sim.py sweep [옵션]: GUI 없이 파라미터 스윕 (truck_sweep.py)
+        from truck_sweep import main
+        main(sys.argv[2:]); sys.exit()
     root = tk.Tk()
     app = TractorTrailerSim(root)
     root.mainloop()
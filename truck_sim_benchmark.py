@@ -0,0 +1,789 @@
+"""시뮬레이터 성능 측정 스크립트.
+
+    python truck_sim_benchmark.py            # 모든 벤치마크
+    python truck_sim_benchmark.py kinematics # 이름을 지정해 일부만 실행
+
+렌더링이 필요한 항목은 디스플레이가 없으면 건너뜁니다.
+"""
+import argparse
+import math
+import os
+import time
+
+import truck_kinematics as kin
+
+
+def _timeit(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _make_app():
+    # Tk 가 없거나 디스플레이가 없으면 None
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"  (렌더링 벤치마크 건너뜀: {e})")
+        return None, None
+    import truck_sim
+    root.withdraw()
+    app = truck_sim.TractorTrailerSim(root)
+    return root, app
+
+
+def bench_kinematics():
+    print("[kinematics] 20m 주행 반복 (steps/s)")
+    n_drives = 200
+    def headless():
+        engine = kin.KinematicsEngine()
+        for i in range(n_drives):
+            engine.set_state({'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi})
+            engine.drive(20.0, math.radians((i % 81) - 40), mode="manual", direction=1 if i % 2 else -1)
+    steps = n_drives * int(20.0/kin.STEP_DIST)
+    t = _timeit(headless)
+    print(f"  headless     : {steps/t:12.0f} steps/s  ({n_drives/t:8.0f} drives/s)")
+
+    root, app = _make_app()
+    if app is None: return
+    steps = int(20.0/kin.STEP_DIST)
+    def rendered():
+        app.reset_simulation()
+        run = app.engine.start_drive(20.0, 1, "manual", math.radians(15))
+        while run.tick() is None:
+            app.wheel_paths.append_positions(app._get_world_wheel_positions())
+            app.draw_scene(run.steer_rad)
+            root.update_idletasks()
+    t = _timeit(rendered)
+    print(f"  with render  : {steps/t:12.0f} steps/s")
+    root.destroy()
+
+
+def bench_batch():
+    import numpy as np
+    import truck_batch
+    print("[batch] 조향 -40..40° x 트레일러 10.5..14m, 20m 후진")
+    steer, tlen = np.meshgrid(np.radians(np.arange(-40, 41)), np.arange(10.5, 14.01, 0.5) - kin.TRAILER_SWING_LEN)
+    steer = steer.ravel(); tlen = tlen.ravel(); n = steer.size
+    def sequential():
+        for i in range(n):
+            engine = kin.KinematicsEngine(trailer_len=tlen[i])
+            engine.drive(20.0, steer[i], direction=-1)
+    def batch():
+        truck_batch.batch_rollout(truck_batch.initial_state(n), steer, tlen, 20.0, -1)
+    def batch_paths():
+        truck_batch.batch_rollout(truck_batch.initial_state(n), steer, tlen, 20.0, -1, path_every=10)
+    t_seq = _timeit(sequential, 1); t_batch = _timeit(batch); t_paths = _timeit(batch_paths)
+    print(f"  N={n} 순차 스칼라 : {t_seq*1000:8.1f} ms")
+    print(f"  N={n} 배치       : {t_batch*1000:8.1f} ms  (x{t_seq/t_batch:.1f})")
+    print(f"  배치 + 궤적(1/10) : {t_paths*1000:8.1f} ms")
+
+
+def _fill_paths(app, meters=156.0):
+    # max_path_points 가 가득 찰 때까지 S자 주행으로 바퀴 궤적을 채움 (최악의 경우: 단순화 없이 스텝마다 저장)
+    app.path_tolerance = 0
+    app.reset_simulation()
+    for i in range(int(meters // 20)):
+        app.engine.drive(20.0, math.radians(10 if i % 2 else -10), direction=1 if i % 4 < 2 else -1,
+                         on_step=lambda run: app.wheel_paths.append_positions(app._get_world_wheel_positions()))
+
+
+def bench_render():
+    root, app = _make_app()
+    if app is None: return
+    print("[render] 가득 찬 바퀴 궤적 + 20m 주행, 프레임당 draw_scene 시간")
+    def frame_times(full_rebuild):
+        _fill_paths(app)
+        times = []
+        run = app.engine.start_drive(20.0, 1, "manual", math.radians(15))
+        while run.tick() is None:
+            app.wheel_paths.append_positions(app._get_world_wheel_positions())
+            t0 = time.perf_counter()
+            if full_rebuild:
+                app.renderer.clear(); app._grid_start = None; app._course_view = None  # 이전 방식: 매 프레임 delete("all") 후 재생성
+            app.draw_scene(run.steer_rad)
+            root.update_idletasks()
+            times.append(time.perf_counter() - t0)
+        return times
+    for label, full in (("delete('all') 재생성", True), ("retained", False)):
+        times = sorted(frame_times(full))
+        print(f"  {label:20s}: 평균 {sum(times)/len(times)*1000:7.2f} ms, p95 {times[int(len(times)*0.95)]*1000:7.2f} ms")
+    root.destroy()
+
+
+def bench_paths():
+    import sys
+    from collections import deque
+    from truck_paths import WheelPaths
+    print("[paths] 바퀴 궤적 (2000점 가득 참, 바퀴 12개)")
+    maxlen, n_paths, ppm = 2000, 12, 12
+    points = [(math.cos(i*0.01)*50, math.sin(i*0.013)*30) for i in range(maxlen)]
+    dq = deque(points, maxlen=maxlen)
+    paths = WheelPaths.from_points({'p': points}, maxlen=maxlen); trail = paths['p']
+    dq_bytes = sys.getsizeof(dq) + sum(sys.getsizeof(p) + 2*sys.getsizeof(p[0]) for p in dq)
+    print(f"  메모리/궤적       : deque(tuple) {dq_bytes/1024:7.1f} KiB  ->  array('d') {paths.nbytes()/1024:7.1f} KiB")
+
+    def to_screen(x, y, vx, vy): return 450 + x*ppm - vx, 350 - y*ppm + vy
+    def old_frame():
+        for _ in range(n_paths):
+            [c for p in list(dq) for c in to_screen(*p, 3.0, 4.0)]
+    def project(flat):
+        pts = [0.0] * len(flat)
+        pts[0::2] = [447.0 + v*ppm for v in flat[0::2]]; pts[1::2] = [354.0 - v*ppm for v in flat[1::2]]
+        return pts
+    def full_frame():
+        for _ in range(n_paths): project(trail.flat())
+    def incremental_frame():
+        for _ in range(n_paths):
+            paths.append_positions({'p': points[0]}); project(trail.flat(1))
+    for label, fn in (("이전 (tuple 순회)", old_frame), ("전체 재투영", full_frame), ("증분 (새 점만)", incremental_frame)):
+        t = _timeit(lambda: [fn() for _ in range(20)]) / 20
+        print(f"  {label:16s}: {t*1000:8.3f} ms/frame")
+
+
+def _segments_nbytes(snapshots):
+    # 스냅샷들이 참조하는 (중복 없는) 세그먼트 좌표 데이터 크기
+    seen = set(); total = 0
+    for snap in snapshots:
+        segment = snap.segment
+        while segment is not None and id(segment) not in seen:
+            seen.add(id(segment)); total += sum(a.itemsize * len(a) for a in segment.data.values())
+            segment = segment.parent
+    return total
+
+
+def bench_history():
+    from collections import deque
+    from truck_paths import WheelPaths
+    print("[history] 조작 기록 캡처/복원 (20m 주행마다 1개, 바퀴 12개, 궤적 최대 2000점)")
+    engine = kin.KinematicsEngine()
+    for n_entries in (50, 500):
+        engine.set_state({'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi})
+        paths = WheelPaths.start(engine.wheel_positions())
+        old_paths = {name: deque([pos], maxlen=2000) for name, pos in engine.wheel_positions().items()}
+        snapshots = []; copies = []
+        t_snap = t_copy = 0.0
+        for i in range(n_entries):
+            def on_step(run):
+                positions = engine.wheel_positions()
+                paths.append_positions(positions)
+                for name, pos in positions.items(): old_paths[name].append(pos)
+            engine.drive(20.0, math.radians(10 if i % 2 else -10), direction=1 if i % 4 < 2 else -1, on_step=on_step)
+            t0 = time.perf_counter(); snapshots.append(paths.snapshot()); t_snap += time.perf_counter() - t0
+            t0 = time.perf_counter(); copies.append({name: list(p) for name, p in old_paths.items()}); t_copy += time.perf_counter() - t0
+        def restore_old():
+            for c in copies[::max(1, n_entries // 20)]:
+                {name: deque(p, maxlen=2000) for name, p in c.items()}
+        def restore_new():
+            for snap in snapshots[::max(1, n_entries // 20)]:
+                restored = WheelPaths.from_snapshot(snap)
+                for _, trail in restored.items(): trail.flat()  # 화면 투영에 필요한 좌표까지 포함
+        n_restore = len(snapshots[::max(1, n_entries // 20)])
+        mem_old = sum(len(p) for c in copies for p in c.values()) * 2 * 8
+        print(f"  {n_entries:4d}개: 캡처 {t_copy/n_entries*1e6:9.1f} us -> {t_snap/n_entries*1e6:6.2f} us, "
+              f"복원 {_timeit(restore_old)/n_restore*1000:7.2f} ms -> {_timeit(restore_new)/n_restore*1000:7.2f} ms, "
+              f"좌표 데이터 {mem_old/2**20:8.1f} MiB -> {_segments_nbytes(snapshots)/2**20:6.2f} MiB")
+
+    import random
+    from truck_course import CourseGeometry, CourseTransform
+    from truck_exam import ExamScorer
+    from truck_history import HistoryTree, replay_actions
+    print("[history] 분기 트리: 노드 추가 / 분기 전환(lazy replay) 지연 (시뮬레이터처럼 스텝마다 선 접촉 검사와 시험 채점 포함)")
+    geometry = CourseGeometry.build(CourseTransform())
+    def contacts(state, steer_rad, trailer_len):
+        return geometry.check_vehicle(kin.body_polygons(state, steer_rad, trailer_len))
+    def replay(state, actions):
+        return replay_actions(state, actions, exam=ExamScorer(CourseTransform()), contacts=contacts)
+    rng = random.Random(0)
+    for n_nodes in (1000, 5000):
+        ui = {"angle_control_mode": "manual", "var_gear": "F", "scale_angle": 0, "target_articulation_angle": 45.0,
+              "trailer_len_var": 11.5, "auto_follow": True, "manual_offset_x": 0, "manual_offset_y": 0}
+        engine = kin.KinematicsEngine()
+        paths = WheelPaths.start(engine.wheel_positions())
+        exam = ExamScorer(CourseTransform()); exam.reset(engine.get_state(), engine.trailer_len)
+        tree = HistoryTree(replay=replay)
+        tree.reset("초기 상태", dict(ui, wheel_paths=paths.snapshot(), exam=exam.snapshot(), **engine.get_state()))
+        t_add = []
+        for i in range(n_nodes):
+            if rng.random() < 0.1:   # 가끔 과거 노드에서 분기
+                node = tree.current
+                for _ in range(rng.randrange(1, 6)):
+                    node = node.parent or node
+                tree.select(node)
+                state = tree.state_of(node)
+                engine.set_state(state); paths = WheelPaths.from_snapshot(state["wheel_paths"]); exam.restore(state["exam"])
+            action = {"distance": rng.choice([0.2, 0.5, 1, 5, 10, 20]), "direction": rng.choice([1, -1]), "mode": "manual",
+                      "steer_deg": rng.randint(-40, 40), "target_angle": None, "ui": ui}
+            def on_step(run):
+                paths.append_positions(engine.wheel_positions())
+                pose = engine.get_state()
+                exam.step(pose, run.direction, engine.trailer_len, contacts(pose, run.steer_rad, engine.trailer_len))
+            paths.anchor(); exam.begin_maneuver(action["direction"])
+            run = engine.drive(action["distance"], math.radians(action["steer_deg"]), "manual", action["direction"], on_step=on_step)
+            if run.status == 'jackknife': exam.jackknife()
+            t0 = time.perf_counter()
+            tree.add("주행", dict(ui, wheel_paths=paths.snapshot(), exam=exam.snapshot(), **engine.get_state()), action)
+            t_add.append(time.perf_counter() - t0)
+        # 무작위 노드로 분기 전환 (대부분 캐시에 없어 replay 필요)
+        nodes = []; stack = [tree.root]
+        while stack:
+            node = stack.pop(); nodes.append(node); stack.extend(node.children)
+        t_switch = []
+        for node in rng.sample(nodes, 200):
+            t0 = time.perf_counter(); tree.select(node); tree.state_of(node); tree.line_from(node)
+            t_switch.append(time.perf_counter() - t0)
+        t_add.sort(); t_switch.sort()
+        print(f"  {n_nodes:5d}개 노드: 추가 p99 {t_add[int(len(t_add)*0.99)]*1000:6.3f} ms, "
+              f"분기 전환 평균 {sum(t_switch)/len(t_switch)*1000:6.2f} ms / 최대 {t_switch[-1]*1000:6.2f} ms (16ms 프레임 예산), "
+              f"체크포인트 {sum(1 for n in nodes if n.checkpoint)}개, 보관 상태 {sum(1 for n in nodes if n.state is not None)}개, "
+              f"궤적 데이터 {_segments_nbytes([n.state['wheel_paths'] for n in nodes if n.state is not None])/2**20:5.2f} MiB")
+
+
+def bench_clock():
+    print("[clock] 20m 주행: 화면 한 프레임 비용별 소요 시간 / 그린 프레임 수 (가상 시간)")
+    steps_total = int(20.0/kin.STEP_DIST)
+    for render_ms in (1, 10, 30, 100):
+        # 예전 방식: 스텝마다 그리고 after(10)
+        old = steps_total * (render_ms + 10) / 1000
+        # 고정 스텝 시계: 프레임 간격 16ms 상한, 늦어지면 한 프레임에 여러 스텝
+        clock = kin.FixedStepClock(); now = 0.0; clock.start(now)
+        steps = frames = 0
+        while steps < steps_total:
+            steps += min(clock.steps_due(now), steps_total - steps); frames += 1
+            now += max(render_ms, 16) / 1000
+        print(f"  프레임 {render_ms:4d} ms: 예전 {old:6.2f} s ({steps_total} 프레임) -> {now:5.2f} s ({frames} 프레임)")
+    engine = kin.KinematicsEngine()
+    t = _timeit(lambda: engine.drive(20.0, math.radians(15)))
+    print(f"  즉시 완료    : {t*1000:6.2f} ms (그리기 1회 제외)")
+
+
+def bench_integrator():
+    print("[integrator] Euler(고정 스텝) vs arc(정확해 + 적응형 스텝): 20m 후진, 오차는 정확해 대비")
+    start = {'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi + math.radians(10)}
+    for steer_deg, trailer_len in ((15, 9.5), (35, 9.5), (40, 12.0)):
+        exact = kin.KinematicsEngine(trailer_len=trailer_len); exact.set_state(start)
+        exact.arc_step(math.radians(steer_deg), -1, 20.0)
+        print(f"  조향 {steer_deg}°, 트레일러 본체 {trailer_len}m")
+        def run(**kw):
+            engine = kin.KinematicsEngine(trailer_len=trailer_len); engine.set_state(start)
+            result = engine.drive(20.0, math.radians(steer_deg), direction=-1, **kw)
+            return engine, result
+        for label, kw in [(f"euler {h:6.3f}m", dict(step_dist=h)) for h in (0.5, 0.2, kin.STEP_DIST, 0.02, 0.005)] + \
+                         [("arc 적응형    ", dict(integrator="arc"))]:
+            engine, result = run(**kw)
+            t = _timeit(lambda: run(**kw))
+            steps = result.steps if hasattr(result, 'steps') else result.steps_total
+            travelled = result.distance_travelled
+            # 고정 스텝은 int(20/h) 스텝만 가므로 같은 거리까지의 정확해와 비교
+            ref = kin.KinematicsEngine(trailer_len=trailer_len); ref.set_state(start)
+            ref.arc_step(math.radians(steer_deg), -1, travelled)
+            err_pos = math.hypot(engine.x - ref.x, engine.y - ref.y)
+            err_art = abs(engine.articulation_degrees() - ref.articulation_degrees())
+            print(f"    {label}: {steps/travelled:7.1f} steps/m, 킹핀 오차 {err_pos:9.2e} m, 꺾임각 오차 {err_art:9.2e}°, "
+                  f"{travelled/t:10.0f} m/s")
+
+
+def bench_events():
+    print("[events] 목표 각도 정지 정밀도: 후진 조향 35°, 목표 45° (정지 시 꺾임각 오차 / 정지 거리)")
+    start = {'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi + math.radians(10)}
+    def run(**kw):
+        engine = kin.KinematicsEngine(); engine.set_state(start)
+        result = engine.drive(20.0, math.radians(35), mode='stop_at_target', direction=-1, target_angle=45.0, **kw)
+        return engine, result
+    for label, kw in [(f"euler {h:6.3f}m", dict(step_dist=h)) for h in (0.5, kin.STEP_DIST, 0.01)] + \
+                     [(f"arc   최대 {h:4.1f}m", dict(integrator="arc", step_dist=h)) for h in (1.0, 5.0)]:
+        engine, result = run(**kw)
+        t = _timeit(lambda: run(**kw))
+        distance = result.event_distance if hasattr(result, 'event_distance') else result.distance_travelled
+        print(f"    {label}: 오차 {abs(engine.articulation_degrees()) - 45.0:+9.2e}°, 정지 거리 {distance:.6f} m, {t*1e6:8.1f} us")
+
+
+def bench_predict():
+    from truck_predict import TrajectoryPredictor
+    print("[predict] 조향 슬라이더 예상 경로 (20m, -40° ~ 40° 왕복)")
+    state = {'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi + math.radians(10)}
+    for mode in ('manual', 'stop_at_target', 'maintain', 'mpc'):
+        predictor = TrajectoryPredictor()
+        sweep = list(range(-40, 41)) + list(range(40, -41, -1))
+        t = []
+        for steer in sweep:
+            t0 = time.perf_counter(); predictor.get(state, 9.5, steer, -1, mode, 30.0); t.append(time.perf_counter() - t0)
+        cold = t[:81]; warm = t[81:]
+        print(f"  {mode:15s}: 처음 계산 평균 {sum(cold)/len(cold)*1000:6.2f} ms / 최대 {max(cold)*1000:6.2f} ms, "
+              f"캐시 {sum(warm)/len(warm)*1e6:6.2f} us (16ms 프레임 예산, 계산 {predictor.misses}회)")
+    # mpc 는 화면에서 작업 스레드로 계산: 슬라이더 한 칸마다 UI 스레드가 쓰는 시간과 계산이 끝나기까지의 시간
+    # (거의 직선인 자세: 조향 방향에 따라 목표 꺾임각 방향이 바뀜)
+    straight = {'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi}
+    predictor = TrajectoryPredictor()
+    t = []; waits = []
+    for steer in list(range(-40, 41)) + list(range(40, -41, -1)):
+        t0 = time.perf_counter()
+        if predictor.get(straight, 9.5, steer, -1, 'mpc', 30.0, background=True) is None:
+            t.append(time.perf_counter() - t0)
+            while predictor.pending: time.sleep(0.001)
+            waits.append(time.perf_counter() - t0)
+        else:
+            t.append(time.perf_counter() - t0)
+    print(f"  mpc (작업 스레드): UI 스레드 평균 {sum(t)/len(t)*1e6:6.1f} us / 최대 {max(t)*1e6:6.1f} us, "
+          f"계산 {len(waits)}회 평균 {sum(waits)/len(waits)*1000:6.1f} ms 뒤 표시")
+
+
+def bench_primitives():
+    import random
+    import tempfile
+    from truck_primitives import MotionPrimitives
+    print("[primitives] 운동 프리미티브 테이블: 생성/로드, 조회 vs 주행 계산")
+    trailer_len = 9.5
+    with tempfile.TemporaryDirectory() as cache_dir:
+        t0 = time.perf_counter(); prims = MotionPrimitives.load_or_build(trailer_len, cache_dir=cache_dir); t_build = time.perf_counter() - t0
+        t0 = time.perf_counter(); MotionPrimitives.load_or_build(trailer_len, cache_dir=cache_dir); t_load = time.perf_counter() - t0
+        size = os.path.getsize(MotionPrimitives.cache_path(trailer_len, cache_dir=cache_dir))
+    print(f"  생성 {t_build:.2f} s, 캐시 파일 {size/2**20:.1f} MiB, 로드 {t_load*1000:.1f} ms")
+    rng = random.Random(0)
+    queries = []
+    for _ in range(300):
+        yaw = rng.uniform(-math.pi, math.pi)
+        state = {'x': rng.uniform(-20, 20), 'y': rng.uniform(-20, 20), 'yaw_tractor': yaw, 'yaw_trailer': yaw - math.radians(rng.uniform(-60, 60))}
+        queries.append((state, rng.randint(-40, 40), rng.choice([0.2, 0.5, 1, 5, 10, 20]), rng.choice([1, -1])))
+    engine = kin.KinematicsEngine(trailer_len=trailer_len)
+    def simulate():
+        results = []
+        for state, steer, d, direction in queries:
+            engine.set_state(state); engine.drive(d, math.radians(steer), direction=direction); results.append(engine.get_state())
+        return results
+    def lookup():
+        return [prims.end_state(state, steer, d, direction) for state, steer, d, direction in queries]
+    t_sim = _timeit(simulate) / len(queries); t_lookup = _timeit(lookup) / len(queries)
+    err = max(math.hypot(a['x'] - b['x'], a['y'] - b['y']) for a, b in zip(simulate(), lookup()))
+    err_art = max(abs((a['yaw_tractor'] - a['yaw_trailer']) - (b['yaw_tractor'] - b['yaw_trailer'])) for a, b in zip(simulate(), lookup()))
+    print(f"  최종 자세 1회: 주행 계산 {t_sim*1e6:8.1f} us -> 테이블 조회 {t_lookup*1e6:6.1f} us ({t_sim/t_lookup:5.1f}배), "
+          f"최대 오차 {err*1000:.3f} mm / {math.degrees(err_art):.3f}°")
+
+
+def bench_course():
+    from truck_course import CourseGeometry, CourseTransform, convex_polygon_hits_segment
+    print("[course] 코스 선 접촉 검사 (course.png 기본 배치, 주행 스텝마다)")
+    geometry = CourseGeometry.build(CourseTransform.from_background((1600, 700), -27.0, -11.0, 1.05, 12))
+    engine = kin.KinematicsEngine()
+    engine.set_state({'x': -18.0, 'y': 2.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi})
+    poses = []
+    for steer, direction, distance in ((0, 1, 18), (30, 1, 6), (-30, -1, 20), (0, -1, 12)):
+        run = engine.start_drive(distance, direction, "manual", math.radians(steer))
+        while run.tick() is None: poses.append((engine.get_state(), run.steer_rad))
+    polygons = [kin.body_polygons(state, steer, engine.trailer_len) for state, steer in poses]
+    active = [s for s in geometry.segments if s[1] in geometry.kinds]
+    def brute():
+        return [[(part, s[0]) for part, poly in polys.items() for s in active if convex_polygon_hits_segment(poly, *s[2:])] for polys in polygons]
+    def indexed():
+        return [geometry.check_vehicle(polys) for polys in polygons]
+    assert brute() == indexed()
+    t_poly = _timeit(lambda: [kin.body_polygons(state, steer, engine.trailer_len) for state, steer in poses]) / len(poses)
+    t_brute = _timeit(brute) / len(poses); t_grid = _timeit(indexed) / len(poses)
+    touching = sum(1 for c in indexed() if c)
+    print(f"  {len(poses)} 스텝 (선 접촉 {touching} 스텝), 선분 {len(active)}개, 격자 셀 {len(geometry.grid.cells)}개")
+    print(f"  전체 선분 검사 {t_brute*1e6:7.1f} us -> 격자 색인 {t_grid*1e6:6.1f} us ({t_brute/t_grid:4.1f}배), 차체 다각형 {t_poly*1e6:5.1f} us")
+    print(f"  초당 {1/(t_grid + t_poly):8.0f} 회 검사 (실시간 주행은 초당 {kin.DRIVE_SPEED/kin.STEP_DIST:.0f} 스텝)")
+
+
+def bench_raster():
+    import tempfile
+    from PIL import Image
+    from truck_raster import RasterClearance
+    print("[raster] 배경 이미지 선 거리 변환 (계산 / 캐시 로드 / 점 조회)")
+    image = Image.open("course.png"); image.load()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for scale in (1, 2, 4):
+            path = os.path.join(cache_dir, f"course_x{scale}.png")
+            image.resize((image.width * scale, image.height * scale), Image.Resampling.NEAREST).save(path)
+            scaled = Image.open(path); scaled.load()
+            built = RasterClearance.load_or_build(scaled, path, cache_dir=cache_dir)
+            RasterClearance._memory.clear()
+            loaded = RasterClearance.load_or_build(scaled, path, cache_dir=cache_dir)
+            t0 = time.perf_counter(); RasterClearance.load_or_build(scaled, path, cache_dir=cache_dir); t_memory = time.perf_counter() - t0
+            # 배경 위치/배율 슬라이더 한 칸 (거리 배열을 다시 만들지 않음)
+            t_move = _timeit(lambda: [loaded.set_transform(i * 0.1, 0.0, 1.0 + i * 0.01, 12) for i in range(100)]) / 100
+            print(f"  {scaled.width:5d}x{scaled.height:<5d}: 계산 {built.build_seconds*1000:7.1f} ms, 파일 캐시 {loaded.build_seconds*1000:6.1f} ms, "
+                  f"메모리 캐시 {t_memory*1e6:5.1f} us, 위치/배율 변경 {t_move*1e6:5.1f} us")
+    clearance = RasterClearance.load_or_build(image)
+    clearance.set_transform(-27.0, -11.0, 1.05, 12)
+    engine = kin.KinematicsEngine()
+    engine.set_state({'x': -18.0, 'y': 2.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi})
+    polygons = []
+    for steer, direction, distance in ((0, 1, 18), (30, 1, 6), (-30, -1, 20), (0, -1, 12)):
+        run = engine.start_drive(distance, direction, "manual", math.radians(steer))
+        while run.tick() is None: polygons.append(kin.body_polygons(engine.get_state(), run.steer_rad, engine.trailer_len))
+    points = sum(len(poly) for polys in polygons for poly in polys.values())
+    t = _timeit(lambda: [clearance.check_vehicle(polys) for polys in polygons])
+    # 선분 모델과 비교: 선분 모델만 접촉한 부위(놓침)와 이미지만 접촉한 부위(선 두께/안티앨리어싱)가 있는 스텝 수
+    from truck_course import CourseGeometry, CourseTransform
+    geometry = CourseGeometry.build(CourseTransform.from_background(image.size, -27.0, -11.0, 1.05, 12))
+    missed = extra = 0
+    for polys in polygons:
+        raster = {part for part, _ in clearance.check_vehicle(polys)}; vector = {part for part, _ in geometry.check_vehicle(polys)}
+        missed += bool(vector - raster); extra += bool(raster - vector)
+    print(f"  {len(polygons)} 스텝 x {points // len(polygons)} 꼭짓점의 변: 스텝당 {t/len(polygons)*1e6:6.1f} us, "
+          f"선분 모델과 비교 놓침 {missed} / 추가 {extra} 스텝")
+
+
+def bench_planner():
+    from truck_course import CourseTransform
+    from truck_planner import TCoursePlanner, plan_t_course, standard_start, PORTFOLIO
+    print("[planner] T자 코스 자동 후진 경로 계획 (표준 출발 자세, 코스 배경 -27, -11, 105%)")
+    transform = CourseTransform.from_background((1600, 700), -27.0, -11.0, 1.05, 12)
+    engine = kin.KinematicsEngine()
+    start = standard_start(engine.trailer_len, transform)
+    t0 = time.perf_counter(); planner = TCoursePlanner(engine.trailer_len, transform); t_setup = time.perf_counter() - t0
+    print(f"  준비 (거리 격자 + 휴리스틱): {t_setup*1000:.0f} ms")
+    for i, variant in enumerate(PORTFOLIO):
+        try:
+            plan = planner.search(start, **variant)
+        except Exception as e:
+            print(f"  설정 {i}: {e}"); continue
+        print(f"  설정 {i} (가중치 {variant['weight']}, 단계 {variant['edge_steps']} 스텝): "
+              f"{plan.seconds:5.1f} s, 확장 {plan.expansions:5d}회 ({plan.seconds/plan.expansions*1e3:.2f} ms/회), 조작 {len(plan.maneuvers)}개, 비용 {plan.cost:.1f}")
+    print(f"  CPU {os.cpu_count()}개")
+    for workers in (1, len(PORTFOLIO)):
+        t0 = time.perf_counter(); plan = plan_t_course(start, engine.trailer_len, transform, workers=workers); t = time.perf_counter() - t0
+        print(f"  plan_t_course(workers={workers}): {t:5.1f} s (검증 포함), 조작 {len(plan.maneuvers)}개, 선 접촉 {len(plan.contacts)}건")
+
+
+def bench_target():
+    from truck_target import solve_target
+    print("[target] 목표 지점 풀이 (트레일러 뒤끝, 직진 정렬 출발)")
+    engine = kin.KinematicsEngine()
+    state = engine.get_state()
+    targets = [(20.0, 4.0), (24.0, -6.0), (6.0, 10.0), (16.0, 10.0), (4.0, -3.0)]
+    for two in (False, True):
+        label = "한 번/두 번 주행" if two else "한 번 주행만   "
+        for target in targets:
+            s = solve_target(state, target, engine.trailer_len, two_segments=two)
+            print(f"  {label} 목표 ({target[0]:6.1f}, {target[1]:5.1f}): {s.seconds*1000:6.1f} ms, 궤적 {s.rollouts:6d}개, "
+                  f"조작 {len(s.maneuvers)}개, 오차 {s.error:.3f} m")
+
+
+def bench_mpc():
+    from truck_mpc import mpc_steer, signed_target
+    print("[mpc] 목표 꺾임각 제어: 비례 제어(steer_for_target_angle) vs 예측 제어(mpc), 20m 주행, 출발 꺾임각 5°")
+    engine = kin.KinematicsEngine()
+    tolerance = kin.TARGET_TOLERANCE_DEG
+
+    def run(controller, target_deg, direction):
+        engine.set_state({'x': 0.0, 'y': 0.0, 'yaw_tractor': math.pi + math.radians(5), 'yaw_trailer': math.pi})
+        target_phi = signed_target(math.radians(5), math.radians(target_deg), 0.0, direction)
+        reach = None; overshoot = 0.0; times = []
+        for i in range(int(20.0 / kin.STEP_DIST)):
+            phi = engine.yaw_tractor - engine.yaw_trailer
+            t0 = time.perf_counter()
+            if controller == 'mpc':
+                steer = mpc_steer(phi, target_phi, direction, engine.tractor_wb, engine.trailer_len)
+            else:
+                steer = kin.steer_for_target_angle(phi, math.radians(target_deg), direction, engine.tractor_wb, engine.trailer_len)
+            times.append(time.perf_counter() - t0)
+            engine.step(steer, direction)
+            angle = abs(engine.articulation_degrees())
+            if reach is None and abs(angle - target_deg) < tolerance: reach = (i + 1) * kin.STEP_DIST
+            overshoot = max(overshoot, (angle - target_deg) if target_deg > 5 else (target_deg - angle))
+        final = abs(engine.articulation_degrees()) - target_deg
+        reach_text = f"{reach:5.2f} m" if reach is not None else "  도달X"
+        return (f"도달 {reach_text}, 넘어섬 {max(overshoot, 0):5.2f}°, 20m 후 오차 {final:+7.3f}°, "
+                f"제어 계산 평균 {sum(times)/len(times)*1e6:6.1f} us / 최대 {max(times)*1e3:5.2f} ms")
+
+    for direction in (1, -1):
+        for target_deg in (0, 20, 45, 70):
+            for controller in ('비례', 'mpc'):
+                print(f"  {'전진' if direction == 1 else '후진'} 목표 {target_deg:2d}° {controller:4s}: {run(controller, target_deg, direction)}")
+    print(f"  (화면 주행 한 스텝 예산 10 ms)")
+
+
+def bench_robustness():
+    from truck_course import CourseTransform
+    from truck_planner import standard_start
+    from truck_robustness import analyze
+    print("[robustness] 조작 기록 견고성 분석 (Monte Carlo): 15개 조작, 잡음 주행 2000대 + 조작별 200대")
+    actions = []
+    for i in range(15):
+        direction = -1 if i % 3 else 1
+        actions.append({'distance': (5, 2, 3)[i % 3], 'direction': direction, 'mode': 'manual',
+                        'steer_deg': (10, -15, 20, -5, 0)[i % 5], 'target_angle': None})
+    transform = CourseTransform.from_background((1600, 700), -27.0, -11.0, 1.05, 12)
+    start = standard_start(9.5, transform)   # 코스 상단 주행로
+    for label, course in (("잭나이프만", None), ("코스 선 포함", transform)):
+        report = analyze(start, actions, 9.5, course)
+        print(f"  {label}: {report.seconds:5.2f} s, {report.rollouts}대 ({report.rollouts*len(actions)/report.seconds:,.0f} 조작/s), "
+              f"성공 {report.success_rate*100:.1f}%, 가장 민감한 조작 {report.sensitive_step + 1}번째")
+
+
+def bench_sweep():
+    import tempfile
+    from truck_sweep import SweepGrid, run_sweep, parse_range
+    grid = SweepGrid(parse_range("10.5:14.0:0.5"), parse_range("-40:40:1"), parse_range("-60:60:1"))
+    print(f"[sweep] 파라미터 스윕 {grid.shape[0]} x {grid.shape[1]} x {grid.shape[2]} = {grid.size:,}칸, 20m 후진 (디스크 배열에 조각 단위로 기록)")
+    for workers in sorted({1, os.cpu_count() or 1}):
+        with tempfile.TemporaryDirectory() as out_dir:
+            stats = run_sweep(grid, out_dir, workers=workers)
+        print(f"  프로세스 {workers}개: {stats['seconds']:5.2f} s, {stats['cells_per_second']:,.0f}칸/s")
+
+
+def bench_swept():
+    from truck_swept import SweptArea
+    print("[swept] 쓸고 간 면적 격자: 스텝마다 캡/구즈넥/컨테이너 증분 래스터화, 후진 20m 조향 20°")
+    for resolution in (0.2, 0.1, 0.05):
+        engine = kin.KinematicsEngine()
+        swept = SweptArea(resolution=resolution)
+        run = engine.start_drive(20.0, -1, 'manual', math.radians(20), None)
+        times = []
+        while run.tick(math.radians(20)) is None:
+            polygons = kin.body_polygons(engine.get_state(), run.steer_rad, engine.trailer_len)
+            t0 = time.perf_counter()
+            swept.add_polygons(polygons)
+            times.append(time.perf_counter() - t0)
+        memory = len(swept.tiles) * swept.tile_cells ** 2
+        print(f"  격자 {resolution:.2f}m: 스텝 평균 {sum(times)/len(times)*1e3:5.2f} ms / 최대 {max(times)*1e3:5.2f} ms, "
+              f"면적 {swept.area():6.1f} m² (컨테이너 {swept.area('container'):6.1f}), 타일 {len(swept.tiles)}개 {memory/1024:.0f} KB")
+    # 긴 주행에서도 타일 수가 상한에 묶이는지
+    engine = kin.KinematicsEngine()
+    swept = SweptArea(max_tiles=32)
+    run = engine.start_drive(500.0, 1, 'manual', math.radians(3), None)
+    while run.tick(math.radians(3)) is None:
+        swept.add_polygons(kin.body_polygons(engine.get_state(), run.steer_rad, engine.trailer_len))
+    print(f"  전진 500m (타일 상한 32): 타일 {len(swept.tiles)}개, 버린 타일 {swept.evicted}개, 면적 {swept.area():.0f} m²")
+    print(f"  (화면 주행 한 스텝 예산 10 ms)")
+
+
+def bench_exam():
+    from truck_course import CourseTransform, course_layout
+    from truck_exam import ExamScorer, score_actions
+    print("[exam] 시험 채점: 입구 정지선 통과 지점 (스텝 사이 선분 교차) 과 스텝당 채점 비용")
+    c = course_layout()
+    engine = kin.KinematicsEngine()
+    trailer_len = engine.trailer_len
+    # 곧게 후진해 들어가는 차량: 뒤끝이 정지선 위 2.0 + offset m 에서 출발 -> 정확한 통과 거리는 2.0 + offset
+    errors = []
+    for offset in [kin.STEP_DIST * i / 6 for i in range(6)]:
+        rear_y = c['Y_stop_gate'] + 2.0 + offset
+        start = {'x': 0.3, 'y': rear_y + trailer_len + kin.TRAILER_REAR_OVERHANG, 'yaw_tractor': math.pi / 2, 'yaw_trailer': math.pi / 2}
+        report = score_actions(start, [{'distance': 4.0, 'direction': -1, 'mode': 'manual', 'steer_deg': 0, 'target_angle': None}],
+                               trailer_len, check_contacts=False)
+        crossing = next(e for e in report.events if e[2] == 'stop_gate')
+        errors.append(abs(crossing[0] - (2.0 + offset)))
+    print(f"  통과 거리 오차 최대 {max(errors)*1e3:.4f} mm (스텝 끝 점만 보면 최대 {kin.STEP_DIST*1e3:.0f} mm 늦게 감지)")
+    exam = ExamScorer(CourseTransform())
+    engine.set_state({'x': 20.0, 'y': 26.0, 'yaw_tractor': math.pi, 'yaw_trailer': math.pi})
+    exam.reset(engine.get_state(), trailer_len)
+    exam.begin_maneuver(1)
+    run = engine.start_drive(20.0, 1, 'manual', math.radians(15))
+    times = []
+    while run.tick() is None:
+        t0 = time.perf_counter()
+        exam.step(engine.get_state(), 1, trailer_len)
+        exam.status_text()
+        times.append(time.perf_counter() - t0)
+    print(f"  채점 한 스텝 + 화면 표시 문자열: 평균 {sum(times)/len(times)*1e6:.1f} us / 최대 {max(times)*1e6:.1f} us (화면 주행 한 스텝 예산 10 ms)")
+
+
+def bench_background():
+    from PIL import Image
+    from truck_background import BackgroundCache
+    print("[background] 배경 배율 슬라이더: 전체 LANCZOS 재계산 vs 피라미드 + 화면 타일 LRU (900x700 화면)")
+    base = Image.open("course.png").convert("RGB")
+    image = base.resize((base.width * 5, base.height * 5), Image.Resampling.NEAREST)   # 8k 급 코스 이미지
+    view = (900, 700)
+    cache = BackgroundCache(image)
+    print(f"  이미지 {image.width}x{image.height}, 피라미드 {len(cache.levels)}단계 생성 {cache.build_seconds*1000:.0f} ms")
+    for scales in ((0.20, 0.21, 0.22, 0.21), (1.00, 1.01, 1.02, 1.01)):
+        old_times = []
+        for scale in scales[:2]:   # 전체 재계산은 느려서 두 번만
+            t0 = time.perf_counter()
+            scaled = image.resize((int(image.width * scale), int(image.height * scale)), Image.Resampling.LANCZOS)
+            old_times.append(time.perf_counter() - t0)
+        old_memory = image.width * image.height * 3 + scaled.width * scaled.height * (3 + 4)   # 원본 + 배율 이미지 + 전체 PhotoImage
+        new_times = []; draft_times = []
+        for scale in scales:
+            width, height = cache.scaled_size(scale)
+            left, top = (view[0] - width) // 2, (view[1] - height) // 2   # 이미지 가운데를 보는 화면
+            t0 = time.perf_counter(); cache.view_tiles(scale + 0.005, left, top, *view, draft=True); draft_times.append(time.perf_counter() - t0)
+            t0 = time.perf_counter(); cache.view_tiles(scale, left, top, *view); new_times.append(time.perf_counter() - t0)
+        print(f"  배율 {scales[0]:.2f}~{scales[2]:.2f}: 전체 재계산 {sum(old_times)/len(old_times)*1000:7.1f} ms/틱 (메모리 {old_memory/1e6:6.1f} MB) | "
+              f"타일 {', '.join(f'{t*1000:.1f}' for t in new_times)} ms (마지막은 LRU 재사용, 메모리 {cache.memory_bytes()/1e6:6.1f} MB), "
+              f"끄는 동안 초안 {sum(draft_times)/len(draft_times)*1000:.1f} ms")
+    print(f"  타일 LRU: {len(cache.tiles)}개 {cache.tile_bytes/1e6:.1f}/{cache.max_tile_bytes/1e6:.1f} MB, 적중 {cache.stats['hits']} / 생성 {cache.stats['misses']} "
+          f"(PhotoImage 변환 비용은 전체 방식이 이미지 전체, 타일 방식은 보이는 타일만)")
+
+
+def bench_overlay():
+    root, app = _make_app()
+    if app is None: return
+    import os
+    print("[overlay] 코스 배경: course.png 래스터 타일 vs 벡터 도형, 배율별 draw_scene 시간 (배율 바꾼 첫 프레임 / 화면 이동 20프레임 평균)")
+    app.auto_follow.set(False)
+    def frame_times(zoom, set_zoom):
+        set_zoom(zoom)
+        t0 = time.perf_counter(); app.draw_scene(); root.update_idletasks(); first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(20):
+            app.manual_offset_x += 7; app.manual_offset_y -= 3
+            app.draw_scene(); root.update_idletasks()
+        return first, (time.perf_counter() - t0) / 20
+    def raster_zoom(zoom):
+        # 예전 기본 배치(오프셋 -27/-11m, 105%)를 zoom 배로 (이미지와 코스 모델을 함께 확대)
+        app.pixels_per_meter = 12 * zoom
+        app.bg_offset_x, app.bg_offset_y, app.bg_scale = -27.0, -11.0, 1.05 * zoom
+        app._build_course_geometry()
+    def vector_zoom(zoom):
+        app.pixels_per_meter = 12 * zoom
+    zooms = (0.5, 1.0, 2.0, 4.0)
+    app._load_background_from_path(os.path.abspath("course.png"))
+    raster = [frame_times(zoom, raster_zoom) for zoom in zooms]
+    app.clear_background(redraw=False); app._build_course_geometry()
+    vector = [frame_times(zoom, vector_zoom) for zoom in zooms]
+    for zoom, (r_first, r_pan), (v_first, v_pan) in zip(zooms, raster, vector):
+        print(f"  x{zoom:<4}: 래스터 첫 프레임 {r_first*1000:7.2f} ms, 이동 {r_pan*1000:6.2f} ms | 벡터 첫 프레임 {v_first*1000:6.2f} ms, 이동 {v_pan*1000:6.2f} ms")
+    items = sum(1 for item in app.renderer.items.values() if item.layer == 'course')
+    print(f"  벡터 코스 캔버스 아이템 {items}개 (배율과 무관, 픽셀 재계산 없음)")
+    app.pixels_per_meter = 12
+    root.destroy()
+
+
+def bench_zoom():
+    root, app = _make_app()
+    if app is None: return
+    from truck_lod import LevelOfDetail
+    print("[zoom] 배율별 프레임 시간: 가득 찬 바퀴 궤적(156m) + 20m 주행 (LOD 끔 / 켬), 배율 바꾼 첫 프레임과 궤적 점 수")
+    def frame_times(ppm, lod):
+        app.lod = lod
+        # 화면 밖까지 이어지는 긴 궤적 (완만한 S자 전진 156m, 단순화 없이 2000점)
+        app.path_tolerance = 0
+        app.reset_simulation()
+        for i in range(8):
+            app.engine.drive(19.5, math.radians(4 if i % 2 else -4), direction=1,
+                             on_step=lambda run: app.wheel_paths.append_positions(app._get_world_wheel_positions()))
+        app.pixels_per_meter = ppm; app._paths_view = None
+        t0 = time.perf_counter(); app.draw_scene(); root.update_idletasks(); first = time.perf_counter() - t0
+        times = []
+        run = app.engine.start_drive(20.0, 1, "manual", math.radians(15))
+        while run.tick() is None:
+            app.wheel_paths.append_positions(app._get_world_wheel_positions())
+            t0 = time.perf_counter()
+            app.draw_scene(run.steer_rad)
+            root.update_idletasks()
+            times.append(time.perf_counter() - t0)
+        points = sum(len(piece) for trail in app._paths_drawn.values() for piece in trail.pieces)
+        items = sum(1 for item in app.renderer.items.values() if not item.hidden)
+        return sorted(times), first, points, items
+    for ppm in (3, 6, 12, 30, 80):
+        row = []
+        for label, lod in (("LOD 끔", LevelOfDetail(enabled=False)), ("LOD 켬", LevelOfDetail())):
+            times, first, points, items = frame_times(ppm, lod)
+            row.append(f"{label} 평균 {sum(times)/len(times)*1000:6.2f} ms, p95 {times[int(len(times)*0.95)]*1000:6.2f} ms, "
+                       f"첫 프레임 {first*1000:6.1f} ms, 궤적 점 {points:5d}, 아이템 {items:3d}")
+        print(f"  {ppm:3d} px/m: " + " | ".join(row))
+    app.lod = LevelOfDetail(); app.pixels_per_meter = app.BASE_PIXELS_PER_METER
+    root.destroy()
+
+
+def bench_simplify():
+    import random
+    import numpy as np
+    from truck_paths import WheelPaths
+    maxlen, drives = 2000, 100
+    print(f"[simplify] 바퀴 궤적 단순화: 무작위 주행 {drives}회 (5~20m, 최대 {maxlen}점), 앞바퀴 기준, 허용 오차별 보이는 궤적과 메모리")
+    def session(tolerance):
+        engine = kin.KinematicsEngine(); rng = random.Random(0)
+        paths = WheelPaths.start(engine.wheel_positions(), maxlen=maxlen, tolerance=tolerance)
+        raw = [engine.wheel_positions()['t_front_l']]; elapsed = [0.0]
+        def on_step(run):
+            positions = engine.wheel_positions(); raw.append(positions['t_front_l'])
+            t0 = time.perf_counter(); paths.append_positions(positions); elapsed[0] += time.perf_counter() - t0
+        for _ in range(drives):
+            paths.anchor()
+            engine.drive(rng.choice((5.0, 10.0, 20.0)), math.radians(rng.randint(-30, 30)), "manual", rng.choice((1, -1)), on_step=on_step)
+        return paths, np.array(raw), elapsed[0] / (len(raw) - 1)
+    def deviation(points, xy):
+        # 원래 위치마다 남긴 꺾은선까지의 최소 거리 중 최댓값 (m)
+        a = xy[:-1]; d = xy[1:] - a; length2 = np.maximum((d*d).sum(1), 1e-12); worst = 0.0
+        for chunk in np.array_split(points, max(1, len(points) // 256)):
+            t = np.clip(((chunk[:, None, :] - a) * d).sum(2) / length2, 0, 1)
+            worst = max(worst, np.sqrt(((chunk[:, None, :] - (a + t[..., None] * d))**2).sum(2)).min(1).max())
+        return worst
+    for tolerance in (0.0, 0.005, 0.01, 0.02):
+        paths, raw, per_step = session(tolerance)
+        xy = np.frombuffer(paths['t_front_l'].flat(), dtype=float).reshape(-1, 2)
+        shown = float(np.hypot(*np.diff(xy, axis=0).T).sum())
+        covered = len(paths['t_front_l']) == paths.total   # 세션 전체가 보이면 원래 위치와 비교
+        worst = f"{deviation(raw, xy)*100:5.2f} cm" if covered else "    -   "
+        print(f"  허용 오차 {tolerance*100:3.1f} cm: 스텝 {len(raw)-1:6d} -> 점 {paths.total:6d}, 보이는 궤적 {shown:7.1f} m, "
+              f"메모리 {paths.nbytes()/1024:7.1f} KiB, 최대 오차 {worst}, 추가 {per_step*1e6:5.1f} us/스텝")
+
+
+def bench_redraw():
+    root, app = _make_app()
+    if app is None: return
+    print("[redraw] 이벤트가 몰릴 때 다시 그리기: 화면이 유휴 상태가 되기 전까지 들어온 이벤트 N개 (이전: 이벤트마다 draw_scene)")
+    class Motion:
+        def __init__(self, x, y): self.x = x; self.y = y
+    def burst(n, old, kind):
+        for i in range(n):
+            if kind == 'pan':
+                app.auto_follow.set(False); app.pan_start_x = app.pan_start_y = 0
+                if old:
+                    app.manual_offset_x += 1; app.draw_scene(current_steer=math.radians(app.scale_angle.get()))
+                else:
+                    app._pan_move(Motion(1, 0))
+            else:
+                app.scale_angle.set((i % 40) - 20)
+                if old: app.draw_scene(current_steer=math.radians(app.scale_angle.get()))
+                else: app.update_steer_visualization()
+        root.update_idletasks(); app.redraw.flush()   # 유휴 시점 (flush 는 이미 그렸으면 아무것도 하지 않음)
+    _fill_paths(app); app.draw_scene()
+    for kind, label in (('pan', "뷰 드래그"), ('steer', "조향 슬라이더")):
+        for n in (1, 5, 20):
+            t_old = _timeit(lambda: burst(n, True, kind))
+            before = dict(app.redraw.stats)
+            t_new = _timeit(lambda: burst(n, False, kind))
+            requested = app.redraw.stats['requested'] - before['requested']; performed = app.redraw.stats['performed'] - before['performed']
+            print(f"  {label} 이벤트 {n:2d}개: 이전 {t_old*1000:7.2f} ms -> 예약 {t_new*1000:7.2f} ms (요청 {requested}회, 그리기 {performed}회)")
+    root.destroy()
+
+
+BENCHMARKS = {
+    'kinematics': bench_kinematics,
+    'batch': bench_batch,
+    'render': bench_render,
+    'paths': bench_paths,
+    'history': bench_history,
+    'clock': bench_clock,
+    'integrator': bench_integrator,
+    'events': bench_events,
+    'predict': bench_predict,
+    'primitives': bench_primitives,
+    'course': bench_course,
+    'raster': bench_raster,
+    'planner': bench_planner,
+    'target': bench_target,
+    'mpc': bench_mpc,
+    'robustness': bench_robustness,
+    'sweep': bench_sweep,
+    'swept': bench_swept,
+    'exam': bench_exam,
+    'background': bench_background,
+    'overlay': bench_overlay,
+    'zoom': bench_zoom,
+    'simplify': bench_simplify,
+    'redraw': bench_redraw,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="트랙터-트레일러 시뮬레이터 벤치마크")
+    parser.add_argument('names', nargs='*', help=f"실행할 벤치마크 (기본: 전체) - {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS: parser.error(f"알 수 없는 벤치마크: {name}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
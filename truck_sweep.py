@@ -0,0 +1,242 @@
+"""파라미터 스윕 (명령줄).
+
+트레일러 전체 길이(시뮬레이터 슬라이더 10.5 ~ 14.0m) x 조향각 x 출발 꺾임각 격자의 모든 칸을
+같은 거리만큼 주행해 보고, 칸마다 다음 값을 NumPy 배열(.npy, float32, shape = (길이, 조향각, 꺾임각))로
+저장하고 히트맵 이미지로 그립니다.
+
+- final_articulation: 주행이 끝난 뒤 꺾임각 (°, [-180, 180])
+- kingpin_displacement: 킹핀이 출발점에서 떨어진 거리 (m)
+- jackknife_distance: 꺾임각(접지 않은 값)이 처음 90° 에 닿은 주행 거리 (m, 닿지 않으면 NaN)
+
+    python truck_sim.py sweep --direction R --steers -40:40:1 --articulations -60:60:1
+    python truck_sweep.py --lengths 10.5:14:0.05 --workers 8 --csv
+
+격자는 CHUNK_CELLS 칸씩 잘라 truck_batch 로 일괄 주행하고, 여러 코어(프로세스 풀)에 나눠 계산합니다.
+끝난 조각은 바로 디스크의 배열(np.lib.format.open_memmap)과 CSV 에 써서 수백만 칸 격자도 메모리는
+조각 몇 개 분량만 씁니다. 히트맵은 Pillow 가 있으면 그립니다 (트레일러 길이마다 가로로 한 칸씩).
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import truck_kinematics as kin
+from truck_batch import batch_rollout
+
+OUTPUT_DIR = os.path.join("Truck_Sim", "sweep")
+CHUNK_CELLS = 32768
+METRICS = ('final_articulation', 'kingpin_displacement', 'jackknife_distance')
+HEATMAP_MAX_PANELS = 8                 # 트레일러 길이가 많으면 고르게 골라서 그림
+HEATMAP_CELL_PX = 3
+# 색: 파랑 -> 청록 -> 노랑 (viridis 와 비슷한 단계), NaN 은 회색
+COLORMAP = np.array([(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)], dtype=float)
+NAN_COLOR = (160, 160, 160)
+
+
+def parse_range(text):
+    # "start:stop:step" (stop 포함) 또는 "값" -> float 배열
+    parts = [float(p) for p in text.split(':')]
+    if len(parts) == 1: return np.array(parts)
+    start, stop, step = parts if len(parts) == 3 else (parts[0], parts[1], 1.0)
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    return start + step * np.arange(count)
+
+
+RANGE_OPTIONS = ('--lengths', '--steers', '--articulations')
+
+
+def join_range_values(argv):
+    # argparse 는 "-40:40:1" 을 옵션으로 읽으므로 범위 옵션 뒤의 음수 값은 "--steers=-40:40:1" 로 붙임
+    argv = list(argv); out = []
+    while argv:
+        arg = argv.pop(0)
+        if arg in RANGE_OPTIONS and argv and argv[0][:1] == '-' and argv[0][1:2].isdigit():
+            arg = f"{arg}={argv.pop(0)}"
+        out.append(arg)
+    return out
+
+
+class SweepGrid:
+    def __init__(self, lengths, steers, articulations, distance=20.0, direction=-1, tractor_wb=kin.TRACTOR_WB):
+        self.lengths = np.asarray(lengths, dtype=float)          # 트레일러 전체 길이 (구즈넥 포함, 슬라이더 값)
+        self.steers = np.asarray(steers, dtype=float)            # 조향각 (°)
+        self.articulations = np.asarray(articulations, dtype=float)   # 출발 꺾임각 (°)
+        self.distance = distance
+        self.direction = direction
+        self.tractor_wb = tractor_wb
+
+    @property
+    def shape(self):
+        return (len(self.lengths), len(self.steers), len(self.articulations))
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def cells(self, start, end):
+        # 칸 번호 [start, end) -> (트레일러 전체 길이, 조향각, 출발 꺾임각) 배열
+        il, isteer, iart = np.unravel_index(np.arange(start, end), self.shape)
+        return self.lengths[il], self.steers[isteer], self.articulations[iart]
+
+    def to_dict(self):
+        return {'lengths': self.lengths.tolist(), 'steers': self.steers.tolist(), 'articulations': self.articulations.tolist(),
+                'distance': self.distance, 'direction': self.direction, 'tractor_wb': self.tractor_wb, 'shape': list(self.shape)}
+
+
+def sweep_chunk(grid, start, end):
+    """칸 [start, end) 를 일괄 주행 -> {지표 이름: float32 배열}."""
+    total_len, steer_deg, art_deg = grid.cells(start, end)
+    n = end - start
+    yaw = np.full(n, math.pi)
+    state = {'x': np.zeros(n), 'y': np.zeros(n), 'yaw_tractor': yaw, 'yaw_trailer': yaw - np.radians(art_deg)}
+    jackknife = np.full(n, np.nan)
+    limit = math.radians(kin.JACKKNIFE_LIMIT_DEG)
+
+    def on_step(iteration, state, active):
+        raw = state['yaw_tractor'] - state['yaw_trailer']
+        hit = np.isnan(jackknife) & (np.abs(np.arctan2(np.sin(raw), np.cos(raw))) >= limit)
+        jackknife[hit] = iteration * kin.STEP_DIST
+
+    jackknife[np.abs(np.radians(art_deg)) >= limit] = 0.0
+    result = batch_rollout(state, np.radians(steer_deg), total_len - kin.TRAILER_SWING_LEN, grid.distance, grid.direction,
+                           tractor_wb=grid.tractor_wb, on_step=on_step)
+    final = result.state
+    raw = final['yaw_tractor'] - final['yaw_trailer']
+    return {'final_articulation': np.degrees(np.arctan2(np.sin(raw), np.cos(raw))).astype(np.float32),
+            'kingpin_displacement': np.hypot(final['x'], final['y']).astype(np.float32),
+            'jackknife_distance': jackknife.astype(np.float32)}
+
+
+def _sweep_chunk_job(args):
+    grid, start, end = args
+    return start, end, sweep_chunk(grid, start, end)
+
+
+def run_sweep(grid, out_dir=OUTPUT_DIR, workers=None, chunk_cells=CHUNK_CELLS, write_csv=False, progress=None):
+    """격자 전체를 계산해 out_dir 에 저장. 반환: 통계 dict (칸 수, 초, 칸/초)."""
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    arrays = {name: np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode='w+', dtype=np.float32, shape=grid.shape)
+              for name in METRICS}
+    flat = {name: array.reshape(-1) for name, array in arrays.items()}
+    csv_file = open(os.path.join(out_dir, "sweep.csv"), 'w', newline='') if write_csv else None
+    writer = None
+    if csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(('trailer_total_len', 'steer_deg', 'start_articulation_deg') + METRICS)
+    jobs = [(grid, start, min(start + chunk_cells, grid.size)) for start in range(0, grid.size, chunk_cells)]
+    done = 0
+    try:
+        if workers > 1 and len(jobs) > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(min(workers, len(jobs)))
+            results = pool.imap_unordered(_sweep_chunk_job, jobs)
+        else:
+            pool = None
+            results = map(_sweep_chunk_job, jobs)
+        try:
+            for start, end, values in results:
+                for name in METRICS: flat[name][start:end] = values[name]
+                if writer:
+                    cells = grid.cells(start, end)
+                    writer.writerows(zip(*(np.round(c, 4).tolist() for c in cells),
+                                         *(np.round(values[name], 4).tolist() for name in METRICS)))
+                done += end - start
+                if progress: progress(done, grid.size, time.perf_counter() - t0)
+        finally:
+            if pool is not None: pool.close(); pool.join()
+    finally:
+        if csv_file: csv_file.close()
+    for array in arrays.values(): array.flush()
+    seconds = time.perf_counter() - t0
+    stats = {'cells': grid.size, 'seconds': seconds, 'cells_per_second': grid.size / seconds if seconds else 0.0,
+             'workers': workers, 'chunk_cells': chunk_cells}
+    with open(os.path.join(out_dir, "sweep.json"), 'w') as f:
+        json.dump({'grid': grid.to_dict(), 'metrics': list(METRICS), 'stats': stats}, f, indent=4)
+    del arrays, flat
+    return stats
+
+
+def _colorize(values, low, high):
+    # float 배열 -> (…, 3) uint8 (NaN 은 NAN_COLOR)
+    t = np.clip((values - low) / (high - low), 0.0, 1.0) if high > low else np.zeros(values.shape)
+    position = np.nan_to_num(t) * (len(COLORMAP) - 1)
+    index = np.minimum(position.astype(int), len(COLORMAP) - 2); frac = (position - index)[..., None]
+    rgb = COLORMAP[index] * (1 - frac) + COLORMAP[index + 1] * frac
+    rgb[np.isnan(values)] = NAN_COLOR
+    return rgb.astype(np.uint8)
+
+
+def render_heatmaps(out_dir=OUTPUT_DIR, max_panels=HEATMAP_MAX_PANELS, cell_px=HEATMAP_CELL_PX):
+    """저장된 배열로 지표마다 히트맵 PNG (가로: 조향각, 세로: 출발 꺾임각, 트레일러 길이마다 한 칸)."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return []
+    with open(os.path.join(out_dir, "sweep.json")) as f:
+        grid = json.load(f)['grid']
+    lengths = grid['lengths']
+    panels = sorted(set(np.linspace(0, len(lengths) - 1, min(max_panels, len(lengths))).round().astype(int).tolist()))
+    paths = []
+    for name in METRICS:
+        array = np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode='r')
+        bounds = [(np.nanmin(array[i]), np.nanmax(array[i])) for i in panels if np.isfinite(array[i]).any()]
+        low = float(min(b[0] for b in bounds)) if bounds else 0.0
+        high = float(max(b[1] for b in bounds)) if bounds else 1.0
+        n_steer, n_art = array.shape[1], array.shape[2]
+        scale = max(1, cell_px if max(n_steer, n_art) * cell_px <= 600 else 600 // max(n_steer, n_art))
+        pw, ph = n_steer * scale, n_art * scale
+        image = Image.new('RGB', (len(panels) * (pw + 10) + 10, ph + 40), 'white')
+        draw = ImageDraw.Draw(image)
+        for k, i in enumerate(panels):
+            # 세로축: 출발 꺾임각 (위가 큰 값)
+            rgb = _colorize(np.asarray(array[i], dtype=float).T[::-1], low, high)
+            panel = Image.fromarray(rgb).resize((pw, ph), Image.Resampling.NEAREST)
+            image.paste(panel, (10 + k * (pw + 10), 25))
+            draw.text((10 + k * (pw + 10), 8), f"L={lengths[i]:.2f}m", fill='black')
+        draw.text((10, ph + 28), f"{name}  x: steer {grid['steers'][0]:.0f}..{grid['steers'][-1]:.0f} deg, "
+                                 f"y: start articulation {grid['articulations'][0]:.0f}..{grid['articulations'][-1]:.0f} deg, "
+                                 f"color {low:.2f}..{high:.2f}", fill='black')
+        path = os.path.join(out_dir, f"{name}.png")
+        image.save(path); paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트레일러 길이 x 조향각 x 출발 꺾임각 파라미터 스윕")
+    parser.add_argument('--lengths', default="10.5:14.0:0.5", help="트레일러 전체 길이 (m, 시작:끝:간격)")
+    parser.add_argument('--steers', default="-40:40:1", help="조향각 (°)")
+    parser.add_argument('--articulations', default="-60:60:1", help="출발 꺾임각 (°)")
+    parser.add_argument('--distance', type=float, default=20.0, help="주행 거리 (m)")
+    parser.add_argument('--direction', choices=('F', 'R'), default='R', help="전진(F) / 후진(R)")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--chunk', type=int, default=CHUNK_CELLS, help="한 번에 계산할 칸 수")
+    parser.add_argument('--out', default=OUTPUT_DIR)
+    parser.add_argument('--csv', action='store_true', help="칸마다 한 줄씩 sweep.csv 도 씀")
+    parser.add_argument('--no-heatmap', action='store_true')
+    args = parser.parse_args(join_range_values(sys.argv[1:] if argv is None else argv))
+    grid = SweepGrid(parse_range(args.lengths), parse_range(args.steers), parse_range(args.articulations),
+                     args.distance, 1 if args.direction == 'F' else -1)
+    print(f"격자 {grid.shape[0]} x {grid.shape[1]} x {grid.shape[2]} = {grid.size:,}칸, {args.distance}m {'전진' if grid.direction == 1 else '후진'}")
+    last = [0.0]
+    def progress(done, total, seconds):
+        if seconds - last[0] >= 2.0 or done == total:
+            last[0] = seconds
+            print(f"  {done:,}/{total:,}칸 ({done/total*100:.0f}%), {done/seconds:,.0f}칸/s")
+    stats = run_sweep(grid, args.out, args.workers, args.chunk, args.csv, progress)
+    print(f"완료: {stats['cells']:,}칸, {stats['seconds']:.2f}s, {stats['cells_per_second']:,.0f}칸/s "
+          f"(프로세스 {stats['workers']}개) -> {args.out}")
+    if not args.no_heatmap:
+        paths = render_heatmaps(args.out)
+        if paths: print("히트맵: " + ", ".join(paths))
+        else: print("히트맵: Pillow 가 없어 그리지 않았습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""목표 지점 조향 풀이 ("트레일러 뒤끝을 여기로").
+
+사용자가 찍은 월드 좌표 한 점에 트레일러 뒤끝(킹핀에서 trailer_len + kin.TRAILER_REAR_OVERHANG, 화면의 컨테이너 뒤끝이자
+_get_trailer_rear_center 와 같은 점)이 가장 가까이 가는 수동 조향 조작을 찾습니다.
+
+    solution = solve_target(engine.get_state(), (x, y), trailer_len)
+    for m in solution.maneuvers: engine.drive(m['distance'], math.radians(m['steer_deg']), 'manual', m['direction'])
+
+- 한 번 주행: 조향각(-40 ~ 40°, 1° 간격) x 기어(전진/후진) 162 가지를 truck_batch 로 한꺼번에
+  MAX_DISTANCE 까지 주행하며 매 스텝 뒤끝과 목표점의 거리를 재서, 가장 가까워지는 조향각과 거리를 고릅니다.
+- 두 번 주행 (기어 변경 한 번): 첫 조작(조향각 5° 간격, 약 1m 간격 거리)이 끝난 자세마다 반대
+  기어의 두 번째 조작을 다시 일괄 주행하고, 가장 좋은 조합 주변을 1° / 1스텝 간격으로 한 번 더 풉니다.
+  한 번 주행보다 TWO_SEGMENT_GAIN 이상 가까워질 때만 두 번 주행을 씁니다.
+
+꺾임각이 90° 에 닿은 주행(잭나이프)은 그 지점부터 쓰지 않습니다. 조작은 조작 기록과 같은
+형식이고, 거리는 스텝 수로 정해지므로 DriveRun 으로 다시 주행하면 같은 자세가 됩니다.
+"""
+import math
+import time
+
+import numpy as np
+
+import truck_kinematics as kin
+from truck_batch import batch_rollout
+
+MAX_DISTANCE = 20.0            # 조작 하나의 최대 거리 (가장 긴 주행 버튼)
+FINE_STEERS = np.arange(-40, 41)
+COARSE_STEER_STEP = 5          # 두 번 주행 1단계의 조향각 간격
+COARSE_SAMPLE_STEPS = 13       # 두 번 주행 1단계에서 첫 조작을 끊어 보는 간격 (약 1m)
+REFINE_STEER = 4               # 2단계: 1단계 최선의 조향각 ±4°
+TWO_SEGMENT_GAIN = 0.3         # 두 번 주행이 이만큼(m) 더 가까워야 사용
+
+
+class TargetSolution:
+    def __init__(self, target, maneuvers, states, rear, error, seconds, rollouts):
+        self.target = target
+        self.maneuvers = maneuvers   # [{'distance', 'direction', 'mode', 'steer_deg', 'target_angle'}, ...]
+        self.states = states         # 각 조작이 끝난 자세 (마지막이 미리보기 자세)
+        self.rear = rear             # 마지막 자세의 트레일러 뒤끝
+        self.error = error           # 뒤끝과 목표점 사이 거리 (m)
+        self.seconds = seconds
+        self.rollouts = rollouts     # 일괄 주행한 궤적 수
+
+
+def rear_point(state, trailer_len, rear_offset=kin.TRAILER_REAR_OVERHANG):
+    rear = trailer_len + rear_offset
+    return (state['x'] - rear * np.cos(state['yaw_trailer']), state['y'] - rear * np.sin(state['yaw_trailer']))
+
+
+def _sweep(starts, steer_deg, direction, steps, target, trailer_len, tractor_wb, rear_offset, record=()):
+    """starts 의 자세마다 (steer_deg, direction) 으로 steps 스텝 주행하며 뒤끝이 target 에 가장 가까웠던
+    거리와 그때의 스텝 수. record 에 든 스텝에서의 자세(잭나이프 전인 것)는 recorded[스텝] 으로 돌려줍니다."""
+    n = len(starts['x'])
+    rx, ry = rear_point(starts, trailer_len, rear_offset)
+    best = np.hypot(rx - target[0], ry - target[1]) * np.ones(n)
+    best_steps = np.zeros(n, dtype=np.int64)
+    ok = np.ones(n, dtype=bool)
+    limit = math.radians(kin.JACKKNIFE_LIMIT_DEG)
+    record = set(record); recorded = {}
+
+    def on_step(iteration, state, active):
+        art = state['yaw_tractor'] - state['yaw_trailer']
+        np.logical_and(ok, np.abs(np.arctan2(np.sin(art), np.cos(art))) < limit, out=ok)
+        rx, ry = rear_point(state, trailer_len, rear_offset)
+        d = np.hypot(rx - target[0], ry - target[1])
+        better = ok & (d < best)
+        best[better] = d[better]; best_steps[better] = iteration
+        if iteration in record:
+            recorded[iteration] = ({k: v.copy() for k, v in state.items()}, ok.copy())
+
+    batch_rollout(starts, np.radians(steer_deg), trailer_len, kin.distance_for_steps(steps), direction,
+                  tractor_wb=tractor_wb, on_step=on_step)
+    return best, best_steps, recorded
+
+
+def _repeat(state, count):
+    return {k: np.repeat(np.asarray(v, dtype=float), count) for k, v in state.items()}
+
+
+def _two_segments(state, target, trailer_len, tractor_wb, max_steps, rear_offset, steers1, direction1, sample_steps, steers2):
+    # 첫 조작 (steers1 x direction1) 을 sample_steps 마다 끊은 자세에서 반대 기어 두 번째 조작 (steers2) 을 일괄 주행.
+    # 반환: (오차, 첫 조작 (조향각, 기어, 스텝), 두 번째 조작 (조향각, 스텝), 궤적 수)
+    n1 = len(steers1)
+    starts = _repeat(state, n1)
+    _, _, recorded = _sweep(starts, steers1, direction1, max(sample_steps), target, trailer_len, tractor_wb, rear_offset, sample_steps)
+    firsts = []; seconds_starts = {k: [] for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')}
+    for k in sample_steps:
+        poses, ok = recorded.get(k, (None, np.zeros(n1, dtype=bool)))
+        for i in np.flatnonzero(ok):
+            firsts.append((int(steers1[i]), int(direction1[i]), k))
+            for key in seconds_starts: seconds_starts[key].append(poses[key][i])
+    if not firsts: return math.inf, None, None, n1
+    m, n2 = len(firsts), len(steers2)
+    starts = {k: np.repeat(np.array(v), n2) for k, v in seconds_starts.items()}
+    steer2 = np.tile(steers2, m)
+    direction2 = -np.repeat([f[1] for f in firsts], n2)
+    best, best_steps, _ = _sweep(starts, steer2, direction2, max_steps, target, trailer_len, tractor_wb, rear_offset)
+    i = int(np.argmin(best))
+    return float(best[i]), firsts[i // n2], (int(steer2[i]), int(best_steps[i])), n1 + m * n2
+
+
+def solve_target(state, target, trailer_len, tractor_wb=kin.TRACTOR_WB, max_distance=MAX_DISTANCE, two_segments=True, rear_offset=kin.TRAILER_REAR_OVERHANG):
+    """현재 자세 state 에서 트레일러 뒤끝을 target (월드 좌표) 에 가장 가깝게 보내는 TargetSolution."""
+    t0 = time.perf_counter()
+    state = {k: float(state[k]) for k in ('x', 'y', 'yaw_tractor', 'yaw_trailer')}
+    max_steps = int(max_distance / kin.STEP_DIST)
+    # 1) 한 번 주행
+    steers = np.concatenate((FINE_STEERS, FINE_STEERS)); directions = np.repeat([1, -1], len(FINE_STEERS))
+    best, best_steps, _ = _sweep(_repeat(state, len(steers)), steers, directions, max_steps, target, trailer_len, tractor_wb, rear_offset)
+    i = int(np.argmin(best))
+    error = float(best[i]); rollouts = len(steers)
+    segments = [(int(steers[i]), int(directions[i]), int(best_steps[i]))]
+    # 2) 두 번 주행: 거친 격자 -> 최선 주변을 촘촘히
+    if two_segments:
+        coarse = FINE_STEERS[::COARSE_STEER_STEP]
+        steers1 = np.concatenate((coarse, coarse)); direction1 = np.repeat([1, -1], len(coarse))
+        samples = range(COARSE_SAMPLE_STEPS, max_steps + 1, COARSE_SAMPLE_STEPS)
+        error2, first, second, count = _two_segments(state, target, trailer_len, tractor_wb, max_steps, rear_offset,
+                                                     steers1, direction1, samples, coarse)
+        rollouts += count
+        if first is not None:
+            s1 = np.arange(max(-40, first[0] - REFINE_STEER), min(40, first[0] + REFINE_STEER) + 1)
+            s2 = np.arange(max(-40, second[0] - REFINE_STEER), min(40, second[0] + REFINE_STEER) + 1)
+            samples = range(max(1, first[2] - COARSE_SAMPLE_STEPS + 1), min(max_steps, first[2] + COARSE_SAMPLE_STEPS - 1) + 1)
+            refined = _two_segments(state, target, trailer_len, tractor_wb, max_steps, rear_offset,
+                                    s1, np.full(len(s1), first[1]), samples, s2)
+            rollouts += refined[3]
+            if refined[0] <= error2: error2, first, second = refined[:3]
+            if error2 + TWO_SEGMENT_GAIN < error:
+                error = error2; segments = [first, (second[0], -first[1], second[1])]
+    # 조작 목록과 자세 (DriveRun 으로 다시 주행)
+    engine = kin.KinematicsEngine(trailer_len=trailer_len, tractor_wb=tractor_wb)
+    engine.set_state(state)
+    maneuvers = []; states = []
+    for steer_deg, direction, steps in segments:
+        if steps <= 0: continue
+        m = {'distance': kin.distance_for_steps(steps), 'direction': direction, 'mode': 'manual', 'steer_deg': steer_deg, 'target_angle': None}
+        engine.drive(m['distance'], math.radians(steer_deg), 'manual', direction)
+        maneuvers.append(m); states.append(engine.get_state())
+    end = engine.get_state()
+    rear = tuple(float(v) for v in rear_point(end, trailer_len, rear_offset))
+    return TargetSolution(tuple(target), maneuvers, states, rear, math.hypot(rear[0] - target[0], rear[1] - target[1]),
+                          time.perf_counter() - t0, rollouts)